@@ -0,0 +1,10 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Performance benchmarks.
+
+Run from the top of the source tree, e.g.::
+
+    $ python -m benchmarks.bench_memory
+"""
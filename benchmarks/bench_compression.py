@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Size savings against CPU cost of each available request encoding.
+
+Usage: python -m benchmarks.bench_compression [channels]
+"""
+
+import json
+import sys
+
+from swaggerpy3.compression import COMPRESSORS, Compression
+
+
+def channel(i):
+    """A channel, as ARI lists them.
+    """
+    return {
+        "id": "1510158416.%d" % i,
+        "name": "PJSIP/trunk-%08x" % i,
+        "state": "Up",
+        "caller": {"name": "Caller %d" % i, "number": "+1555%07d" % i},
+        "connected": {"name": "", "number": ""},
+        "accountcode": "",
+        "dialplan": {"context": "from-trunk", "exten": "s", "priority": 1},
+        "creationtime": "2018-04-29T10:00:00.000+0000",
+        "language": "en",
+    }
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    channels = int(argv[1]) if len(argv) > 1 else 5000
+    body = json.dumps([channel(i) for i in range(channels)]).encode('utf-8')
+    print("body %d bytes" % len(body))
+    for encoding in sorted(COMPRESSORS):
+        for level in (1, None, 9):
+            policy = Compression(encoding, threshold=0, level=level)
+            for _ in range(5):
+                policy.encode_body(body, None)
+            stats = policy.stats
+            print("%-8s level %-4s ratio %5.1f%%  %6.1f ms/MB" % (
+                encoding, 'def' if level is None else level,
+                100.0 * stats.request_wire_bytes / stats.request_bytes,
+                stats.compress_seconds * 1e3 / (stats.request_bytes / 1e6)))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Cost of connecting many clients: full loads vs. one shared CompiledSpec.
+
+Usage: python -m benchmarks.bench_connect [clients]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks.spec import make_resource_listing, fresh
+from swaggerpy3.client import SwaggerClient, load_spec
+from swaggerpy3.http_client import AsyncHttpClient
+
+
+async def full_loads(listing, count):
+    for _ in range(count):
+        client = SwaggerClient()
+        await client.connect(fresh(listing), http_client=AsyncHttpClient())
+
+
+async def shared_spec(listing, count):
+    spec = await load_spec(fresh(listing))
+    start = time.perf_counter()
+    for i in range(count):
+        client = SwaggerClient()
+        await client.connect(spec, http_client=AsyncHttpClient(),
+                             base_url="http://node%d:8088/ari" % i)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    count = int(argv[1]) if len(argv) > 1 else 100
+    logging.disable(logging.INFO)
+    listing = make_resource_listing()
+
+    start = time.perf_counter()
+    asyncio.run(full_loads(listing, count))
+    elapsed = time.perf_counter() - start
+    print("full load    %10.1f us/client" % (elapsed / count * 1e6))
+
+    elapsed = asyncio.run(shared_spec(listing, count))
+    print("shared spec  %10.1f us/client" % (elapsed / count * 1e6))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Import time of the package and its entry points, from -X importtime.
+
+Each module is imported in a fresh interpreter, a few times, and the best
+run is kept. With --budget, the exit status is 1 when a module takes longer
+than that many milliseconds to import, so the benchmark can gate a build.
+
+Usage: python -m benchmarks.bench_import [--budget ms] [module...]
+"""
+
+import subprocess
+import sys
+
+MODULES = ['swaggerpy3', 'swaggerpy3.client', 'swaggerpy3.codegen']
+RUNS = 5
+TOP = 8
+
+
+def import_times(module):
+    """Imports a module in a new interpreter.
+
+    :return: (total, children): cumulative import time of the module, and
+             of each module it imported directly, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    lines = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nesting is shown by two spaces of indentation per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        lines.append((depth, name.strip(), int(cumulative)))
+    total = 0
+    children = {}
+    # Children are listed before the modules importing them
+    for (depth, name, cumulative) in reversed(lines):
+        if depth == 0:
+            if total:
+                break
+            if name == module:
+                total = cumulative
+        elif depth == 1 and total:
+            children[name] = cumulative
+    return total, children
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    args = argv[1:]
+    budget = None
+    if args[:1] == ['--budget']:
+        budget = float(args[1])
+        args = args[2:]
+    over = []
+    for module in args or MODULES:
+        total, children = min(import_times(module) for _ in range(RUNS))
+        total /= 1e3
+        print("%-24s %7.1f ms" % (module, total))
+        top = sorted((t, name) for (name, t) in children.items())
+        for (t, name) in reversed(top[-TOP:]):
+            print("    %-24s %7.1f ms" % (name, t / 1e3))
+        if budget is not None and total > budget:
+            over.append(module)
+    if over:
+        print("Over the %.1f ms budget: %s" % (budget, ', '.join(over)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Reading a few fields of every record of a large channels.list-style body,
+decoding it up front or through a lazy view.
+
+Views are measured with pysimdjson, when installed, and with the json
+module fallback, which decodes the whole body up front like eager() does.
+
+The peak memory is that of Python objects, as traced by tracemalloc; the
+parsed document simdjson keeps outside the Python heap, about the size of
+the body, is not included.
+
+Usage: python -m benchmarks.bench_lazy_json [records]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from swaggerpy3 import lazy_json
+
+
+def channel(i):
+    return {
+        "id": "1528388612.%d" % i,
+        "name": "PJSIP/trunk-%08x" % i,
+        "state": "Up",
+        "caller": {"name": "Caller %d" % i, "number": "+1555%07d" % i},
+        "connected": {"name": "", "number": ""},
+        "accountcode": "",
+        "dialplan": {"context": "from-trunk", "exten": "s", "priority": 1,
+                     "app_name": "Stasis", "app_data": "ivr"},
+        "creationtime": "2018-06-07T16:23:32.713+0000",
+        "language": "en",
+        "channelvars": {"CDR(linkedid)": "1528388612.%d" % i},
+    }
+
+
+def eager(body):
+    return [(c['id'], c['state']) for c in json.loads(body)]
+
+
+def lazy(body):
+    return [(c['id'], c['state']) for c in lazy_json.view(body)]
+
+
+def projected(body):
+    return lazy_json.view(body, ['id', 'state']).as_python()
+
+
+def measure(fn, body, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(body)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    result = fn(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    records = int(argv[1]) if len(argv) > 1 else 20000
+    body = json.dumps([channel(i) for i in range(records)]).encode('utf-8')
+    print("%d records, %.1f MB, simdjson %s" % (
+        records, len(body) / 1e6,
+        "available" if lazy_json.simdjson else "not installed"))
+    runs = [('eager', eager, None)]
+    simdjson = lazy_json.simdjson
+    if simdjson is not None:
+        runs += [('lazy', lazy, simdjson), ('projected', projected, simdjson)]
+    runs += [('lazy/json', lazy, None), ('proj/json', projected, None)]
+    try:
+        for (name, fn, parser) in runs:
+            lazy_json.simdjson = parser
+            elapsed, peak = measure(fn, body)
+            print("%-10s %8.1f ms  peak %7.1f MB" % (
+                name, elapsed * 1e3, peak / 1e6))
+    finally:
+        lazy_json.simdjson = simdjson
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
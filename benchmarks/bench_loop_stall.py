@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Event loop stalls while connecting to a large spec.
+
+Usage: python -m benchmarks.bench_loop_stall [resources]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks.looplag import LoopLagMonitor
+from benchmarks.spec import make_resource_listing, fresh
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+
+MODES = [
+    ("blocking", {}),
+    ("time_budget=5ms", {'time_budget': 0.005}),
+    ("offload", {'offload': True}),
+]
+
+
+async def connect(listing, options):
+    client = SwaggerClient()
+    async with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        await client.connect(listing, http_client=AsyncHttpClient(),
+                             **options)
+        elapsed = time.perf_counter() - start
+    return elapsed, lag, client.processing_stats
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    resources = int(argv[1]) if len(argv) > 1 else 100
+    logging.disable(logging.INFO)
+    listing = make_resource_listing(resources=resources, apis=50,
+                                    operations_per_api=2)
+    for (name, options) in MODES:
+        elapsed, lag, stats = asyncio.run(connect(fresh(listing), options))
+        print("%-16s connect %7.1fms  loop lag %s" %
+              (name, elapsed * 1e3, lag))
+        print("%-16s %r" % ('', stats))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Per-client memory use of a loaded SwaggerClient.
+
+Each mode is measured in a fresh interpreter, so that memory freed by one
+mode does not hide the resident size of the next.
+
+Usage: python -m benchmarks.bench_memory [clients]
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import subprocess
+import sys
+import tracemalloc
+
+from benchmarks.spec import make_resource_listing, fresh
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+
+
+def rss():
+    """Current resident set size in bytes, or 0 if unknown.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError):
+        return 0
+
+
+async def connect_clients(listing, count, compact):
+    clients = []
+    for _ in range(count):
+        client = SwaggerClient()
+        await client.connect(fresh(listing), http_client=AsyncHttpClient(),
+                             compact=compact)
+        clients.append(client)
+    return clients
+
+
+def measure(count, compact):
+    """Connects count clients, returning per-client (traced, rss) bytes.
+    """
+    listing = make_resource_listing()
+    gc.collect()
+    rss_before = rss()
+    tracemalloc.start()
+    clients = asyncio.run(connect_clients(listing, count, compact))
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = rss()
+    del clients
+    return traced / count, (rss_after - rss_before) / count
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    logging.disable(logging.INFO)
+    if len(argv) > 2:
+        # Child process: measure a single mode
+        traced, resident = measure(int(argv[1]), argv[2] == 'compact')
+        print("%-8s %8.1f KiB/client traced %8.1f KiB/client RSS" %
+              (argv[2], traced / 1024, resident / 1024))
+        return
+    count = argv[1] if len(argv) > 1 else '50'
+    for mode in ('dict', 'compact'):
+        subprocess.check_call(
+            [sys.executable, '-m', 'benchmarks.bench_memory', count, mode])
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Event loop lag while decoding large JSON bodies, inline or offloaded.
+
+Usage: python -m benchmarks.bench_offload [records] [bodies]
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import sys
+import time
+
+from benchmarks.bench_lazy_json import channel
+from benchmarks.looplag import LoopLagMonitor
+from swaggerpy3.offload import Offload
+
+
+async def decode_all(offload, bodies):
+    async with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        for body in bodies:
+            await offload.decode(body)
+        elapsed = time.perf_counter() - start
+    return elapsed, lag
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    records = int(argv[1]) if len(argv) > 1 else 20000
+    count = int(argv[2]) if len(argv) > 2 else 5
+    body = json.dumps([channel(i) for i in range(records)]).encode('utf-8')
+    bodies = [body] * count
+    print("%d bodies of %.1f MB" % (count, len(body) / 1e6))
+    with concurrent.futures.ProcessPoolExecutor(1) as processes:
+        # Start the worker before measuring
+        processes.submit(len, b'').result()
+        modes = [
+            ("inline", Offload(threshold=len(body) + 1)),
+            ("thread pool", Offload(threshold=0)),
+            ("process pool", Offload(threshold=0, executor=processes)),
+        ]
+        for (name, offload) in modes:
+            elapsed, lag = asyncio.run(decode_all(offload, bodies))
+            print("%-14s %7.1f ms  loop lag %s" % (name, elapsed * 1e3, lag))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Latency of critical calls competing with bulk calls for a saturated
+client, with and without priorities.
+
+Usage: python -m benchmarks.bench_priority [bulk calls] [critical calls]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.scheduler import Scheduler
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+async def get_pet(request):
+    await asyncio.sleep(0.005)
+    return web.json_response({'id': request.match_info['petId']})
+
+
+async def saturate(base_path, bulk, critical, prioritized):
+    scheduler = Scheduler(concurrency=10)
+    client = SwaggerClient()
+    await client.connect(resource_listing(base_path),
+                         http_client=AsyncHttpClient(scheduler=scheduler))
+    latencies = []
+
+    async def critical_call(i):
+        await asyncio.sleep(i * 0.01)
+        start = time.perf_counter()
+        await client.pet.getPet(
+            petId=i, _priority='critical' if prioritized else None)
+        latencies.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(
+            *[client.pet.getPet(petId=i,
+                                _priority='bulk' if prioritized else None)
+              for i in range(bulk)],
+            *[critical_call(i) for i in range(critical)])
+    finally:
+        await client.close()
+    latencies.sort()
+    return latencies
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    bulk = int(argv[1]) if len(argv) > 1 else 1000
+    critical = int(argv[2]) if len(argv) > 2 else 50
+    logging.disable(logging.INFO)
+    app = web.Application()
+    app.router.add_get('/pet/{petId}', get_pet)
+    base_path, stop = start_server(app)
+    try:
+        for prioritized in (False, True):
+            latencies = asyncio.run(
+                saturate(base_path, bulk, critical, prioritized))
+            print("prioritized=%-5s critical p50 %7.1f ms  p99 %7.1f ms" % (
+                prioritized, latencies[len(latencies) // 2] * 1e3,
+                latencies[int(len(latencies) * 0.99)] * 1e3))
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Processing a synthetic 10k operation spec with plain vs. coroutine hooks.
+
+Usage: python -m benchmarks.bench_processing [resources]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks.spec import make_resource_listing, fresh
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.processors import HOOKS, SwaggerProcessor
+
+
+class AsyncHooks(SwaggerProcessor):
+    """Runs another processor's hooks as coroutines, the way every hook
+    used to be declared.
+    """
+
+    def __init__(self, processor):
+        self.processor = processor
+
+
+def _async_hook(name):
+    async def hook(self, **kwargs):
+        getattr(self.processor, name)(**kwargs)
+    hook.__name__ = name
+    return hook
+
+
+for _name in HOOKS:
+    setattr(AsyncHooks, _name, _async_hook(_name))
+
+
+def measure(listing, wrap, repeat=5):
+    loader = SwaggerClient.build_loader(AsyncHttpClient())
+    if wrap:
+        loader.processors = [AsyncHooks(p) for p in loader.processors]
+    best = None
+    for _ in range(repeat):
+        resources = fresh(listing)
+        start = time.perf_counter()
+        asyncio.run(loader.process_resource_listing(resources))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    resources = int(argv[1]) if len(argv) > 1 else 100
+    logging.disable(logging.INFO)
+    listing = make_resource_listing(resources=resources, apis=50,
+                                    operations_per_api=2)
+    operations = resources * 50 * 2
+    for (name, wrap) in [("coroutine hooks", True), ("plain hooks", False)]:
+        elapsed = measure(listing, wrap)
+        print("%-16s %8.1f ms for %d operations" %
+              (name, elapsed * 1e3, operations))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
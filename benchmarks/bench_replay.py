@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Client-side overhead of operation calls, replayed from a recording.
+
+Calls to a stub server are recorded once, then replayed as fast as
+possible, so the time per call is the client's own, without network or
+server time.
+
+Usage: python -m benchmarks.bench_replay [calls] [log]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.recording import RecordingTransport, ReplayTransport
+from swaggerpy3.stub import StubServer
+
+RESOURCES = 'test-data/1.1/simple/resources.json'
+
+
+async def calls(client, count):
+    for i in range(count):
+        await client.simple.getAsteriskInfo.fetch(test_param='foo')
+
+
+async def record(path, count):
+    stub = StubServer(RESOURCES)
+    url = await stub.start()
+    client = SwaggerClient()
+    await client.connect(url, http_client=AsyncHttpClient(
+        transport=RecordingTransport(path)))
+    start = time.perf_counter()
+    try:
+        await calls(client, count)
+    finally:
+        await client.close()
+        await stub.close()
+    return url, time.perf_counter() - start
+
+
+async def replay(path, url, count):
+    client = SwaggerClient()
+    await client.connect(url, http_client=AsyncHttpClient(
+        transport=ReplayTransport(path)))
+    start = time.perf_counter()
+    try:
+        await calls(client, count)
+    finally:
+        await client.close()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    count = int(argv[1]) if len(argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        path = argv[2] if len(argv) > 2 else \
+            os.path.join(directory, 'bench.log.gz')
+        url, recorded = asyncio.run(record(path, count))
+        print("%d calls, log of %d bytes" % (count, os.path.getsize(path)))
+        print("%-10s %8.1f us/call" % ("loopback", recorded / count * 1e6))
+        replayed = asyncio.run(replay(path, url, count))
+        print("%-10s %8.1f us/call" % ("replay", replayed / count * 1e6))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Attaching worker processes to a dumped spec vs. loading it in each.
+
+Usage: python -m benchmarks.bench_snapshot [workers]
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.spec import make_resource_listing, fresh
+from swaggerpy3.client import SwaggerClient, load_spec
+from swaggerpy3.compact import CompiledSpec
+
+_client = None
+
+
+def attach(buf):
+    """ProcessPoolExecutor initializer: bind a client to the dumped spec.
+    """
+    global _client
+    _client = SwaggerClient()
+    _client.bind(CompiledSpec.loads(buf))
+
+
+def load(listing):
+    """ProcessPoolExecutor initializer: load the spec from scratch.
+    """
+    global _client
+    _client = SwaggerClient()
+    asyncio.run(_client.connect(listing))
+
+
+def operation_count(_):
+    return sum(len(r.operation_index) for r in _client.resources.values())
+
+
+def run_pool(workers, initializer, initarg):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=initializer,
+                             initargs=(initarg,)) as pool:
+        list(pool.map(operation_count, range(workers)))
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    workers = int(argv[1]) if len(argv) > 1 else 4
+    logging.disable(logging.INFO)
+    listing = make_resource_listing()
+    spec = asyncio.run(load_spec(fresh(listing)))
+    buf = spec.dumps()
+    print("JSON %8d bytes, dumped spec %8d bytes" %
+          (len(json.dumps(listing)), len(buf)))
+
+    count = 100
+    start = time.perf_counter()
+    for _ in range(count):
+        asyncio.run(load_spec(fresh(listing)))
+    print("load_spec()           %10.1f us" %
+          ((time.perf_counter() - start) / count * 1e6))
+    start = time.perf_counter()
+    for _ in range(count):
+        CompiledSpec.loads(buf)
+    print("CompiledSpec.loads()  %10.1f us" %
+          ((time.perf_counter() - start) / count * 1e6))
+
+    print("%d workers loading    %10.1f ms" %
+          (workers, run_pool(workers, load, listing) * 1e3))
+    print("%d workers attaching  %10.1f ms" %
+          (workers, run_pool(workers, attach, buf) * 1e3))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Throughput of blocking calls from many threads.
+
+Compares a fresh event loop and client per call (asyncio.run) with one
+SyncSwaggerClient shared by all threads, against a loopback server.
+
+Usage: python -m benchmarks.bench_sync [threads] [calls]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.sync_client import SyncSwaggerClient
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+async def get_pet(request):
+    return web.json_response({'id': request.match_info['petId']})
+
+
+def per_call_asyncio_run(base_path):
+    async def call(pet_id):
+        client = SwaggerClient()
+        await client.connect(resource_listing(base_path))
+        try:
+            resp = await client.pet.getPet(petId=pet_id)
+            return await resp.json()
+        finally:
+            await client.close()
+
+    return lambda pet_id: asyncio.run(call(pet_id))
+
+
+def shared_sync_client(base_path):
+    client = SyncSwaggerClient()
+    client.connect(resource_listing(base_path))
+    return lambda pet_id: client.run(client.pet.getPet(petId=pet_id).json())
+
+
+def measure(call, threads, calls):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    threads = int(argv[1]) if len(argv) > 1 else 8
+    calls = int(argv[2]) if len(argv) > 2 else 2000
+    logging.disable(logging.INFO)
+
+    app = web.Application()
+    app.router.add_get('/pet/{petId}', get_pet)
+    base_path, stop = start_server(app)
+    try:
+        for (name, factory) in [("asyncio.run per call", per_call_asyncio_run),
+                                ("SyncSwaggerClient", shared_sync_client)]:
+            rate = measure(factory(base_path), threads, calls)
+            print("%-22s %8.0f calls/s (%d threads)" % (name, rate, threads))
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Operation calls over loopback TCP, a Unix socket, and in process.
+
+The stub server of test-data/1.1/simple is called through each transport,
+one call at a time (latency), then by concurrent callers (throughput).
+The ASGI transport calls an ASGI version of the stub, serving the same
+responses.
+
+Usage: python -m benchmarks.bench_transport [calls] [concurrency]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import urllib.parse
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.loadgen import LoadGenerator
+from swaggerpy3.stub import (LISTING_PATH, StubServer, load_definition,
+                             synthesize)
+from swaggerpy3.transport import AppTransport, AsgiTransport, UnixTransport
+
+RESOURCES = 'test-data/1.1/simple/resources.json'
+OPERATION = 'simple.getAsteriskInfo'
+
+
+def asgi_stub(resources_file, origin='http://service'):
+    """Builds an ASGI application answering like a StubServer.
+
+    Only paths without path parameters are served.
+    """
+    listing = load_definition(resources_file)
+    rng = random.Random()
+    documents = {}
+    operations = {}
+    for api in listing['apis']:
+        declaration = api.pop('api_declaration')
+        prefix = urllib.parse.urlsplit(
+            declaration.get('basePath') or '').path.rstrip('/')
+        path = '/api-docs/' + \
+            api['path'].replace('{format}', 'json').strip('/')
+        documents[path] = dict(declaration, basePath=origin + prefix)
+        models = declaration.get('models') or {}
+        for entry in declaration.get('apis') or []:
+            for operation in entry.get('operations') or []:
+                operations[prefix + entry['path']] = \
+                    (operation.get('responseClass'), models)
+    documents[LISTING_PATH] = dict(listing, basePath=origin + '/api-docs')
+    documents = {path: json.dumps(document).encode('utf-8')
+                 for (path, document) in documents.items()}
+
+    async def app(scope, receive, send):
+        await receive()
+        path = scope['path']
+        if path in documents:
+            status, body = 200, documents[path]
+        elif path in operations:
+            response_class, models = operations[path]
+            status = 200
+            body = json.dumps(synthesize(response_class, models, rng))
+            body = body.encode('utf-8')
+        else:
+            status, body = 404, b'{}'
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    return app
+
+
+async def measure(url, transport, calls, concurrency):
+    client = SwaggerClient()
+    await client.connect(url, http_client=AsyncHttpClient(
+        transport=transport))
+    try:
+        operation = client.simple.getAsteriskInfo
+        for _ in range(100):
+            await operation(test_param='foo')
+        start = time.perf_counter()
+        for _ in range(calls):
+            await operation(test_param='foo')
+        latency = (time.perf_counter() - start) / calls
+        report = await LoadGenerator(
+            client, [OPERATION], {'test_param': 'foo'},
+            concurrency=concurrency, requests=calls).run()
+    finally:
+        await client.close()
+    return latency, report
+
+
+async def tcp(calls, concurrency):
+    stub = StubServer(RESOURCES)
+    url = await stub.start()
+    try:
+        return await measure(url, None, calls, concurrency)
+    finally:
+        await stub.close()
+
+
+async def unix(calls, concurrency):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stub.sock')
+        runner = web.AppRunner(StubServer(RESOURCES).app())
+        await runner.setup()
+        await web.UnixSite(runner, path).start()
+        try:
+            return await measure('http://service' + LISTING_PATH,
+                                 UnixTransport(path), calls, concurrency)
+        finally:
+            await runner.cleanup()
+
+
+async def app(calls, concurrency):
+    return await measure('http://service' + LISTING_PATH,
+                         AppTransport(StubServer(RESOURCES).app()),
+                         calls, concurrency)
+
+
+async def asgi(calls, concurrency):
+    return await measure('http://service' + LISTING_PATH,
+                         AsgiTransport(asgi_stub(RESOURCES)),
+                         calls, concurrency)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    calls = int(argv[1]) if len(argv) > 1 else 2000
+    concurrency = int(argv[2]) if len(argv) > 2 else 10
+    logging.disable(logging.INFO)
+    print("%-6s %12s %14s" % ("", "us/call", "rps (c=%d)" % concurrency))
+    for (name, run) in [('tcp', tcp), ('unix', unix), ('app', app),
+                        ('asgi', asgi)]:
+        latency, report = asyncio.run(run(calls, concurrency))
+        if report.error_count:
+            print("%-6s %d errors" % (name, report.error_count))
+        print("%-6s %12.1f %14.0f" % (name, latency * 1e6, report.rps))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
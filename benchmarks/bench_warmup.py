@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Latency of the first call after connect, with and without warm-up.
+
+Usage: python -m benchmarks.bench_warmup [runs]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+async def get_pet(request):
+    return web.json_response({'id': request.match_info['petId']})
+
+
+async def first_calls(base_path, warmup, calls=3):
+    client = SwaggerClient()
+    await client.connect(resource_listing(base_path), warmup=warmup)
+    latencies = []
+    try:
+        for i in range(calls):
+            start = time.perf_counter()
+            await client.pet.getPet(petId=i)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+    return latencies
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    runs = int(argv[1]) if len(argv) > 1 else 20
+    logging.disable(logging.INFO)
+    app = web.Application()
+    app.router.add_get('/pet/{petId}', get_pet)
+    base_path, stop = start_server(app)
+    try:
+        for warmup in (0, 1):
+            totals = None
+            for _ in range(runs):
+                latencies = asyncio.run(first_calls(base_path, warmup))
+                totals = latencies if totals is None else \
+                    [a + b for (a, b) in zip(totals, latencies)]
+            print("warmup=%d  " % warmup + "  ".join(
+                "call %d %6.0f us" % (i + 1, t / runs * 1e6)
+                for (i, t) in enumerate(totals)))
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
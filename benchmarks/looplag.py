@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Event loop lag measurement for the benchmarks.
+"""
+
+import asyncio
+import time
+
+
+class LoopLagMonitor(object):
+    """Measures how late a periodic timer fires on the running loop.
+
+    A loop that is blocked by other work wakes the timer late; the lateness
+    is the stall other tasks (such as websocket event handling) would see.
+
+    ::
+
+        async with LoopLagMonitor() as lag:
+            await work()
+        print(lag)
+
+    :param interval: Seconds between two samples.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = []
+        self.task = None
+        self.expected = None
+
+    def __repr__(self):
+        return "max %.1fms, p99 %.1fms over %d samples" % (
+            self.max * 1e3, self.percentile(99) * 1e3, len(self.samples))
+
+    async def __aenter__(self):
+        self.task = asyncio.ensure_future(self._run())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # The timer may not have had a chance to fire at all
+        self.samples.append(max(0.0, time.perf_counter() - self.expected))
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        clock = time.perf_counter
+        while True:
+            self.expected = clock() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, clock() - self.expected))
+
+    @property
+    def max(self):
+        return max(self.samples) if self.samples else 0.0
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
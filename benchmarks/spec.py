@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Synthetic, ARI shaped resource listings for the benchmarks.
+"""
+
+import copy
+
+ARI_RESOURCES = [
+    'asterisk', 'endpoints', 'channels', 'bridges', 'recordings', 'sounds',
+    'playbacks', 'deviceStates', 'mailboxes', 'events', 'applications',
+]
+
+BASE_PATH = "http://localhost:8088/ari"
+
+
+def make_operation(resource, index, http_method):
+    """Builds an operation, documented the way ARI documents them.
+    """
+    nickname = "%s%s%d" % (http_method.lower(), resource.capitalize(), index)
+    return {
+        "httpMethod": http_method,
+        "summary": "Operation %s on %s." % (nickname, resource),
+        "notes": "Long form notes for %s. " % nickname * 4,
+        "nickname": nickname,
+        "responseClass": "%sModel" % resource.capitalize(),
+        "parameters": [
+            {
+                "name": "%sId" % resource,
+                "description": "The %s's id" % resource,
+                "paramType": "path",
+                "required": True,
+                "allowMultiple": False,
+                "dataType": "string"
+            },
+            {
+                "name": "media",
+                "description": "Media URIs to play.",
+                "paramType": "query",
+                "required": False,
+                "allowMultiple": True,
+                "dataType": "string"
+            },
+            {
+                "name": "direction",
+                "description": "Direction of the operation.",
+                "paramType": "query",
+                "required": False,
+                "allowMultiple": False,
+                "dataType": "string",
+                "defaultValue": "both",
+                "allowableValues": {
+                    "valueType": "LIST",
+                    "values": ["both", "in", "out"]
+                }
+            }
+        ],
+        "errorResponses": [
+            {"code": 400, "reason": "Invalid parameters"},
+            {"code": 404, "reason": "%s not found" % resource},
+            {"code": 409, "reason": "%s not in a Stasis application" %
+                                    resource}
+        ]
+    }
+
+
+def make_api_declaration(resource, apis, operations_per_api):
+    """Builds the API declaration for one resource.
+    """
+    methods = ['GET', 'POST', 'DELETE', 'PUT']
+    model = "%sModel" % resource.capitalize()
+    return {
+        "swaggerVersion": "1.1",
+        "basePath": BASE_PATH,
+        "resourcePath": "/api-docs/%s.{format}" % resource,
+        "apis": [
+            {
+                "path": "/%s/{%sId}/path%d" % (resource, resource, i),
+                "description": "Path %d of %s" % (i, resource),
+                "operations": [
+                    make_operation(resource, i * operations_per_api + j,
+                                   methods[j % len(methods)])
+                    for j in range(operations_per_api)
+                ]
+            }
+            for i in range(apis)
+        ],
+        "models": {
+            model: {
+                "id": model,
+                "description": "A %s." % resource,
+                "properties": {
+                    "field%d" % i: {
+                        "type": "string",
+                        "required": True,
+                        "description": "Field %d of %s." % (i, model)
+                    }
+                    for i in range(10)
+                }
+            }
+        }
+    }
+
+
+def make_resource_listing(resources=len(ARI_RESOURCES), apis=5,
+                          operations_per_api=2):
+    """Builds a fully loaded resource listing, with api_declaration's.
+
+    :param resources: Number of resources to generate.
+    :param apis: Number of apis in each resource.
+    :param operations_per_api: Number of operations per api.
+    :return: Resource listing, ready for SwaggerClient.connect()
+    """
+    names = [ARI_RESOURCES[i % len(ARI_RESOURCES)] +
+             ('' if i < len(ARI_RESOURCES) else str(i))
+             for i in range(resources)]
+    return {
+        "swaggerVersion": "1.1",
+        "basePath": BASE_PATH,
+        "apis": [
+            {
+                "path": "/api-docs/%s.{format}" % name,
+                "description": "Resource %s" % name,
+                "api_declaration": make_api_declaration(
+                    name, apis, operations_per_api)
+            }
+            for name in names
+        ]
+    }
+
+
+def fresh(resource_listing):
+    """Deep copy of a resource listing, as if it had just been loaded.
+    """
+    return copy.deepcopy(resource_listing)
@@ -32,9 +32,15 @@ setup(
         "Programming Language :: Python",
     ],
     tests_require=["nose", "tissue", "coverage", "httpretty"],
-    install_requires=["aiohttp"],
+    # transport.AppTransport relies on aiohttp 3.x internals
+    install_requires=["aiohttp>=3.8,<4"],
+    extras_require={
+        # Lazy views of JSON responses (swaggerpy3.lazy_json)
+        "simdjson": ["pysimdjson"],
+    },
     entry_points="""
     [console_scripts]
     swagger-codegen = swaggerpy3.codegen:main
+    swagger-stub = swaggerpy3.stub:main
     """
 )
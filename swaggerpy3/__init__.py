@@ -9,7 +9,34 @@ More information on Swagger can be found `on the Swagger website
 <https://developers.helloreverb.com/swagger/>`
 """
 
-__all__ = ["client", "codegen", "processors", "swagger_model"]
+__all__ = ["client", "codegen", "compact", "processors", "swagger_model"]
 
-from swaggerpy3.swagger_model import load_file, load_json, load_url, Loader
-from swaggerpy3.processors import SwaggerProcessor, SwaggerError
+import importlib
+
+# Submodules, and aiohttp with them, are imported on first use, so that
+# importing the package (say, for swagger-codegen) stays cheap.
+_LAZY = {
+    'load_file': 'swagger_model',
+    'load_json': 'swagger_model',
+    'load_url': 'swagger_model',
+    'Loader': 'swagger_model',
+    'SwaggerProcessor': 'processors',
+    'SwaggerError': 'processors',
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module('.' + module, __name__), name)
+    elif name in __all__:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError(
+            "module '%s' has no attribute '%s'" % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(__all__))
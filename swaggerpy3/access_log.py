@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Sampled, batched access log of operation calls.
+
+An AccessLog set as the 'access_log' setting of operations records a
+sample of their calls::
+
+    client.configure(access_log=AccessLog(sample=0.05))
+    client.configure('originate', access_log=AccessLog())
+
+Each record holds the nickname and method of the operation, the URL called
+(without its query string), the response status (None when no response
+was received), the latency in seconds and the size of the response body.
+
+Recording a call only appends a tuple to a buffer. A background task hands
+the buffered records to the sink in batches, every flush_interval seconds
+or as soon as batch_size records are waiting. The default sink writes one
+JSON line per record to the 'swaggerpy3.access' logger, from the loop's
+default executor, so slow log handlers don't block the event loop. When
+max_buffered records are waiting, new ones are dropped, and counted.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import random
+
+#: Fields of a record
+FIELDS = ('nickname', 'method', 'url', 'status', 'latency', 'bytes')
+
+
+class AccessLog(object):
+    """Access log of the calls of operations.
+
+    :param sample: Fraction of the calls recorded, between 0 and 1.
+    :param sink: Function called with each batch, as a list of dicts;
+                 coroutine functions are awaited. By default, records are
+                 written to the 'swaggerpy3.access' logger.
+    :param batch_size: Number of records that triggers a flush.
+    :param flush_interval: Maximum number of seconds a record is buffered.
+    :param max_buffered: Maximum number of records waiting to be flushed.
+    :param rng: random.Random instance, for testing.
+    """
+
+    def __init__(self, sample=1.0, sink=None, batch_size=100,
+                 flush_interval=1.0, max_buffered=10000, rng=None):
+        if not 0 <= sample <= 1:
+            raise ValueError("sample must be between 0 and 1")
+        self.sample = sample
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.rng = rng or random.Random()
+        self.logger = logging.getLogger('swaggerpy3.access')
+        self.buffer = []
+        self.task = None
+        self.wakeup = None
+        #: Number of calls recorded
+        self.recorded = 0
+        #: Number of records dropped because the buffer was full
+        self.dropped = 0
+        #: Number of records handed to the sink
+        self.emitted = 0
+
+    def __repr__(self):
+        return "%s(sample=%r, recorded=%d, dropped=%d)" % (
+            self.__class__.__name__, self.sample, self.recorded,
+            self.dropped)
+
+    def sampled(self):
+        """Decides whether to record a call, before it is made.
+        """
+        return self.sample >= 1 or self.rng.random() < self.sample
+
+    def record(self, nickname, method, url, status, latency, size):
+        """Buffers the record of a sampled call.
+
+        Must be called from the event loop.
+        """
+        if len(self.buffer) >= self.max_buffered:
+            self.dropped += 1
+            return
+        self.buffer.append((nickname, method, url, status, latency, size))
+        self.recorded += 1
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.ensure_future(self._run())
+        elif len(self.buffer) >= self.batch_size:
+            self.wakeup.set()
+
+    async def _run(self):
+        # Runs while there are records to flush
+        while self.buffer:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(),
+                                       self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Hands the buffered records to the sink.
+        """
+        batch = self.buffer
+        if not batch:
+            return
+        self.buffer = []
+        records = [dict(zip(FIELDS, record)) for record in batch]
+        self.emitted += len(records)
+        try:
+            if self.sink is None:
+                if not self.logger.isEnabledFor(logging.INFO):
+                    return
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write, records)
+            else:
+                result = self.sink(records)
+                if inspect.isawaitable(result):
+                    await result
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.logger.exception("Failed to emit %d access log records" %
+                                  len(records))
+
+    def _write(self, records):
+        for record in records:
+            self.logger.info(json.dumps(record))
+
+    async def close(self):
+        """Flushes the remaining records, and waits for the background task.
+        """
+        if self.task is not None and not self.task.done():
+            self.wakeup.set()
+            await self.task
+        self.task = None
+        await self.flush()
@@ -0,0 +1,174 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Client-side load balancing across replicas of an API.
+
+A Balancer spreads the calls of a client across several base URLs serving
+the same API, replacing the basePath of the API declarations::
+
+    await client.connect(url, base_url=Balancer([
+        "http://ari1:8088/ari", "http://ari2:8088/ari"]))
+
+Hosts are picked by least outstanding requests, or by the power of two
+random choices. Hosts that fail repeatedly, or answer too slowly, are
+ejected for a while. A call may give an affinity key, so that calls with
+the same key (say, a channel id) stick to the same host::
+
+    await client.channels.answer(channelId=channel_id, _affinity=channel_id)
+
+Affinity uses rendezvous hashing, so ejecting or restoring a host only moves
+the keys of that host.
+"""
+
+import hashlib
+import random
+import time
+
+LEAST_OUTSTANDING = 'least_outstanding'
+POWER_OF_TWO = 'p2c'
+
+
+class Host(object):
+    """A base URL, with the state the balancer keeps about it.
+
+    :param url: Base URL of the host.
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        #: Number of calls in flight
+        self.outstanding = 0
+        #: Number of failures since the last success
+        self.failures = 0
+        #: Moving average of the latency of successful calls, in seconds
+        self.latency = None
+        #: Clock time until which the host is ejected
+        self.ejected_until = 0.0
+        #: Number of calls made to this host
+        self.calls = 0
+
+    def __repr__(self):
+        return "Host(%s, outstanding=%d, failures=%d)" % (
+            self.url, self.outstanding, self.failures)
+
+
+class Balancer(object):
+    """Picks the base URL of each call.
+
+    :param base_urls: Base URLs of the replicas.
+    :param strategy: LEAST_OUTSTANDING or POWER_OF_TWO.
+    :param max_failures: Consecutive failures after which a host is ejected.
+    :param max_latency: If set, a host whose average latency exceeds this
+                        many seconds is ejected.
+    :param eject_time: Seconds a host stays ejected.
+    :param decay: Weight of the latest call in the latency average.
+    :param clock: Time source, for testing.
+    :param rng: random.Random instance, for testing.
+    """
+
+    def __init__(self, base_urls, strategy=LEAST_OUTSTANDING,
+                 max_failures=3, max_latency=None, eject_time=10.0,
+                 decay=0.2, clock=time.monotonic, rng=None):
+        if not base_urls:
+            raise ValueError("Balancer requires at least one base URL")
+        if strategy not in (LEAST_OUTSTANDING, POWER_OF_TWO):
+            raise ValueError("Unknown balancing strategy '%s'" % strategy)
+        self.hosts = [Host(url) for url in base_urls]
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.max_latency = max_latency
+        self.eject_time = eject_time
+        self.decay = decay
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.hosts)
+
+    def available(self):
+        """Returns the hosts that are not ejected.
+
+        If every host is ejected, all of them are returned; failing calls
+        are better than no calls at all.
+        """
+        now = self.clock()
+        hosts = [h for h in self.hosts if h.ejected_until <= now]
+        return hosts or self.hosts
+
+    def choose(self, affinity=None):
+        """Picks the host for a call.
+
+        :param affinity: Optional affinity key of the call.
+        :rtype: Host
+        """
+        hosts = self.available()
+        if len(hosts) == 1:
+            return hosts[0]
+        if affinity is not None:
+            return max(hosts, key=lambda h: _score(h.url, affinity))
+        if self.strategy == POWER_OF_TWO:
+            first, second = self.rng.sample(hosts, 2)
+            return first if _load(first) <= _load(second) else second
+        least = min(h.outstanding for h in hosts)
+        return self.rng.choice([h for h in hosts if h.outstanding == least])
+
+    def start(self, host):
+        """Records the start of a call.
+
+        :param host: Host chosen for the call.
+        :return: Start time, to pass to finish().
+        """
+        host.outstanding += 1
+        host.calls += 1
+        return self.clock()
+
+    def finish(self, host, start, failed):
+        """Records the end of a call, ejecting the host if need be.
+
+        :param host: Host of the call.
+        :param start: Value returned by start().
+        :param failed: True if the call failed because of the host, None if
+                       its outcome says nothing about the host (say, it
+                       was cancelled).
+        """
+        now = self.clock()
+        host.outstanding -= 1
+        if failed is None:
+            return
+        if failed:
+            host.failures += 1
+            if host.failures >= self.max_failures:
+                self.eject(host, now)
+            return
+        host.failures = 0
+        elapsed = now - start
+        if host.latency is None:
+            host.latency = elapsed
+        else:
+            host.latency += self.decay * (elapsed - host.latency)
+        if self.max_latency is not None and host.latency > self.max_latency:
+            self.eject(host, now)
+
+    def eject(self, host, now):
+        """Takes a host out of rotation for eject_time seconds.
+
+        Its failure count and latency are reset, so it gets a fresh start.
+        """
+        host.ejected_until = now + self.eject_time
+        host.failures = 0
+        host.latency = None
+
+
+def _load(host):
+    """Expected cost of sending one more call to a host.
+    """
+    return (host.outstanding + 1) * (host.latency or 0.0) + host.outstanding
+
+
+def _score(url, affinity):
+    """Rendezvous hashing score of a host for an affinity key.
+    """
+    digest = hashlib.blake2b(("%s|%s" % (url, affinity)).encode('utf-8'),
+                             digest_size=16)
+    return digest.digest()
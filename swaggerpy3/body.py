@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Request body encoding for operations.
+
+Parameters of type 'body' may be given as:
+
+ * a dict, encoded as JSON; several dict body parameters are merged.
+ * bytes, bytearray or memoryview, sent as is without copying.
+ * a file object, streamed in chunks rather than read into memory.
+ * an async iterable (such as an async generator) of bytes, streamed with
+   chunked transfer encoding.
+ * an aiohttp FormData or MultipartWriter, for full control.
+
+Parameters of type 'form' are sent url encoded, unless one of them is a
+file, bytes or async iterable, in which case the form is sent as a
+streamed multipart/form-data upload.
+"""
+
+import io
+import json
+import os
+
+#: Content type of raw bodies, unless the operation declares another one.
+DEFAULT_CONTENT_TYPE = 'application/octet-stream'
+
+
+def is_raw(value):
+    """Tests whether a parameter value is sent as is, rather than encoded.
+
+    :param value: Parameter value.
+    :return: True for bytes-like, file, async iterable and aiohttp bodies.
+    """
+    import aiohttp
+    return isinstance(value, (bytes, bytearray, memoryview, io.IOBase,
+                              aiohttp.FormData, aiohttp.MultipartWriter)) or \
+        hasattr(value, '__aiter__')
+
+
+def part_filename(value):
+    """Filename to send for a multipart part, if it is a named file.
+
+    :param value: Part value.
+    :return: Base name of the file, or None.
+    """
+    name = getattr(value, 'name', None)
+    if isinstance(name, str):
+        return os.path.basename(name)
+    return None
+
+
+def multipart_body(form):
+    """Builds a streamed multipart/form-data body.
+
+    :param form: List of (name, value) form fields.
+    :rtype: aiohttp.MultipartWriter
+    """
+    import aiohttp
+    writer = aiohttp.MultipartWriter('form-data')
+    for (name, value) in form:
+        if not is_raw(value):
+            value = str(value)
+        part = writer.append(value)
+        filename = part_filename(value)
+        if filename:
+            part.set_content_disposition('form-data', name=name,
+                                         filename=filename)
+        else:
+            part.set_content_disposition('form-data', name=name)
+    return writer
+
+
+def build_body(json_body=None, raw_body=None, form=None, content_type=None):
+    """Builds the data and headers of a request.
+
+    :param json_body: Merged dict body parameters, or their JSON encoding.
+    :param raw_body: Body sent as is (see is_raw()).
+    :param form: List of (name, value) form parameters.
+    :param content_type: Content type for raw bodies, defaults to
+                         DEFAULT_CONTENT_TYPE.
+    :return: (data, headers) for AsyncHttpClient.request(); both may be None.
+    :raise TypeError: If a raw body is combined with other body parameters.
+    """
+    if raw_body is not None:
+        import aiohttp
+        if json_body is not None or form:
+            raise TypeError(
+                "Streamed bodies can't be combined with other body "
+                "parameters")
+        if isinstance(raw_body, (aiohttp.FormData, aiohttp.MultipartWriter)):
+            # These carry their own content type
+            return raw_body, None
+        return raw_body, {
+            'Content-Type': content_type or DEFAULT_CONTENT_TYPE}
+    if form:
+        if json_body is not None:
+            raise TypeError(
+                "Form parameters can't be combined with body parameters")
+        if any(is_raw(value) for (_, value) in form):
+            return multipart_body(form), None
+        return dict(form), None
+    if json_body:
+        if not isinstance(json_body, str):
+            json_body = json.dumps(json_body)
+        return json_body, {'Content-type': 'application/json',
+                                       'Accept': 'application/json'}
+    return None, None
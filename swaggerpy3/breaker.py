@@ -0,0 +1,216 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Circuit breakers for AsyncHttpClient.
+
+A circuit breaker watches the outcome of the last calls to a host. While it
+is closed, calls go through. When too many of them fail, or are too slow, it
+opens: calls fail at once with CircuitOpenError, instead of waiting for
+connection timeouts. After open_time seconds it is half-open, and lets a few
+probe calls through; it closes again if they succeed, and reopens if not.
+
+::
+
+    breakers = CircuitBreakers(error_rate=0.5, max_latency=2.0)
+    client = SwaggerClient()
+    await client.connect(url, http_client=AsyncHttpClient(breakers=breakers))
+    breakers.metrics()
+
+With per_operation=True, each operation of each host gets its own breaker.
+"""
+
+import collections
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while its circuit is open.
+
+    :param key: Key of the breaker.
+    :param retry_after: Seconds until the breaker lets calls through.
+    """
+
+    def __init__(self, key, retry_after):
+        super(CircuitOpenError, self).__init__(key, retry_after)
+        self.key = key
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return "Circuit open for %s, retry in %.1fs" % (
+            self.key, self.retry_after)
+
+
+class CircuitBreaker(object):
+    """Circuit breaker for one host, or one operation of a host.
+
+    :param key: Key of the breaker, for errors and metrics.
+    :param window: Number of recent calls the rates are computed on.
+    :param min_calls: Calls needed in the window before the breaker opens.
+    :param error_rate: Rate of failed calls opening the breaker.
+    :param max_latency: If set, calls taking longer than this many seconds
+                        are slow.
+    :param slow_rate: Rate of slow calls opening the breaker.
+    :param open_time: Seconds the breaker stays open.
+    :param probes: Number of calls let through, and required to succeed,
+                   while half-open.
+    :param clock: Time source, for testing.
+    :param listener: Optional function called with (breaker, old state,
+                     new state) on every transition.
+    """
+
+    def __init__(self, key, window=20, min_calls=10, error_rate=0.5,
+                 max_latency=None, slow_rate=0.5, open_time=30.0, probes=1,
+                 clock=time.monotonic, listener=None):
+        self.key = key
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.max_latency = max_latency
+        self.slow_rate = slow_rate
+        self.open_time = open_time
+        self.probes = probes
+        self.clock = clock
+        self.listener = listener
+        self.state = CLOSED
+        #: (failed, slow) outcomes of the last calls, while closed
+        self.outcomes = collections.deque(maxlen=window)
+        self.opened_at = 0.0
+        self.probing = 0
+        self.probed = 0
+        #: Number of calls made
+        self.calls = 0
+        #: Number of failed calls
+        self.failures = 0
+        #: Number of slow calls
+        self.slow_calls = 0
+        #: Number of calls rejected while open
+        self.rejected = 0
+        #: Number of transitions, by (old state, new state)
+        self.transitions = collections.Counter()
+
+    def __repr__(self):
+        return "%s(%s, %s)" % (self.__class__.__name__, self.key, self.state)
+
+    def before_call(self):
+        """Checks that a call may go through, and records its start.
+
+        :return: Start time, to pass to after_call().
+        :raise CircuitOpenError: If the call may not go through.
+        """
+        now = self.clock()
+        if self.state == OPEN:
+            if now < self.opened_at + self.open_time:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    self.key, self.opened_at + self.open_time - now)
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self.probing >= self.probes - self.probed:
+                self.rejected += 1
+                raise CircuitOpenError(self.key, 0.0)
+            self.probing += 1
+        self.calls += 1
+        return now
+
+    def after_call(self, start, failed):
+        """Records the outcome of a call.
+
+        :param start: Value returned by before_call().
+        :param failed: True if the call failed, None if it was cancelled.
+        """
+        if failed is None:
+            if self.state == HALF_OPEN:
+                self.probing -= 1
+            return
+        slow = self.max_latency is not None and \
+            self.clock() - start > self.max_latency
+        self.failures += failed
+        self.slow_calls += slow
+        if self.state == HALF_OPEN:
+            self.probing -= 1
+            if failed or slow:
+                self._open()
+            else:
+                self.probed += 1
+                if self.probed >= self.probes:
+                    self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            # A call started before the breaker opened
+            return
+        self.outcomes.append((failed, slow))
+        n = len(self.outcomes)
+        if n < self.min_calls:
+            return
+        if sum(f for (f, _) in self.outcomes) >= self.error_rate * n or \
+                sum(s for (_, s) in self.outcomes) >= self.slow_rate * n:
+            self._open()
+
+    def _open(self):
+        self.opened_at = self.clock()
+        self._transition(OPEN)
+
+    def _transition(self, state):
+        old = self.state
+        self.state = state
+        self.outcomes.clear()
+        self.probing = self.probed = 0
+        self.transitions[(old, state)] += 1
+        if self.listener is not None:
+            self.listener(self, old, state)
+
+    def metrics(self):
+        """Returns the state and counters of the breaker, as a dict.
+        """
+        return {
+            'state': self.state,
+            'calls': self.calls,
+            'failures': self.failures,
+            'slow_calls': self.slow_calls,
+            'rejected': self.rejected,
+            'transitions': {'%s->%s' % k: n
+                            for (k, n) in self.transitions.items()},
+        }
+
+
+class CircuitBreakers(object):
+    """Circuit breakers of an AsyncHttpClient, created on demand.
+
+    :param per_operation: If True, keep a breaker per (host, operation)
+                          rather than per host.
+    :param kwargs: CircuitBreaker arguments.
+    """
+
+    def __init__(self, per_operation=False, **kwargs):
+        self.per_operation = per_operation
+        self.options = kwargs
+        self.breakers = {}
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__,
+                           list(self.breakers.values()))
+
+    def get(self, host, operation=None):
+        """Gets the breaker guarding a call.
+
+        :param host: scheme://host:port of the call.
+        :param operation: Nickname of the operation called, if known.
+        :rtype: CircuitBreaker
+        """
+        key = host
+        if self.per_operation and operation is not None:
+            key = '%s %s' % (host, operation)
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(key, **self.options)
+        return breaker
+
+    def metrics(self):
+        """Returns the metrics of every breaker, by key.
+        """
+        return {key: breaker.metrics()
+                for (key, breaker) in self.breakers.items()}
@@ -1,20 +1,32 @@
 import os
 import re
+import json
+import time
+import asyncio
+import contextlib
 import logging
 import swaggerpy3
-import urllib.request, urllib.parse, urllib.error
-
+import urllib.parse
+
+from .balancer import Balancer
+from .body import build_body, is_raw
+from .breaker import CircuitOpenError
+from .deadline import DeadlineExceeded, call_timeouts, remaining
+from .pagination import Paginator, detect_paging
+from .compact import (CompiledSpec, ListingApiNode, ResourceListingNode,
+                      compact_api_declaration, compact_resource_listing,
+                      index_operations)
+from .swagger_model import declaration_hash
 from .http_client import AsyncHttpClient
 from .processors import WebsocketProcessor, SwaggerProcessor
 
-logging.basicConfig(level=logging.DEBUG)
 log = logging.getLogger(__name__)
 
 class ClientProcessor(SwaggerProcessor):
     """Enriches swagger models for client processing.
     """
 
-    async def process_resource_listing_api(self, resources, listing_api, context):
+    def process_resource_listing_api(self, resources, listing_api, context):
         """Add name to listing_api.
 
         :param resources: Resource listing object
@@ -25,105 +37,371 @@ class ClientProcessor(SwaggerProcessor):
         name, ext = os.path.splitext(os.path.basename(listing_api['path']))
         listing_api['name'] = name
 
+class OperationSettings(object):
+    """Settings of a client's operations, by nickname.
+
+    Settings given for the nickname None apply to every operation that does
+    not have its own value.
+    """
+
+    def __init__(self):
+        self.settings = {None: {}}
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.settings)
+
+    def update(self, nickname=None, **settings):
+        """Sets values for an operation, or for all operations.
+
+        :param nickname: Nickname of the operation, or None for all.
+        :param settings: Setting values.
+        """
+        self.settings.setdefault(nickname, {}).update(settings)
+
+    def get(self, nickname, name, default=None):
+        """Gets the value of a setting for an operation.
+
+        :param nickname: Nickname of the operation.
+        :param name: Name of the setting.
+        :param default: Value if neither the operation nor the defaults set it.
+        """
+        settings = self.settings.get(nickname)
+        if settings is not None and name in settings:
+            return settings[name]
+        return self.settings[None].get(name, default)
+
+    def values(self, name):
+        """Gets the distinct values of a setting, across all operations.
+
+        :param name: Name of the setting.
+        :return: List of the values other than None.
+        """
+        values = []
+        for settings in self.settings.values():
+            value = settings.get(name)
+            if value is not None and \
+                    not any(value is other for other in values):
+                values.append(value)
+        return values
+
+
 class Operation(object):
     """Operation object.
+
+    The fields needed to invoke the operation are extracted from its model
+    once, when the operation is built.
+
+    With a balancer, uri is the path of the operation, and every call is
+    sent to the base URL of the host the balancer picks.
     """
 
-    def __init__(self, uri, operation, http_client):
+    def __init__(self, uri, operation, http_client, settings=None,
+                 balancer=None, models=None):
         self.uri = uri
+        self.balancer = balancer
+        self.models = models
         self.json = operation
         self.http_client = http_client
+        if settings is None:
+            settings = OperationSettings()
+        self.settings = settings
+        self.nickname = operation['nickname']
+        self.method = operation['httpMethod']
+        self.is_websocket = operation.get('is_websocket', False)
+        consumes = operation.get('consumes')
+        self.content_type = consumes[0] if consumes else None
+        #: (name, paramType, required) of each parameter
+        self.parameters = tuple(
+            (param['name'], param['paramType'], bool(param.get('required')))
+            for param in operation.get('parameters') or ())
 
-    async def __repr__(self):
-        return "%s(%s)" % (self.__class__.__name__, self.json['nickname'])
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.nickname)
 
-    async def __call__(self, **kwargs):
+    async def __call__(self, _affinity=None, _timeout=None, _priority=None,
+                       _heartbeat=None, **kwargs):
         """Invoke ARI operation.
 
+        :param _affinity: Optional affinity key; with a balancer, calls with
+                          the same key go to the same host.
+        :param _timeout: Timeouts of this call (swaggerpy3.deadline.Timeouts,
+                         or seconds), overriding the operation's.
+        :param _priority: Priority class of this call, overriding the
+                          operation's; see swaggerpy3.scheduler.
+        :param _heartbeat: Seconds between pings of a websocket, overriding
+                           the operation's.
         :param kwargs: ARI operation arguments.
         :return: Implementation specific response or WebSocket connection
+        :raise swaggerpy3.deadline.DeadlineExceeded: If the current deadline
+                                                     has passed.
+        """
+        with self._span(self.nickname, method=self.method):
+            return await self._invoke(
+                _affinity, _timeout, _priority, _heartbeat, **kwargs)
+
+    async def _invoke(self, _affinity=None, _timeout=None, _priority=None,
+                      _heartbeat=None, **kwargs):
+        """Invoke ARI operation, within the span of the call.
         """
-        log.info("%s?%r" % (self.json['nickname'], urllib.parse.urlencode(kwargs)))
-        method = self.json['httpMethod']
+        call = self._call(_affinity, _timeout, _priority, _heartbeat, kwargs)
+        profiler = self.settings.get(self.nickname, 'profiler')
+        if profiler is None:
+            return await call
+        return await profiler.operation(self.nickname, call)
+
+    async def _call(self, _affinity, _timeout, _priority, _heartbeat, kwargs):
+        timeout = call_timeouts(
+            _timeout or self.settings.get(self.nickname, 'timeout'))
         uri = self.uri
         params = {}
-        data = None
-        headers = None
-        for param in self.json.get('parameters', []):
-            pname = param['name']
-            value = kwargs.get(pname)
+        json_body = None
+        raw_body = None
+        form = []
+        for (pname, param_type, required) in self.parameters:
+            value = kwargs.pop(pname, None)
             # Turn list params into comma separated values
             if isinstance(value, list):
                 value = ",".join(value)
 
             if value is not None:
-                if param['paramType'] == 'path':
+                if param_type == 'path':
                     uri = uri.replace('{%s}' % pname,
                         urllib.parse.quote_plus(str(value)))
-                elif param['paramType'] == 'query':
+                elif param_type == 'query':
                     params[pname] = value
-                elif param['paramType'] == 'body':
+                elif param_type == 'body':
                     if isinstance(value, dict):
-                        if data:
-                            data.update(value)
+                        if json_body:
+                            json_body = dict(json_body, **value)
                         else:
-                            data = value
+                            json_body = value
+                    elif is_raw(value):
+                        if raw_body is not None:
+                            raise TypeError(
+                                "'%s' accepts a single streamed body" %
+                                self.nickname)
+                        raw_body = value
                     else:
                         raise TypeError(
-                            "Parameters of type 'body' require dict input")
+                            "Parameters of type 'body' require dict, bytes, "
+                            "file or async iterable input")
+                elif param_type == 'form':
+                    form.append((pname, value))
                 else:
                     raise AssertionError(
-                        "Unsupported paramType %s" %
-                        param['paramType'])
-                del kwargs[pname]
-            else:
-                if param['required']:
-                    raise TypeError(
-                        "Missing required parameter '%s' for '%s'" %
-                        (pname, self.json['nickname']))
+                        "Unsupported paramType %s" % param_type)
+            elif required:
+                raise TypeError(
+                    "Missing required parameter '%s' for '%s'" %
+                    (pname, self.nickname))
         if kwargs:
             raise TypeError("'%s' does not have parameters %r" %
-                (self.json['nickname'], list(kwargs.keys())))
+                (self.nickname, list(kwargs.keys())))
+
+        log.debug("%s %s(%r)", self.method, uri, params)
+
+        offload = self.settings.get(self.nickname, 'offload')
+        if offload is not None and json_body:
+            json_body = await offload.encode(json_body)
+        data, headers = build_body(json_body, raw_body, form,
+                                   self.content_type)
+        compression = self.settings.get(self.nickname, 'compression')
+        if compression is not None:
+            data, headers = compression.encode_body(data, headers)
+
+        if self.is_websocket and data is not None:
+            raise NotImplementedError(
+                "Sending body data with websockets not implmented")
+        if self.is_websocket:
+            # Websockets are not scheduled; the option is their heartbeat
+            option = _heartbeat or \
+                self.settings.get(self.nickname, 'heartbeat')
+        else:
+            option = _priority or self.settings.get(self.nickname, 'priority')
+        if self.balancer is None:
+            return await self._send(
+                uri, params, data, headers, compression, timeout, option)
+
+        host = self.balancer.choose(_affinity)
+        start = self.balancer.start(host)
+        failed = None
+        try:
+            response = await self._send(
+                host.url + uri, params, data, headers, compression, timeout,
+                option)
+            failed = False
+            return response
+        except (CircuitOpenError, DeadlineExceeded):
+            # The call never reached the host
+            raise
+        except asyncio.TimeoutError:
+            # A timeout cut short by the caller's deadline says nothing of
+            # the host; only the operation's own timeouts count
+            left = remaining()
+            failed = left is None or left > 0
+            raise
+        except Exception as e:
+            # Client errors (4xx) are the caller's fault, not the host's
+            failed = getattr(e, 'status', 500) >= 500
+            raise
+        finally:
+            self.balancer.finish(host, start, failed)
+
+    async def decode(self, response):
+        """Decodes the JSON body of a response of this operation.
+
+        Large bodies are decoded according to the operation's 'offload'
+        setting; see swaggerpy3.offload.
+
+        :param response: Response of a call.
+        :return: Decoded body.
+        """
+        body = await response.read()
+        offload = self.settings.get(self.nickname, 'offload')
+        with self._span('decode', bytes=len(body)):
+            if offload is None:
+                return json.loads(body)
+            return await offload.decode(body)
 
-        log.info("%s %s(%r)", method, uri, params)
+    async def fetch(self, **kwargs):
+        """Invoke the operation, and decode its JSON response.
+
+        The decoding is traced within the span of the call.
+
+        :param kwargs: Operation.__call__() arguments.
+        :return: Decoded body.
+        """
+        with self._span(self.nickname, method=self.method):
+            return await self.decode(await self._invoke(**kwargs))
 
-        if data:
-            data = json.dumps(data)
-            headers = {'Content-type': 'application/json',
-                       'Accept': 'application/json'}
+    async def view(self, _fields=None, **kwargs):
+        """Invoke the operation, and view its JSON response lazily.
+
+        The view is only lazy with pysimdjson installed; see
+        swaggerpy3.lazy_json.
+
+        :param _fields: Names of the fields records are projected on, or
+                        True for the properties of the response model.
+        :param kwargs: Operation.__call__() arguments.
+        :return: View of the body; see swaggerpy3.lazy_json.
+        """
+        from .lazy_json import model_fields, view
+        if _fields is True:
+            _fields = model_fields(self.models, self.json.get('responseClass'))
+        with self._span(self.nickname, method=self.method):
+            response = await self._invoke(**kwargs)
+            body = await response.read()
+            with self._span('decode', bytes=len(body)):
+                return view(body, _fields)
+
+    def paginate(self, _page_size=None, _read_ahead=1, **kwargs):
+        """Iterate over the items of every page of a paged operation.
+
+        The paging convention is the operation's 'paging' setting, or is
+        recognized from its parameters; see swaggerpy3.pagination.
+
+        :param _page_size: Items per page, if the operation has a page size
+                           parameter not given in kwargs.
+        :param _read_ahead: Number of pages fetched ahead of the consumer.
+        :param kwargs: ARI operation arguments.
+        :rtype: swaggerpy3.pagination.Paginator
+        :raise TypeError: If the operation is not paged.
+        """
+        paging = self.settings.get(self.nickname, 'paging') or \
+            detect_paging(self.parameters)
+        if paging is None:
+            raise TypeError("'%s' has no paging parameters" % self.nickname)
+        return Paginator(self, paging, kwargs, _page_size, _read_ahead)
 
-        if self.json['is_websocket']:
+    def _span(self, name, **attributes):
+        """Opens a span of the HTTP client's tracer, if it has one.
+
+        :return: Context manager of the span.
+        """
+        tracer = getattr(self.http_client, 'tracer', None)
+        if tracer is None:
+            return contextlib.nullcontext()
+        return tracer.span(name, operation=self.nickname, **attributes)
+
+    async def _send(self, uri, params, data, headers, compression, timeout,
+                    option):
+        """Sends the request, or opens the websocket, of a call.
+
+        Sampled calls are recorded in the operation's access log.
+
+        :param option: Priority of a request, or heartbeat of a websocket.
+        """
+        access_log = self.settings.get(self.nickname, 'access_log')
+        if access_log is None or not access_log.sampled():
+            return await self._exchange(
+                uri, params, data, headers, compression, timeout, option)
+        start = time.perf_counter()
+        status = None
+        size = 0
+        try:
+            result = await self._exchange(
+                uri, params, data, headers, compression, timeout, option)
+            if self.is_websocket:
+                status = 101
+            else:
+                status = result.status
+                size = len(await result.read())
+            return result
+        except Exception as e:
+            status = getattr(e, 'status', None)
+            raise
+        finally:
+            access_log.record(self.nickname, self.method, uri, status,
+                              time.perf_counter() - start, size)
+
+    async def _exchange(self, uri, params, data, headers, compression,
+                        timeout, option):
+        if self.is_websocket:
             # Fix up http: URLs
             uri = re.sub('^http', "ws", uri)
-            if data:
-                raise NotImplementedError(
-                    "Sending body data with websockets not implmented")
-            return await self.http_client.ws_connect(uri, params=params)
-        else:
-            return await self.http_client.request(
-                method, 
-                uri, 
-                params=params, 
-                data=data, 
-                headers=headers
-            )
+            return await self.http_client.ws_connect(
+                uri, params=params, operation=self.nickname, timeout=timeout,
+                heartbeat=option)
+        response = await self.http_client.request(
+            self.method,
+            uri,
+            params=params,
+            data=data,
+            headers=headers,
+            operation=self.nickname,
+            timeout=timeout,
+            priority=option
+        )
+        if compression is not None:
+            compression.record_response(response, await response.read())
+        return response
 
 class Resource(object):
     """Swagger resource, described in an API declaration.
 
+    Operations are bound to the http_client on first access.
+
     :param resource: Resource model
     :param http_client: HTTP client API
+    :param base_url: Optional URL replacing the declaration's basePath, or a
+                     Balancer spreading calls across several base URLs.
+    :param operations: Optional operation index, as built by
+                       swaggerpy3.compact.index_operations().
+    :param settings: Settings of the client's operations.
+    :type  settings: OperationSettings
     """
 
-    def __init__(self, resource, http_client):
-        log.debug("Building resource '%s'" % resource['name'])
+    def __init__(self, resource, http_client, base_url=None,
+                 operations=None, settings=None):
+        log.debug("Building resource '%s'", resource['name'])
         self.json = resource
-        decl = resource['api_declaration']
         self.http_client = http_client
-        self.operations = {
-            oper['nickname']: self._build_operation(decl, api, oper)
-            for api in decl['apis']
-            for oper in api['operations']}
+        self.base_url = base_url
+        if operations is None:
+            operations = index_operations(resource)
+        self.operation_index = operations
+        self.settings = settings
+        self._operations = {}
 
     def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, self.json['name'])
@@ -141,6 +419,14 @@ class Resource(object):
                                  (self.get_name(), item))
         return op
 
+    @property
+    def operations(self):
+        """Dict of all operations of this resource, by nickname.
+        """
+        for name in self.operation_index:
+            self.get_operation(name)
+        return self._operations
+
     def get_operation(self, name):
         """Gets the operation with the given nickname.
 
@@ -148,7 +434,13 @@ class Resource(object):
         :rtype:  Operation
         :return: Operation, or None if not found.
         """
-        return self.operations.get(name)
+        op = self._operations.get(name)
+        if op is None:
+            entry = self.operation_index.get(name)
+            if entry is None:
+                return None
+            op = self._operations[name] = self._build_operation(*entry)
+        return op
 
     def get_name(self):
         """Returns the name of this resource.
@@ -159,49 +451,320 @@ class Resource(object):
         """
         return self.json.get('name')
 
-    def _build_operation(self, decl, api, operation):
+    def _build_operation(self, base_path, path, operation):
         """Build an operation object
 
-        :param decl: API declaration.
-        :param api: API entry.
+        :param base_path: API declaration's basePath.
+        :param path: Path of the API entry.
         :param operation: Operation.
         """
-        log.debug("Building operation %s.%s" % (
-            self.get_name(), operation['nickname']))
-        uri = decl['basePath'] + api['path']
-        return Operation(uri, operation, self.http_client)
+        models = self.json['api_declaration'].get('models')
+        if isinstance(self.base_url, Balancer):
+            return Operation(path, operation, self.http_client, self.settings,
+                             self.base_url, models)
+        uri = (self.base_url or base_path) + path
+        return Operation(uri, operation, self.http_client, self.settings,
+                         models=models)
+
+
+async def load_spec(url_or_resource, http_client=None):
+    """Load a resource listing into a spec shareable between clients.
+
+    :param url_or_resource: URL of the resource listing, or an already
+                            parsed resource listing.
+    :param http_client: HTTP client API used for loading.
+    :rtype: swaggerpy3.compact.CompiledSpec
+    """
+    if not http_client:
+        http_client = AsyncHttpClient()
+    return await SwaggerClient.build_loader(http_client).compile(
+        url_or_resource)
+
 
-        
 class SwaggerClient(object):
-    async def connect(self, url_or_resource, http_client=None):
-        if not http_client:
-            http_client = AsyncHttpClient()
-        self.http_client = http_client
+    """Client for a Swagger API.
 
-        loader = swaggerpy3.Loader(
+    Call connect() to load the API before using it. Clients connected to a
+    resource listing URL can reload it with refresh(), or periodically with
+    start_refresh().
+    """
+
+    def __init__(self):
+        self.http_client = None
+        self.api_docs = None
+        self.spec = None
+        self.resources = {}
+        self.url = None
+        self.base_url = None
+        self.compact = False
+        self.declaration_hashes = {}
+        self.refresh_task = None
+        self.loader_options = {}
+        self.processing_stats = None
+        self.settings = OperationSettings()
+
+    @staticmethod
+    def build_loader(http_client, **kwargs):
+        """Builds a Loader with the processors the client relies on.
+
+        :param http_client: HTTP client API
+        :param kwargs: Additional Loader arguments.
+        :rtype: swaggerpy3.Loader
+        """
+        return swaggerpy3.Loader(
             http_client,
             [
                 WebsocketProcessor(),
                 ClientProcessor()
-            ]
+            ],
+            **kwargs
         )
 
+    async def connect(self, url_or_resource, http_client=None, compact=False,
+                      base_url=None, time_budget=None, offload=False,
+                      warmup=0):
+        """Load the resource listing and build the resources.
+
+        :param url_or_resource: URL of the resource listing, an already
+                                parsed resource listing, or a CompiledSpec
+                                shared with other clients (see load_spec()).
+        :param http_client: HTTP client API
+        :param compact: If True, keep the processed model as compact,
+                        interned nodes without documentation fields (see
+                        swaggerpy3.compact).
+        :param base_url: Optional URL replacing the basePath of every API
+                         declaration; a list of URLs, or a
+                         swaggerpy3.balancer.Balancer, spreads the calls
+                         across several replicas of the API.
+        :param time_budget: If set, processing the API yields to the event
+                            loop whenever it has run for this many seconds.
+        :param offload: If True, process the API in a worker thread instead
+                        of on the event loop.
+        :param warmup: Number of connections to open to each host of the API
+                       before returning; see warmup().
+        """
+        profiler = self.settings.get(None, 'profiler')
+        connecting = self._connect(url_or_resource, http_client, compact,
+                                   base_url, time_budget, offload, warmup,
+                                   profiler)
+        if profiler is None:
+            return await connecting
+        profiler.begin('connect')
+        try:
+            await profiler.profile('connect', connecting)
+        finally:
+            profiler.end('connect')
+
+    async def _connect(self, url_or_resource, http_client, compact, base_url,
+                       time_budget, offload, warmup, profiler):
+        if isinstance(base_url, (list, tuple)):
+            base_url = Balancer(base_url)
+        if isinstance(url_or_resource, CompiledSpec):
+            self.bind(url_or_resource, http_client, base_url)
+            if warmup:
+                await self.warmup(warmup)
+            return
+
+        if not http_client:
+            http_client = AsyncHttpClient()
+        self.http_client = http_client
+        self.base_url = base_url
+        self.compact = compact
+        self.loader_options = {'time_budget': time_budget, 'offload': offload}
+
+        loader = self.build_loader(http_client, profiler=profiler,
+                                   **self.loader_options)
+
         if isinstance(url_or_resource, str):
             log.debug("Loading from %s" % url_or_resource)
-            self.api_docs = await loader.load_resource_listing(url_or_resource)
+            self.url = url_or_resource
+            self.api_docs = await loader.fetch_resource_listing(
+                url_or_resource)
+            self.declaration_hashes = {
+                api['path']: declaration_hash(api['api_declaration'])
+                for api in self.api_docs['apis']}
         else:
             log.debug("Loading from %s" % url_or_resource.get('basePath'))
             self.api_docs = url_or_resource
-            loader.process_resource_listing(self.api_docs)
+        await loader.process_resource_listing(self.api_docs)
+        self.processing_stats = loader.stats
+
+        if compact:
+            self.api_docs = await loader.compact(compact_resource_listing,
+                                                 self.api_docs)
 
         self.resources = {
-            resource['name']: Resource(resource, http_client)
+            resource['name']: Resource(resource, http_client, base_url,
+                                       settings=self.settings)
                    for resource in self.api_docs['apis']
         }
+        if warmup:
+            await self.warmup(warmup)
+
+    async def warmup(self, connections=1):
+        """Prepare the client so the first calls are as fast as later ones.
+
+        Every operation is built, and the given number of keep-alive
+        connections is opened to each distinct host the operations use.
+
+        :param connections: Number of connections to open per host.
+        :return: Dict of host URL to the number of connections opened.
+        """
+        hosts = set()
+        for resource in self.resources.values():
+            for operation in resource.operations.values():
+                if operation.balancer is None:
+                    urls = [operation.uri]
+                else:
+                    urls = [host.url for host in operation.balancer.hosts]
+                for url in urls:
+                    parts = urllib.parse.urlsplit(url)
+                    hosts.add(urllib.parse.urlunsplit(
+                        (parts.scheme, parts.netloc, '/', '', '')))
+        hosts = sorted(hosts)
+        opened = await asyncio.gather(
+            *[self.http_client.warmup(host, connections) for host in hosts])
+        log.debug("Warmed up %s" % ', '.join(
+            "%s (%d)" % pair for pair in zip(hosts, opened)))
+        return dict(zip(hosts, opened))
+
+    async def refresh(self):
+        """Reload the resource listing, rebuilding the changed resources.
+
+        API declarations are compared by content hash; only new or changed
+        ones are processed again. The rebuilt resources are swapped in at
+        once, and calls already in flight complete on the old ones.
+
+        :return: Names of the resources that were added, changed or removed.
+        :raise ValueError: If the client was not connected to a URL.
+        """
+        if not self.url:
+            raise ValueError("Only clients connected to a URL can refresh")
+
+        loader = self.build_loader(self.http_client, **self.loader_options)
+        listing = await loader.fetch_resource_listing(self.url)
+        hashes = {api['path']: declaration_hash(api['api_declaration'])
+                  for api in listing['apis']}
+        if hashes == self.declaration_hashes:
+            return []
+
+        changed = [api for api in listing['apis']
+                   if self.declaration_hashes.get(api['path']) !=
+                   hashes[api['path']]]
+        changed_paths = set(api['path'] for api in changed)
+        await loader.process_resource_listing(listing, changed)
+        self.processing_stats = loader.stats
+
+        # Keep the processed entries of unchanged declarations
+        current = {api['path']: api for api in self.api_docs['apis']}
+        apis = []
+        for api in listing['apis']:
+            if api['path'] in changed_paths:
+                if self.compact:
+                    api = ListingApiNode(
+                        api, api_declaration=await loader.compact(
+                            compact_api_declaration, api['api_declaration']))
+            else:
+                api = current[api['path']]
+            apis.append(api)
+
+        resources = {}
+        for api in apis:
+            resource = self.resources.get(api['name'])
+            if api['path'] in changed_paths or resource is None:
+                resource = Resource(api, self.http_client, self.base_url,
+                                    settings=self.settings)
+            resources[api['name']] = resource
+
+        if self.compact:
+            api_docs = ResourceListingNode(listing, apis=tuple(apis))
+        else:
+            listing['apis'] = apis
+            api_docs = listing
+
+        names = sorted(
+            set(api['name'] for api in changed) |
+            (set(self.resources) - set(resources)))
+        log.info("Refreshed resources %s" % ', '.join(names))
+        self.api_docs, self.resources, self.declaration_hashes = \
+            api_docs, resources, hashes
+        return names
+
+    def start_refresh(self, interval):
+        """Start refreshing the API in the background.
+
+        :param interval: Seconds between two refreshes.
+        """
+        self.stop_refresh()
+        self.refresh_task = asyncio.ensure_future(
+            self._refresh_loop(interval))
+
+    def stop_refresh(self):
+        """Stop refreshing the API in the background.
+        """
+        if self.refresh_task:
+            self.refresh_task.cancel()
+            self.refresh_task = None
+
+    async def _refresh_loop(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                log.exception("Failed to refresh %s" % self.url)
+
+    def bind(self, spec, http_client=None, base_url=None):
+        """Bind this client to an already compiled spec.
+
+        The spec's operation tree is shared, not copied.
+
+        :param spec: Spec shared between clients.
+        :type  spec: swaggerpy3.compact.CompiledSpec
+        :param http_client: HTTP client API
+        :param base_url: Optional URL replacing the basePath of every API
+                         declaration, or a Balancer.
+        """
+        if isinstance(base_url, (list, tuple)):
+            base_url = Balancer(base_url)
+        if not http_client:
+            http_client = AsyncHttpClient()
+        self.http_client = http_client
+        self.spec = spec
+        self.api_docs = spec.api_docs
+        self.resources = {
+            name: Resource(resource, http_client, base_url,
+                           spec.operations[name], self.settings)
+            for (name, resource) in spec.resources.items()
+        }
 
-    async def __repr__(self):
+    def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, self.api_docs['basePath'])
 
+    def configure(self, nickname=None, **settings):
+        """Configure operations of this client.
+
+        Supported settings:
+         * compression: swaggerpy3.compression.Compression policy, or None.
+         * timeout: swaggerpy3.deadline.Timeouts, or seconds for a total
+           timeout.
+         * priority: Priority class, for AsyncHttpClient's scheduler.
+         * heartbeat: Seconds between pings of websocket operations.
+         * offload: swaggerpy3.offload.Offload policy for decoding and
+           encoding large JSON bodies, or None.
+         * paging: swaggerpy3.pagination.Paging convention, for operations
+           whose paging parameters are not recognized.
+         * access_log: swaggerpy3.access_log.AccessLog recording a sample of
+           the calls, or None.
+         * profiler: swaggerpy3.profiling.Profiler profiling a window of
+           calls; the default one also profiles connect().
+
+        :param nickname: Nickname of the operation to configure, or None to
+                         set the default for all operations.
+        :param settings: Setting values.
+        """
+        self.settings.update(nickname, **settings)
+
     def __getattr__(self, item):
         resource = self.get_resource(item)
         if not resource:
@@ -209,7 +772,10 @@ class SwaggerClient(object):
         return resource
 
     async def close(self):
-        self.http_client.close()
+        self.stop_refresh()
+        for access_log in self.settings.values('access_log'):
+            await access_log.close()
+        await self.http_client.close()
 
     def get_resource(self, name):
         return self.resources.get(name)
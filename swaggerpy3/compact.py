@@ -0,0 +1,451 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Compact in-memory representation of a processed Swagger model.
+
+A loaded resource listing is a tree of dicts that repeat the same keys and
+values ('paramType', 'dataType', 'string', 'query', ...) for every node, and
+carries every documentation field of the original JSON. Once the processors
+have run, the client only needs a handful of fields per node.
+
+compact_resource_listing() converts a processed resource listing into a tree
+of __slots__ based nodes holding interned strings. Only the fields listed in
+each node's __slots__ survive; documentation-only fields (descriptions,
+summaries, notes, error responses, allowable values) and custom extension
+fields are dropped.
+
+Nodes support the read-only subset of the dict interface used by the client
+(node['field'], node.get('field'), 'field' in node), so they can stand in
+for the processed dicts. Nodes are immutable, so a compacted model can be
+shared between clients; see CompiledSpec.
+
+A CompiledSpec can also be shared between processes. CompiledSpec.dumps()
+serializes it into a compact buffer that child processes attach to with
+CompiledSpec.loads(), without loading or processing the API again. The
+buffer can be placed in shared memory (share_spec() and attach_spec()) or
+passed to a ProcessPoolExecutor initializer. When forking instead, call
+freeze() after building the spec so that the garbage collector leaves its
+pages alone, and they stay shared copy-on-write.
+"""
+
+import gc
+import marshal
+import os
+import sys
+import types
+
+#: Fields that only exist to document the API, and are never used by the
+#: client.
+DOC_FIELDS = frozenset([
+    'description',
+    'summary',
+    'notes',
+    'errorResponses',
+    'allowableValues',
+])
+
+
+def _intern(value):
+    """Interns a string value; other values are returned unchanged.
+
+    :param value: Value to intern.
+    :return: Interned value.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+class Node(object):
+    """Base class for compact model nodes.
+
+    Subclasses list the fields they keep in __slots__, and default values
+    for optional fields in _defaults.
+    """
+
+    __slots__ = ()
+    _defaults = {}
+
+    def __init__(self, json, **children):
+        """Copies this node's fields out of its JSON object.
+
+        :param json: Processed JSON object to compact.
+        :type  json: dict
+        :param children: Already compacted values for child fields.
+        """
+        defaults = self._defaults
+        for field in self.__slots__:
+            if field in children:
+                value = children[field]
+            else:
+                value = _intern(json.get(field, defaults.get(field)))
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def __delattr__(self, key):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def __repr__(self):
+        fields = ["%s=%r" % (f, getattr(self, f)) for f in self.__slots__
+                  if not isinstance(getattr(self, f),
+                                     (tuple, dict, types.MappingProxyType))]
+        return "%s(%s)" % (self.__class__.__name__, ', '.join(fields))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        # Like a processed dict, which has no key for an absent field
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        """Returns the value of field key, or default if there is none.
+
+        :param key: Field name.
+        :param default: Value to return for unknown fields.
+        """
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def keys(self):
+        """Returns the names of the fields of this node that are set.
+        """
+        return [field for field in self.__slots__
+                if getattr(self, field) is not None]
+
+    @classmethod
+    def from_fields(cls, values):
+        """Builds a node from its field values, in __slots__ order.
+
+        :param values: Field values.
+        """
+        node = cls.__new__(cls)
+        for (field, value) in zip(cls.__slots__, values):
+            object.__setattr__(node, field, value)
+        return node
+
+
+class PropertyNode(Node):
+    """Property of a model.
+    """
+    __slots__ = ('name', 'type')
+
+
+class ModelNode(Node):
+    """Model from an API declaration.
+
+    Its properties are a read-only mapping of name to PropertyNode, as in
+    the processed dict.
+    """
+    __slots__ = ('id', 'properties')
+
+
+class ParameterNode(Node):
+    """Parameter of an operation.
+    """
+    __slots__ = ('name', 'paramType', 'dataType', 'required', 'allowMultiple')
+    _defaults = {'required': False, 'allowMultiple': False}
+
+
+class OperationNode(Node):
+    """Operation on an API.
+    """
+    __slots__ = ('httpMethod', 'nickname', 'responseClass', 'is_websocket',
+                 'consumes', 'parameters')
+    _defaults = {'is_websocket': False}
+
+
+class ApiNode(Node):
+    """Entry in an API declaration's apis array.
+    """
+    __slots__ = ('path', 'has_websocket', 'operations')
+    _defaults = {'has_websocket': False}
+
+
+class ApiDeclarationNode(Node):
+    """API declaration.
+    """
+    __slots__ = ('swaggerVersion', 'basePath', 'resourcePath', 'apis',
+                 'models')
+
+
+class ListingApiNode(Node):
+    """Entry in a resource listing's apis array.
+    """
+    __slots__ = ('path', 'name', 'url', 'api_declaration')
+
+
+class ResourceListingNode(Node):
+    """Top level resource listing.
+    """
+    __slots__ = ('swaggerVersion', 'basePath', 'url', 'apis')
+
+
+def strip_documentation(json):
+    """Removes documentation-only fields from a processed model, in place.
+
+    :param json: Processed resource listing, or any object within it.
+    :return: The stripped object.
+    """
+    if isinstance(json, dict):
+        for field in DOC_FIELDS.intersection(json):
+            del json[field]
+        for value in json.values():
+            strip_documentation(value)
+    elif isinstance(json, list):
+        for value in json:
+            strip_documentation(value)
+    return json
+
+
+def compact_model(model):
+    """Compacts a model object.
+
+    :param model: Processed model.
+    :type  model: dict
+    :rtype: ModelNode
+    """
+    properties = types.MappingProxyType({
+        _intern(name): PropertyNode(prop, name=_intern(prop.get('name', name)))
+        for (name, prop) in model.get('properties', {}).items()})
+    return ModelNode(model, properties=properties)
+
+
+def compact_operation(operation):
+    """Compacts an operation object.
+
+    :param operation: Processed operation.
+    :type  operation: dict
+    :rtype: OperationNode
+    """
+    parameters = tuple(ParameterNode(param)
+                       for param in operation.get('parameters', []))
+    consumes = operation.get('consumes')
+    if consumes is not None:
+        consumes = tuple(_intern(c) for c in consumes)
+    return OperationNode(operation, parameters=parameters, consumes=consumes)
+
+
+def compact_api_declaration(decl):
+    """Compacts an API declaration.
+
+    :param decl: Processed API declaration.
+    :type  decl: dict
+    :rtype: ApiDeclarationNode
+    """
+    apis = tuple(
+        ApiNode(api, operations=tuple(compact_operation(oper)
+                                      for oper in api['operations']))
+        for api in decl['apis'])
+    models = types.MappingProxyType(
+        {_intern(name): compact_model(model)
+         for (name, model) in decl.get('models', {}).items()})
+    return ApiDeclarationNode(decl, apis=apis, models=models)
+
+
+def compact_resource_listing(resources):
+    """Compacts a processed resource listing.
+
+    The resource listing must already have been run through the Loader's
+    processors; the returned tree can not be processed again.
+
+    :param resources: Processed resource listing.
+    :type  resources: dict
+    :rtype: ResourceListingNode
+    """
+    apis = tuple(
+        ListingApiNode(
+            listing_api,
+            api_declaration=compact_api_declaration(
+                listing_api['api_declaration']))
+        for listing_api in resources['apis'])
+    return ResourceListingNode(resources, apis=apis)
+
+
+def index_operations(resource):
+    """Indexes the operations of a resource by nickname.
+
+    :param resource: Processed entry from the resource listing's apis array,
+                     either a dict or a ListingApiNode.
+    :return: Dict of nickname to (basePath, api path, operation) tuples.
+    """
+    decl = resource['api_declaration']
+    return {
+        oper['nickname']: (decl['basePath'], api['path'], oper)
+        for api in decl['apis']
+        for oper in api['operations']}
+
+
+#: Node types, indexed by their tag in a dumped spec.
+_NODE_TYPES = (
+    ResourceListingNode, ListingApiNode, ApiDeclarationNode, ApiNode,
+    OperationNode, ParameterNode, ModelNode, PropertyNode,
+)
+_NODE_TAGS = {node_type: tag for (tag, node_type) in enumerate(_NODE_TYPES)}
+_TUPLE_TAG = len(_NODE_TYPES)
+_MAPPING_TAG = _TUPLE_TAG + 1
+
+#: Header of a dumped spec; the last byte is the format version.
+_DUMP_MAGIC = b'swaggerpy3-spec\x02'
+
+
+def _dump(value):
+    """Converts a node tree into plain, marshallable tuples.
+
+    Nodes and containers become tuples tagged by their type; other values
+    are never tuples, so they are kept as is.
+    """
+    tag = _NODE_TAGS.get(type(value))
+    if tag is not None:
+        return (tag,) + tuple(_dump(getattr(value, field))
+                              for field in value.__slots__)
+    if isinstance(value, tuple):
+        return _TUPLE_TAG, tuple(_dump(v) for v in value)
+    if isinstance(value, types.MappingProxyType):
+        return _MAPPING_TAG, tuple((k, _dump(v)) for (k, v) in value.items())
+    return value
+
+
+def _load(value):
+    """Inverse of _dump().
+    """
+    if type(value) is not tuple:
+        return value
+    tag = value[0]
+    if tag == _TUPLE_TAG:
+        return tuple(_load(v) for v in value[1])
+    if tag == _MAPPING_TAG:
+        return types.MappingProxyType(
+            {sys.intern(k): _load(v) for (k, v) in value[1]})
+    return _NODE_TYPES[tag].from_fields([_load(v) for v in value[1:]])
+
+
+class CompiledSpec(object):
+    """Immutable, processed and compacted API, shareable between clients.
+
+    Built once by Loader.compile(), a CompiledSpec can be passed to any
+    number of SwaggerClient.connect() calls. Each client binds its own
+    http_client and base URL to the shared operation tree without copying
+    it, so connecting costs microseconds instead of a full load.
+
+    :param resources: Processed resource listing, or its compacted form.
+    """
+
+    __slots__ = ('api_docs', 'resources', 'operations')
+
+    def __init__(self, resources):
+        if not isinstance(resources, ResourceListingNode):
+            resources = compact_resource_listing(resources)
+        object.__setattr__(self, 'api_docs', resources)
+        object.__setattr__(self, 'resources', types.MappingProxyType(
+            {listing_api.name: listing_api for listing_api in resources.apis}))
+        object.__setattr__(self, 'operations', types.MappingProxyType(
+            {listing_api.name: types.MappingProxyType(
+                index_operations(listing_api))
+             for listing_api in resources.apis}))
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.api_docs.basePath)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def __delattr__(self, key):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def dumps(self):
+        """Serializes this spec into a compact buffer.
+
+        The buffer is only meant to be loaded by the same version of Python
+        and swaggerpy3, typically in a child process.
+
+        :rtype: bytes
+        """
+        return _DUMP_MAGIC + marshal.dumps(_dump(self.api_docs))
+
+    @classmethod
+    def loads(cls, buf):
+        """Loads a spec from a buffer built by dumps().
+
+        Trailing bytes after the dumped spec are ignored, so buf may be a
+        whole shared memory segment.
+
+        :param buf: Buffer to load from.
+        :type  buf: bytes, bytearray or memoryview
+        :rtype: CompiledSpec
+        :raise ValueError: If buf does not hold a dumped spec.
+        """
+        buf = memoryview(buf)
+        header = len(_DUMP_MAGIC)
+        if bytes(buf[:header]) != _DUMP_MAGIC:
+            raise ValueError("Not a dumped CompiledSpec")
+        return cls(_load(marshal.loads(buf[header:])))
+
+
+#: Names of the segments shared by this process
+_shared = set()
+
+
+def share_spec(spec):
+    """Places a dumped spec in a new shared memory segment.
+
+    The caller owns the segment, and must close() and unlink() it once the
+    child processes have attached.
+
+    :param spec: Spec to share.
+    :type  spec: CompiledSpec
+    :return: Shared memory segment; pass its name to attach_spec().
+    :rtype: multiprocessing.shared_memory.SharedMemory
+    """
+    from multiprocessing import shared_memory
+
+    buf = spec.dumps()
+    shm = shared_memory.SharedMemory(create=True, size=len(buf))
+    shm.buf[:len(buf)] = buf
+    _shared.add(shm.name)
+    return shm
+
+
+def attach_spec(name):
+    """Loads a spec placed in shared memory by share_spec().
+
+    The segment stays owned by the process that shared it: attaching does
+    not register it for unlinking when the attaching process exits.
+
+    :param name: Name of the shared memory segment.
+    :rtype: CompiledSpec
+    """
+    from multiprocessing import shared_memory
+
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix' and name not in _shared:
+            # Attaching registers the segment with this process's resource
+            # tracker, which would unlink it when this process exits, from
+            # under its owner.
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+    try:
+        return CompiledSpec.loads(shm.buf)
+    finally:
+        shm.close()
+
+
+def freeze():
+    """Keeps the garbage collector off everything allocated so far.
+
+    Call after building specs and before forking workers. The objects are
+    moved to the collector's permanent generation, so collections in the
+    children do not write to their pages and break copy-on-write sharing.
+    """
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,241 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Request and response compression.
+
+A Compression policy compresses request bodies above a size threshold, and
+advertises the encodings the client can decode in Accept-Encoding. Compressed
+responses are decoded incrementally by aiohttp as the body is read.
+
+Request bodies may be compressed with gzip and deflate, and with br and zstd
+when the brotli and zstandard packages are installed. Responses may come in
+the encodings aiohttp can decode: gzip and deflate, br with brotli, and
+zstd with its own zstd support (aiohttp 3.12 and later). Every policy keeps
+CompressionStats, to weigh the bytes saved against the CPU time spent.
+
+Policies are configured per operation on the client::
+
+    client.configure(compression=Compression('gzip', threshold=4096))
+    client.configure('upload', compression=None)
+"""
+
+import asyncio
+import functools
+import io
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _BrotliCompressor(object):
+    """Adapts brotli's compressor to the zlib compressobj interface.
+    """
+
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(
+            quality=4 if level is None else level)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.finish()
+
+
+def _gzip(level):
+    return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+
+
+def _deflate(level):
+    return zlib.compressobj(6 if level is None else level)
+
+
+def _zstd(level):
+    return zstandard.ZstdCompressor(
+        level=3 if level is None else level).compressobj()
+
+
+#: Compressor factories by content encoding, for the available encodings.
+COMPRESSORS = {'gzip': _gzip, 'deflate': _deflate}
+if brotli is not None:
+    COMPRESSORS['br'] = _BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = _zstd
+
+#: Size of the chunks read from files when compressing them.
+CHUNK_SIZE = 2 ** 16
+
+
+class CompressionStats(object):
+    """Counters of a compression policy.
+    """
+
+    def __init__(self):
+        #: Number of request bodies compressed
+        self.requests = 0
+        #: Request body bytes, before compression
+        self.request_bytes = 0
+        #: Request body bytes, after compression
+        self.request_wire_bytes = 0
+        #: Seconds of CPU time spent compressing
+        self.compress_seconds = 0.0
+        #: Number of compressed responses
+        self.responses = 0
+        #: Response body bytes, decoded
+        self.response_bytes = 0
+        #: Response body bytes on the wire, when the server announced them
+        self.response_wire_bytes = 0
+
+    def __repr__(self):
+        return ("CompressionStats(requests=%d, saved=%d bytes in %.1fms, "
+                "responses=%d, saved=%d bytes)" % (
+                    self.requests, self.request_bytes_saved,
+                    self.compress_seconds * 1e3, self.responses,
+                    self.response_bytes_saved))
+
+    @property
+    def request_bytes_saved(self):
+        return self.request_bytes - self.request_wire_bytes
+
+    @property
+    def response_bytes_saved(self):
+        return self.response_bytes - self.response_wire_bytes
+
+
+class Compression(object):
+    """Compression policy for operations.
+
+    :param encoding: Content encoding for request bodies.
+    :param threshold: Request bodies smaller than this many bytes are sent
+                      uncompressed. Streamed bodies, whose size is unknown,
+                      are always compressed.
+    :param level: Compression level, or None for the encoding's default.
+    :raise ValueError: If the encoding is not available.
+    """
+
+    def __init__(self, encoding='gzip', threshold=1024, level=None):
+        if encoding not in COMPRESSORS:
+            raise ValueError("Unsupported content encoding '%s'; available "
+                             "are %s" % (encoding, ', '.join(COMPRESSORS)))
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self.stats = CompressionStats()
+
+    def __repr__(self):
+        return "%s(%r, threshold=%d)" % (
+            self.__class__.__name__, self.encoding, self.threshold)
+
+    def compress(self, data):
+        """Compresses a whole body.
+
+        :param data: Body to compress.
+        :type  data: bytes-like
+        :rtype: bytes
+        """
+        start = time.process_time()
+        compressor = COMPRESSORS[self.encoding](self.level)
+        compressed = compressor.compress(data) + compressor.flush()
+        self.stats.compress_seconds += time.process_time() - start
+        self.stats.requests += 1
+        self.stats.request_bytes += len(data)
+        self.stats.request_wire_bytes += len(compressed)
+        return compressed
+
+    async def compress_stream(self, chunks):
+        """Compresses a streamed body, chunk by chunk.
+
+        :param chunks: Async iterable of bytes.
+        :return: Async generator of compressed bytes.
+        """
+        compressor = COMPRESSORS[self.encoding](self.level)
+        self.stats.requests += 1
+        async for chunk in chunks:
+            start = time.process_time()
+            compressed = compressor.compress(chunk)
+            self.stats.compress_seconds += time.process_time() - start
+            self.stats.request_bytes += len(chunk)
+            self.stats.request_wire_bytes += len(compressed)
+            if compressed:
+                yield compressed
+        compressed = compressor.flush()
+        self.stats.request_wire_bytes += len(compressed)
+        yield compressed
+
+    def encode_body(self, data, headers):
+        """Compresses a request body, if the policy calls for it.
+
+        Form bodies are never compressed.
+
+        :param data: Body, as built by swaggerpy3.body.build_body().
+        :param headers: Headers of the request, or None.
+        :return: (data, headers) to send.
+        """
+        headers = dict(headers or {})
+        headers['Accept-Encoding'] = accept_encoding()
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            if len(data) < self.threshold:
+                return data, headers
+            data = self.compress(data)
+        elif isinstance(data, io.IOBase):
+            data = self.compress_stream(_read_file(data))
+        elif hasattr(data, '__aiter__'):
+            data = self.compress_stream(data)
+        else:
+            return data, headers
+        headers['Content-Encoding'] = self.encoding
+        return data, headers
+
+    def record_response(self, response, body):
+        """Counts a response, if it was compressed.
+
+        :param response: Response with its body read.
+        :param body: Decoded body.
+        """
+        if response.headers.get('Content-Encoding', 'identity') == 'identity':
+            return
+        self.stats.responses += 1
+        if response.content_length is not None:
+            self.stats.response_bytes += len(body)
+            self.stats.response_wire_bytes += response.content_length
+
+
+@functools.lru_cache(maxsize=None)
+def accept_encoding():
+    """Returns the Accept-Encoding value listing the encodings aiohttp can
+    decode.
+    """
+    from aiohttp import http_parser
+    encodings = ['gzip', 'deflate']
+    if getattr(http_parser, 'HAS_BROTLI', False):
+        encodings.append('br')
+    if getattr(http_parser, 'HAS_ZSTD', False):
+        encodings.append('zstd')
+    return ', '.join(encodings)
+
+
+async def _read_file(f):
+    """Reads a file in chunks, without blocking the event loop.
+
+    Text files are encoded to UTF-8, like text bodies.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, f.read, CHUNK_SIZE)
+        if not chunk:
+            return
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        yield chunk
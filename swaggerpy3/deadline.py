@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Operation timeouts, and deadlines propagated through nested calls.
+
+Default timeouts are configured per operation on the client, and may be
+overridden per call::
+
+    client.configure(timeout=Timeouts(connect=1, read=5, total=10))
+    client.configure('originate', timeout=30)
+    await client.channels.hangup(channelId=channel_id, _timeout=2)
+
+A deadline bounds all the calls made within it, however deeply nested. It
+is held in a context variable, so tasks started inside it (say, by
+asyncio.gather() fanning out calls) inherit it::
+
+    with deadline(3):
+        await client.channels.answer(channelId=channel_id)
+        await asyncio.gather(*[client.channels.play(...) for ...])
+
+Calls started after the deadline has passed raise DeadlineExceeded without
+being sent, and calls in flight time out when it is reached. Code looping
+over calls, like retries, may call check() to stop early.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import time
+
+#: Monotonic time by which the calls of the current context must complete
+current_deadline = contextvars.ContextVar('swaggerpy3_deadline', default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a call would start after its deadline.
+    """
+
+
+class Timeouts(object):
+    """Timeouts of a call, in seconds; None for no limit.
+
+    :param connect: Time to get a connection, from the pool or a new one.
+    :param read: Time between two reads of the response.
+    :param total: Time of the whole call, including reading the response.
+    """
+
+    def __init__(self, connect=None, read=None, total=None):
+        self.connect = connect
+        self.read = read
+        self.total = total
+
+    def __repr__(self):
+        return "%s(connect=%r, read=%r, total=%r)" % (
+            self.__class__.__name__, self.connect, self.read, self.total)
+
+    def __eq__(self, other):
+        return isinstance(other, Timeouts) and \
+            (self.connect, self.read, self.total) == \
+            (other.connect, other.read, other.total)
+
+    def bounded(self, remaining):
+        """Returns these timeouts, with total at most remaining seconds.
+        """
+        if remaining is None or \
+                (self.total is not None and self.total <= remaining):
+            return self
+        return Timeouts(self.connect, self.read, remaining)
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """Bounds the calls made within the block to the next seconds.
+
+    A deadline never extends an enclosing one.
+
+    :param seconds: Time allowed, from now.
+    """
+    at = time.monotonic() + seconds
+    enclosing = current_deadline.get()
+    if enclosing is not None:
+        at = min(at, enclosing)
+    token = current_deadline.set(at)
+    try:
+        yield at
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining():
+    """Returns the seconds left before the current deadline, or None.
+    """
+    at = current_deadline.get()
+    if at is None:
+        return None
+    return at - time.monotonic()
+
+
+def check():
+    """Checks that the current deadline, if any, has not passed.
+
+    :return: Seconds left, or None if there is no deadline.
+    :raise DeadlineExceeded: If the deadline has passed.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(
+            "Deadline exceeded by %.3fs" % -left)
+    return left
+
+
+def call_timeouts(timeout):
+    """Computes the timeouts of a call starting now.
+
+    :param timeout: Timeouts of the operation, seconds for a total timeout,
+                    or None.
+    :return: Timeouts, or None for no limit.
+    :raise DeadlineExceeded: If the current deadline has passed.
+    """
+    left = check()
+    if timeout is None:
+        if left is None:
+            return None
+        timeout = Timeouts()
+    elif not isinstance(timeout, Timeouts):
+        timeout = Timeouts(total=timeout)
+    return timeout.bounded(left)
@@ -1,32 +1,186 @@
-import aiohttp
 import asyncio
+import time
+import urllib.parse
+
+from .deadline import call_timeouts
+from .tracing import Span, current_span
+from .transport import SessionTransport
 
 class AsyncHttpClient():
-    def __init__(self):
+    """aiohttp based HTTP client.
+
+    aiohttp is imported when the first session is created.
+
+    :param breakers: Optional circuit breakers guarding the calls to each
+                     host.
+    :type  breakers: swaggerpy3.breaker.CircuitBreakers
+    :param scheduler: Optional scheduler queuing requests by priority.
+    :type  scheduler: swaggerpy3.scheduler.Scheduler
+    :param tracer: Optional tracer of operation calls and requests.
+    :type  tracer: swaggerpy3.tracing.Tracer
+    :param transport: Transport sending the requests; by default, a
+                      SessionTransport (with the tracer's hooks).
+    :type  transport: swaggerpy3.transport.Transport
+    """
+
+    def __init__(self, breakers=None, scheduler=None, tracer=None,
+                 transport=None):
         self.auth = None
         self.websockets = set()
+        self.breakers = breakers
+        self.scheduler = scheduler
+        self.tracer = tracer
+        if transport is None:
+            transport = SessionTransport(tracer)
+        self.transport = transport
 
     def set_basic_auth(self, host, username, password):
+        import aiohttp
         self.auth = aiohttp.BasicAuth(login=username, password=password)
-        self.session = aiohttp.ClientSession(auth=self.auth)
+
+    def get_session(self):
+        """Returns the aiohttp session of a SessionTransport, creating it on
+        first use.
+
+        The session is bound to the event loop it is created on, so this
+        must be called from that loop.
+
+        :rtype: aiohttp.ClientSession
+        """
+        return self.transport.get_session()
 
     async def close(self):
-        self.session.close()
-
-    async def request(self, method, url, params=None, data=None, headers=None):
-        async with self.session.request(
-                method, 
-                url, 
-                params=params, 
-                data=data, 
-                headers=headers
-        ) as response:
-            response.raise_for_status()
-            return response
-
-    async def ws_connect(self, url, params=None):
+        for ws in list(self.websockets):
+            await ws.close()
+        await self.transport.close()
+
+    async def request(self, method, url, params=None, data=None, headers=None,
+                      operation=None, timeout=None, priority=None):
+        """Makes a request, and reads its response.
+
+        :param operation: Nickname of the operation called, if any.
+        :param timeout: Timeouts of the request, or None for the session's.
+        :type  timeout: swaggerpy3.deadline.Timeouts
+        :param priority: Priority class of the request, for the scheduler.
+        :return: Response, with its body read.
+        :raise aiohttp.ClientResponseError: On error statuses.
+        :raise swaggerpy3.breaker.CircuitOpenError: If the host's circuit
+                                                    is open.
+        """
+        if self.tracer is None:
+            return await self._scheduled_request(
+                method, url, params, data, headers, operation, timeout,
+                priority)
+        with self.tracer.span('HTTP %s' % method, url=url) as span:
+            # Unsampled traces are propagated too, so servers follow suit
+            span = span or current_span.get()
+            if span is not None:
+                headers = dict(headers or {}, traceparent=span.traceparent())
+            return await self._scheduled_request(
+                method, url, params, data, headers, operation, timeout,
+                priority)
+
+    async def _scheduled_request(self, method, url, params, data, headers,
+                                 operation, timeout, priority):
+        if self.scheduler is None:
+            return await self._breaker_request(
+                method, url, params, data, headers, operation, timeout)
+        start = time.perf_counter()
+        async with self.scheduler.slot(priority):
+            span = current_span.get()
+            if isinstance(span, Span):
+                span.set('queue_wait', time.perf_counter() - start)
+            # The deadline kept running while the request was queued
+            timeout = call_timeouts(timeout)
+            return await self._breaker_request(
+                method, url, params, data, headers, operation, timeout)
+
+    async def _breaker_request(self, method, url, params, data, headers,
+                               operation, timeout):
+        if self.breakers is None:
+            return await self._request(
+                method, url, params, data, headers, timeout)
+        return await self._guard(url, operation, lambda: self._request(
+            method, url, params, data, headers, timeout))
+
+    async def _request(self, method, url, params, data, headers, timeout):
+        response = await self.transport.request(
+            method, url, params=params, data=data, headers=headers,
+            auth=self.auth, timeout=timeout)
+        # Reading the whole body returns the connection to the pool, and
+        # keeps the body available to read(), text() and json().
+        span = current_span.get()
+        try:
+            if isinstance(span, Span):
+                start = time.perf_counter()
+                span.set('status', response.status)
+                span.set('bytes', len(await response.read()))
+                span.set('body_read', time.perf_counter() - start)
+            else:
+                await response.read()
+        except BaseException:
+            # Don't leave the connection half read
+            response.close()
+            raise
+        response.raise_for_status()
+        return response
+
+    async def _guard(self, url, operation, call):
+        """Makes a call through the circuit breaker of its host.
+
+        :param call: Function returning the awaitable of the call.
+        """
+        parts = urllib.parse.urlsplit(url)
+        breaker = self.breakers.get(
+            '%s://%s' % (parts.scheme, parts.netloc), operation)
+        start = breaker.before_call()
+        failed = None
+        try:
+            result = await call()
+            failed = False
+            return result
+        except Exception as e:
+            # Client errors (4xx) don't say anything about the host's health
+            failed = getattr(e, 'status', 500) >= 500
+            raise
+        finally:
+            breaker.after_call(start, failed)
+
+    async def warmup(self, url, connections=1):
+        """Opens pooled keep-alive connections to the host of a URL.
+
+        DNS is resolved and the connections (including TLS) established by
+        sending concurrent HEAD requests to url; their status is ignored.
+
+        :param url: URL on the host to connect to.
+        :param connections: Number of connections to open.
+        :return: Number of connections opened.
+        """
+        async def head():
+            response = await self.transport.request(
+                'HEAD', url, auth=self.auth)
+            try:
+                await response.read()
+            except BaseException:
+                response.close()
+                raise
+
+        results = await asyncio.gather(
+            *[head() for _ in range(connections)], return_exceptions=True)
+        return sum(1 for r in results if not isinstance(r, Exception))
+
+    async def ws_connect(self, url, params=None, operation=None,
+                         timeout=None, heartbeat=None):
         """Websocket-client based implementation.
 
+        Open websockets are kept in self.websockets, and closed by close().
+
+        :param operation: Nickname of the operation called, if any.
+        :param timeout: Timeouts of the connection; only total applies.
+        :type  timeout: swaggerpy3.deadline.Timeouts
+        :param heartbeat: If set, seconds between pings; the connection is
+                          closed if a pong is missed.
+
         :return: WebSocket connection
         :rtype:  websocket.WebSocket
         """
@@ -35,4 +189,18 @@ class AsyncHttpClient():
                 for (k, v) in list(params.items())])
             url += "?%s" % joined_params
 
-        return await self.session.ws_connect(url)
+        def connect():
+            ws = self.transport.ws_connect(
+                url, auth=self.auth, heartbeat=heartbeat)
+            if timeout is None or timeout.total is None:
+                return ws
+            return asyncio.wait_for(ws, timeout.total)
+
+        if self.breakers is None:
+            ws = await connect()
+        else:
+            ws = await self._guard(url, operation, connect)
+        # Forget the websockets closed since the last connection
+        self.websockets = set(w for w in self.websockets if not w.closed)
+        self.websockets.add(ws)
+        return ws
@@ -0,0 +1,204 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Lazy, projected views of JSON response bodies.
+
+A view gives access to a JSON body without building dicts for all of it up
+front. This takes the pysimdjson package (pip install swaggerpy3[simdjson]):
+the body is indexed by a single fast pass, and values are only turned into
+Python objects when they are accessed.
+
+Without pysimdjson, views are eager: the whole body is decoded with the json
+module first, every record included, and the view only projects it. This
+costs a little more than json.loads() alone (benchmarks/bench_lazy_json.py),
+so without pysimdjson, Operation.fetch() is the faster choice.
+
+Records may be projected on a set of fields, typically the properties of
+the operation's response model; other fields are hidden, and never decoded::
+
+    channels = await client.channels.list.view(_fields=True)
+    ids = [channel['id'] for channel in channels]
+
+Views are read-only; as_python() returns the (projected) body as plain
+lists and dicts.
+"""
+
+import json
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+_LISTS = (list,)
+_DICTS = (dict,)
+if simdjson is not None:
+    _LISTS += (simdjson.Array,)
+    _DICTS += (simdjson.Object,)
+
+
+def parse(body):
+    """Parses a JSON body, lazily if pysimdjson is available.
+
+    :param body: JSON bytes or text.
+    :return: Parsed document; simdjson proxies or plain lists and dicts.
+    """
+    if simdjson is not None:
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        # A parser holds a single document; each view gets its own
+        return simdjson.Parser().parse(body)
+    return json.loads(body)
+
+
+def view(body, fields=None):
+    """Builds a view of a JSON body.
+
+    :param body: JSON bytes or text.
+    :param fields: Optional names of the fields records are projected on.
+    :return: ListView, RecordView, or a scalar value.
+    """
+    return wrap(parse(body), frozenset(fields) if fields else None)
+
+
+def wrap(value, fields=None):
+    """Wraps a parsed value in a view, if it is a container.
+    """
+    if _is_list(value):
+        return ListView(value, fields)
+    if _is_dict(value):
+        return RecordView(value, fields)
+    return value
+
+
+def _is_list(value):
+    return isinstance(value, _LISTS)
+
+
+def _is_dict(value):
+    return isinstance(value, _DICTS)
+
+
+def as_python(value, fields=None):
+    """Converts a parsed value to plain lists and dicts.
+
+    :param value: Parsed value.
+    :param fields: Optional names of the fields the outermost records are
+                   projected on.
+    """
+    if _is_list(value):
+        return [as_python(item, fields) for item in value]
+    if _is_dict(value):
+        keys = value.keys() if fields is None else \
+            [key for key in value.keys() if key in fields]
+        return {key: as_python(value[key]) for key in keys}
+    return value
+
+
+class ListView(object):
+    """Read-only view of a JSON array; its records are projected.
+
+    :param value: Parsed array.
+    :param fields: Optional names of the fields records are projected on.
+    """
+
+    __slots__ = ('value', 'fields')
+
+    def __init__(self, value, fields=None):
+        self.value = value
+        self.fields = fields
+
+    def __repr__(self):
+        return "%s(%d items)" % (self.__class__.__name__, len(self))
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [wrap(item, self.fields) for item in self.value[index]]
+        return wrap(self.value[index], self.fields)
+
+    def __iter__(self):
+        fields = self.fields
+        for item in self.value:
+            yield wrap(item, fields)
+
+    def as_python(self):
+        """Returns the array as a list, with its records projected.
+        """
+        return as_python(self.value, self.fields)
+
+
+class RecordView(object):
+    """Read-only view of a JSON object, optionally projected.
+
+    Values are decoded on access; nested objects and arrays are views too.
+
+    :param value: Parsed object.
+    :param fields: Optional names of the visible fields.
+    """
+
+    __slots__ = ('value', 'fields')
+
+    def __init__(self, value, fields=None):
+        self.value = value
+        self.fields = fields
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.keys())
+
+    def __getitem__(self, key):
+        if self.fields is not None and key not in self.fields:
+            raise KeyError(key)
+        return wrap(self.value[key])
+
+    def __contains__(self, key):
+        return (self.fields is None or key in self.fields) and \
+            key in self.value
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def keys(self):
+        keys = self.value.keys()
+        if self.fields is None:
+            return list(keys)
+        return [key for key in keys if key in self.fields]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def as_python(self):
+        """Returns the object as a dict, with its fields projected.
+        """
+        return as_python(self.value, self.fields)
+
+
+def model_fields(models, response_class):
+    """Names of the properties of an operation's response model.
+
+    :param models: Models of the API declaration, by id.
+    :param response_class: responseClass of the operation, like 'Channel'
+                           or 'List[Channel]'.
+    :return: Set of property names, or None if the model is unknown.
+    """
+    if not models or not response_class:
+        return None
+    name = response_class
+    if name.startswith('List[') and name.endswith(']'):
+        name = name[5:-1]
+    model = models.get(name)
+    if model is None:
+        return None
+    # Processed dicts and ModelNodes both map names to properties
+    return frozenset(model.get('properties') or ())
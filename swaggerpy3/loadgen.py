@@ -0,0 +1,210 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Load generator driving operations through a SwaggerClient.
+
+The generator calls the given operations in turn, either as fast as a
+number of concurrent workers allows, or at a target rate::
+
+    generator = LoadGenerator(client, ['channels.list'], rps=200,
+                              duration=30)
+    report = await generator.run()
+    print(report.format())
+
+At a target rate, calls are started on schedule whether or not the
+previous ones completed, up to concurrency calls in flight, and latencies
+are measured from the time each call was scheduled. Calls delayed because
+the server (or the client) can't keep up therefore count as slow, instead
+of silently lowering the rate.
+
+Required parameters not given in params are filled with synthetic values
+of their dataType.
+"""
+
+import asyncio
+import random
+import time
+
+from .stub import synthesize_property
+
+
+class LoadReport(object):
+    """Outcome of a load test.
+
+    :param latencies: Seconds taken by each successful call.
+    :param errors: Number of failed calls, by status (None for errors
+                   without a response).
+    :param elapsed: Duration of the test, in seconds.
+    """
+
+    def __init__(self, latencies, errors, elapsed):
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "%s(requests=%d, errors=%d, %.1f rps)" % (
+            self.__class__.__name__, self.requests, self.error_count,
+            self.rps)
+
+    @property
+    def error_count(self):
+        return sum(self.errors.values())
+
+    @property
+    def requests(self):
+        """Number of calls completed, successful or not.
+        """
+        return len(self.latencies) + self.error_count
+
+    @property
+    def rps(self):
+        """Calls completed per second.
+        """
+        return self.requests / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, p):
+        """Latency percentile of the successful calls (nearest rank).
+
+        :param p: Percentile, between 0 and 100.
+        :return: Seconds, or None without successful calls.
+        """
+        if not self.latencies:
+            return None
+        rank = max(0, int(round(p / 100.0 * len(self.latencies))) - 1)
+        return self.latencies[min(rank, len(self.latencies) - 1)]
+
+    def format(self):
+        """Formats the report for humans.
+        """
+        lines = ["%d requests in %.2fs, %.1f rps, %d errors" % (
+            self.requests, self.elapsed, self.rps, self.error_count)]
+        for (status, count) in sorted(self.errors.items(),
+                                      key=lambda item: str(item[0])):
+            lines.append("  %s: %d" % (status or 'no response', count))
+        if self.latencies:
+            lines.append("latency " + "  ".join(
+                "%s %.2fms" % (name, self.percentile(p) * 1e3)
+                for (name, p) in [('p50', 50), ('p90', 90), ('p99', 99),
+                                  ('p99.9', 99.9), ('max', 100)]))
+        return '\n'.join(lines)
+
+
+class LoadGenerator(object):
+    """Calls operations of a client, concurrently or at a target rate.
+
+    :param client: Connected client.
+    :type  client: swaggerpy3.client.SwaggerClient
+    :param operations: Operations to call in turn, as Operation objects or
+                       'resource.nickname' strings.
+    :param params: Parameters of the calls; operations ignore parameters
+                   they don't have.
+    :param rps: Target calls per second, or None to call as fast as
+                possible.
+    :param concurrency: Maximum number of calls in flight.
+    :param duration: Seconds the test lasts.
+    :param requests: Number of calls to make, instead of a duration.
+    :param rng: random.Random instance for synthetic parameters.
+    """
+
+    def __init__(self, client, operations, params=None, rps=None,
+                 concurrency=10, duration=10.0, requests=None, rng=None):
+        if not operations:
+            raise ValueError("No operations to call")
+        self.rng = rng or random.Random()
+        self.calls = [self._prepare(client, operation, params or {})
+                      for operation in operations]
+        self.rps = rps
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.latencies = []
+        self.errors = {}
+
+    def __repr__(self):
+        return "%s(%d operations, rps=%r, concurrency=%d)" % (
+            self.__class__.__name__, len(self.calls), self.rps,
+            self.concurrency)
+
+    def _prepare(self, client, operation, params):
+        if isinstance(operation, str):
+            resource_name, _, nickname = operation.partition('.')
+            resource = client.get_resource(resource_name)
+            op = resource.get_operation(nickname) if resource else None
+            if op is None:
+                raise ValueError("Unknown operation '%s'" % operation)
+            operation = op
+        kwargs = {}
+        for param in operation.json.get('parameters') or []:
+            name = param['name']
+            if name in params:
+                kwargs[name] = params[name]
+            elif param.get('required'):
+                kwargs[name] = synthesize_property(param, {}, self.rng)
+        return operation, kwargs
+
+    def _done(self, count, start):
+        if self.requests is not None:
+            return count >= self.requests
+        return time.perf_counter() - start >= self.duration
+
+    async def _call(self, index, scheduled):
+        operation, kwargs = self.calls[index % len(self.calls)]
+        try:
+            await operation(**kwargs)
+        except Exception as e:
+            status = getattr(e, 'status', None)
+            self.errors[status] = self.errors.get(status, 0) + 1
+        else:
+            self.latencies.append(time.perf_counter() - scheduled)
+
+    async def run(self):
+        """Runs the test.
+
+        :rtype: LoadReport
+        """
+        start = time.perf_counter()
+        if self.rps is None:
+            await self._run_closed(start)
+        else:
+            await self._run_open(start)
+        return LoadReport(self.latencies, self.errors,
+                          time.perf_counter() - start)
+
+    async def _run_closed(self, start):
+        count = 0
+
+        async def worker():
+            nonlocal count
+            while not self._done(count, start):
+                index = count
+                count += 1
+                await self._call(index, time.perf_counter())
+
+        await asyncio.gather(*[worker() for _ in range(self.concurrency)])
+
+    async def _run_open(self, start):
+        slots = asyncio.Semaphore(self.concurrency)
+        interval = 1.0 / self.rps
+        tasks = set()
+
+        async def call(index, scheduled):
+            try:
+                await self._call(index, scheduled)
+            finally:
+                slots.release()
+
+        count = 0
+        while not self._done(count, start):
+            scheduled = start + count * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await slots.acquire()
+            task = asyncio.ensure_future(call(count, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            count += 1
+        if tasks:
+            await asyncio.gather(*tasks)
@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Offloading of large JSON decoding and encoding to a worker pool.
+
+Decoding a body of several megabytes takes long enough to stall the event
+loop, delaying every other task, like websocket event handling. An Offload
+policy decodes (and encodes) payloads above a size threshold in an executor,
+while small payloads, for which the hand-off would cost more than it saves,
+stay inline::
+
+    client.configure('list', offload=Offload(threshold=256 * 1024))
+    channels = await client.channels.list.fetch()
+
+The json module holds the GIL while it decodes a body, so with a thread
+pool (the loop's default executor, unless one is given) the loop still
+stalls for the length of one decode, though no longer for consecutive ones.
+A concurrent.futures.ProcessPoolExecutor moves the decoding out of the
+interpreter; only unpickling the result remains, in the executor's thread.
+See benchmarks/bench_offload.py.
+"""
+
+import asyncio
+import json
+import time
+
+
+class OffloadStats(object):
+    """Counters of an offload policy.
+    """
+
+    def __init__(self):
+        #: Number of payloads processed inline
+        self.inline = 0
+        #: Number of payloads processed in the executor
+        self.offloaded = 0
+        #: Bytes of the payloads processed in the executor
+        self.offloaded_bytes = 0
+        #: Seconds the loop spent processing payloads inline
+        self.inline_seconds = 0.0
+
+    def __repr__(self):
+        return "OffloadStats(inline=%d in %.1fms, offloaded=%d, %d bytes)" % (
+            self.inline, self.inline_seconds * 1e3, self.offloaded,
+            self.offloaded_bytes)
+
+
+class Offload(object):
+    """Policy running large JSON decoding and encoding in an executor.
+
+    :param threshold: Payloads of this many bytes or more are offloaded.
+    :param executor: concurrent.futures executor, or None for the loop's
+                     default thread pool.
+    """
+
+    def __init__(self, threshold=1024 * 1024, executor=None):
+        self.threshold = threshold
+        self.executor = executor
+        self.stats = OffloadStats()
+
+    def __repr__(self):
+        return "%s(threshold=%d, executor=%r)" % (
+            self.__class__.__name__, self.threshold, self.executor)
+
+    async def run(self, size, fn, *args):
+        """Runs fn(*args), in the executor if size reaches the threshold.
+
+        With a process pool, fn and args must be picklable.
+
+        :param size: Size of the payload, in bytes.
+        :return: Result of fn.
+        """
+        if size < self.threshold:
+            start = time.perf_counter()
+            result = fn(*args)
+            self.stats.inline += 1
+            self.stats.inline_seconds += time.perf_counter() - start
+            return result
+        self.stats.offloaded += 1
+        self.stats.offloaded_bytes += size
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, fn, *args)
+
+    async def decode(self, body):
+        """Decodes a JSON body.
+
+        :param body: JSON bytes or text.
+        :return: Decoded value.
+        """
+        return await self.run(len(body), json.loads, body)
+
+    async def encode(self, value):
+        """Encodes a value as JSON.
+
+        The size of the encoding is estimated first, stopping as soon as
+        it reaches the threshold.
+
+        :param value: Value to encode.
+        :rtype: str
+        """
+        return await self.run(estimate_size(value, self.threshold),
+                              json.dumps, value)
+
+
+def estimate_size(value, limit):
+    """Roughly estimates the size of the JSON encoding of a value.
+
+    :param value: Value to estimate.
+    :param limit: The estimate stops once it reaches this many bytes.
+    :return: Estimated size, at most about limit.
+    """
+    size = 0
+    stack = [value]
+    while stack and size < limit:
+        value = stack.pop()
+        if isinstance(value, dict):
+            size += 2
+            for (key, item) in value.items():
+                # json.dumps accepts int, float, bool and None keys too
+                size += len(str(key)) + 4
+                stack.append(item)
+        elif isinstance(value, (list, tuple)):
+            size += 2 + len(value)
+            stack.extend(value)
+        elif isinstance(value, str):
+            size += len(value) + 2
+        else:
+            size += 8
+    return size
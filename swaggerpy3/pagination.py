@@ -0,0 +1,255 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Automatic pagination of list operations.
+
+The paging convention of an operation is recognized from the names of its
+query parameters:
+
+ * offset/limit: an offset parameter (offset, start, skip) and a limit
+   parameter (limit, count, pageSize...).
+ * page numbers: a page parameter, and optionally a limit parameter.
+ * page tokens: a token parameter (pageToken, cursor, marker...), with the
+   token of the next page found in the response.
+
+Operations with another convention can be given one explicitly::
+
+    client.configure('listEvents', paging=Paging(
+        TOKEN, 'continuation', limit='batch', next_key='continuation'))
+
+paginate() iterates over the items of all pages, fetching the next pages
+while the current one is consumed::
+
+    async for recording in client.recordings.listStored.paginate(
+            _read_ahead=2):
+        ...
+
+At most read_ahead pages are fetched ahead of the consumer, which bounds
+the memory used however long the listing is. Token paging stops when the
+server returns the token of the page it just served.
+"""
+
+import asyncio
+
+OFFSET = 'offset'
+PAGE = 'page'
+TOKEN = 'token'
+
+OFFSET_NAMES = ('offset', 'start', 'skip')
+PAGE_NAMES = ('page', 'pageNumber', 'page_number')
+TOKEN_NAMES = ('pageToken', 'page_token', 'cursor', 'continuationToken',
+               'nextToken', 'marker', 'after')
+LIMIT_NAMES = ('limit', 'count', 'size', 'pageSize', 'page_size', 'perPage',
+               'per_page', 'max', 'maxResults', 'max_results')
+
+#: Response fields that may hold the items of a page
+ITEMS_KEYS = ('items', 'results', 'data', 'entries', 'values', 'records')
+#: Response fields that may hold the token of the next page
+NEXT_KEYS = ('nextPageToken', 'next_page_token', 'nextToken', 'next_token',
+             'nextCursor', 'next_cursor', 'cursor', 'nextMarker', 'marker',
+             'next')
+
+
+class Paging(object):
+    """Paging convention of an operation.
+
+    :param kind: OFFSET, PAGE or TOKEN.
+    :param param: Name of the offset, page or token parameter.
+    :param limit: Name of the page size parameter, if any.
+    :param items_key: Response field holding the items; by default, the
+                      response itself if it is a list, or the first field of
+                      ITEMS_KEYS.
+    :param next_key: Response field holding the next page token; by default,
+                     the first field of NEXT_KEYS.
+    :param first: Number of the first page, for PAGE.
+    """
+
+    def __init__(self, kind, param, limit=None, items_key=None,
+                 next_key=None, first=1):
+        if kind not in (OFFSET, PAGE, TOKEN):
+            raise ValueError("Unknown paging kind '%s'" % kind)
+        self.kind = kind
+        self.param = param
+        self.limit = limit
+        self.items_key = items_key
+        self.next_key = next_key
+        self.first = first
+
+    def __repr__(self):
+        return "%s(%s, %r, limit=%r)" % (
+            self.__class__.__name__, self.kind, self.param, self.limit)
+
+    def items(self, body):
+        """Extracts the items of a page from its decoded body.
+        """
+        if self.items_key is not None:
+            return body.get(self.items_key) or []
+        if isinstance(body, list):
+            return body
+        for key in ITEMS_KEYS:
+            if isinstance(body.get(key), list):
+                return body[key]
+        lists = [value for value in body.values() if isinstance(value, list)]
+        if len(lists) == 1:
+            return lists[0]
+        raise ValueError("Can't find the items of the page in %r" %
+                         list(body))
+
+    def next_token(self, body):
+        """Extracts the token of the next page, or None on the last page.
+        """
+        if not isinstance(body, dict):
+            return None
+        if self.next_key is not None:
+            return body.get(self.next_key)
+        for key in NEXT_KEYS:
+            if body.get(key):
+                return body[key]
+        return None
+
+
+def detect_paging(parameters):
+    """Recognizes the paging convention of an operation.
+
+    :param parameters: (name, paramType, required) of each parameter of the
+                       operation.
+    :return: Paging, or None if the operation does not seem paged.
+    """
+    names = [name for (name, param_type, _) in parameters
+             if param_type == 'query']
+
+    def find(candidates):
+        for name in names:
+            if name in candidates:
+                return name
+        return None
+
+    limit = find(LIMIT_NAMES)
+    offset = find(OFFSET_NAMES)
+    if offset is not None and limit is not None:
+        return Paging(OFFSET, offset, limit)
+    page = find(PAGE_NAMES)
+    if page is not None:
+        return Paging(PAGE, page, limit)
+    token = find(TOKEN_NAMES)
+    if token is not None:
+        return Paging(TOKEN, token, limit)
+    return None
+
+
+class Paginator(object):
+    """Async iterator over the items of all the pages of a call.
+
+    :param operation: Paged operation.
+    :type  operation: swaggerpy3.client.Operation
+    :param paging: Paging convention of the operation.
+    :param kwargs: Arguments of the calls, without the paging parameter.
+    :param page_size: Items per page, when the operation has a limit
+                      parameter and kwargs doesn't set it.
+    :param read_ahead: Number of pages fetched ahead of the consumer.
+    """
+
+    def __init__(self, operation, paging, kwargs, page_size=None,
+                 read_ahead=1):
+        if read_ahead < 0:
+            raise ValueError("read_ahead must not be negative")
+        self.operation = operation
+        self.paging = paging
+        self.kwargs = dict(kwargs)
+        if page_size is not None and paging.limit is not None:
+            self.kwargs.setdefault(paging.limit, page_size)
+        self.read_ahead = read_ahead
+        #: Number of pages fetched
+        self.pages = 0
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (self.__class__.__name__, self.operation,
+                               self.paging)
+
+    def __aiter__(self):
+        return self.items()
+
+    async def items(self):
+        """Async generator of the items of every page.
+        """
+        async for page in self.iter_pages():
+            for item in page:
+                yield item
+
+    async def iter_pages(self):
+        """Async generator of the items of each page, as lists.
+        """
+        if self.read_ahead == 0:
+            async for page in self._fetch_pages():
+                yield page
+            return
+
+        # The queue holds pages, or the exception that stopped the fetching;
+        # None marks the end. The producer takes a credit before fetching a
+        # page, and the consumer gives it back when it takes the page, so
+        # pages fetched, or being fetched, ahead never exceed read_ahead.
+        queue = asyncio.Queue()
+        credits = asyncio.Semaphore(self.read_ahead)
+
+        async def produce():
+            pages = self._fetch_pages()
+            try:
+                while True:
+                    await credits.acquire()
+                    try:
+                        page = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    queue.put_nowait(page)
+                queue.put_nowait(None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                await pages.aclose()
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                page = await queue.get()
+                credits.release()
+                if page is None:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+        finally:
+            producer.cancel()
+            await asyncio.wait([producer])
+
+    async def _fetch_pages(self):
+        paging = self.paging
+        kwargs = dict(self.kwargs)
+        position = kwargs.get(paging.param)
+        if position is None and paging.kind == OFFSET:
+            position = 0
+        elif position is None and paging.kind == PAGE:
+            position = paging.first
+        limit = kwargs.get(paging.limit) if paging.limit else None
+        while True:
+            if position is not None:
+                kwargs[paging.param] = position
+            response = await self.operation(**kwargs)
+            body = await self.operation.decode(response)
+            self.pages += 1
+            items = paging.items(body)
+            yield items
+            if paging.kind == TOKEN:
+                token = paging.next_token(body)
+                # A repeated token would fetch the same page forever
+                if not token or token == position:
+                    return
+                position = token
+            elif not items or (limit is not None and len(items) < limit):
+                return
+            elif paging.kind == OFFSET:
+                position += len(items)
+            else:
+                position += 1
@@ -9,6 +9,24 @@ particular use case (such as ensuring that description and summary fields
 exist)
 """
 
+import asyncio
+import inspect
+import time
+
+#: Names of the SwaggerProcessor hooks, in the order apply() visits them.
+HOOKS = [
+    'process_resource_listing',
+    'process_resource_listing_api',
+    'process_api_declaration',
+    'process_resource_api',
+    'process_operation',
+    'process_parameter',
+    'process_error_response',
+    'process_model',
+    'process_property',
+]
+
+
 class ParsingContext(object):
     """Context information for parsing.
 
@@ -26,14 +44,14 @@ class ParsingContext(object):
         strs = ["%s=%s" % (t, i) for (t, i) in zipped]
         return "ParsingContext(stack=%r)" % strs
 
-    async def is_empty(self):
+    def is_empty(self):
         """Tests whether context is empty.
 
         :return: True if empty, False otherwise.
         """
         return not self.type_stack and not self.id_stack
 
-    async def push(self, obj_type, json, id_field):
+    def push(self, obj_type, json, id_field):
         """Pushes a new self-identifying object into the context.
 
         :type obj_type: str
@@ -44,10 +62,10 @@ class ParsingContext(object):
         :param id_field: Field name in json that identifies it.
         """
         if id_field not in json:
-            raise BaseException ("Missing id_field: %s" % id_field)
-        await self.push_str(obj_type, json, str(json[id_field]))
+            raise SwaggerError("Missing id_field: %s" % id_field, self)
+        self.push_str(obj_type, json, str(json[id_field]))
 
-    async def push_str(self, obj_type, json, id_string):
+    def push_str(self, obj_type, json, id_string):
         """Pushes a new object into the context.
 
         :type obj_type: str
@@ -61,18 +79,71 @@ class ParsingContext(object):
         self.id_stack.append(id_string)
         self.args[obj_type] = json
 
-    async def pop(self):
+    def pop(self):
         """Pops the most recent object out of the context
         """
         del self.args[self.type_stack.pop()]
         self.id_stack.pop()
 
 
-async def SwaggerError(error):
+class ProcessingStats(object):
+    """Measures how long processing keeps the event loop busy.
+
+    Processing runs in slices between two points where it yields to the
+    event loop; the longest slice is the worst loop stall it caused.
+    Offloaded processing runs in an executor instead: it is counted in
+    offloaded_seconds, not as loop time.
+    """
+
+    def __init__(self):
+        self.slices = 0
+        self.longest = 0.0
+        self.busy = 0.0
+        self.offloaded = False
+        self.offloaded_seconds = 0.0
+
+    def __repr__(self):
+        return "ProcessingStats(slices=%d, longest=%.1fms, busy=%.1fms%s)" % (
+            self.slices, self.longest * 1e3, self.busy * 1e3,
+            ", offloaded %.1fms" % (self.offloaded_seconds * 1e3)
+            if self.offloaded else "")
+
+    def add_slice(self, duration):
+        """Records a slice of processing.
+
+        :param duration: Seconds spent without yielding to the loop.
+        """
+        self.slices += 1
+        self.busy += duration
+        if duration > self.longest:
+            self.longest = duration
+
+    def add_offloaded(self, duration):
+        """Records processing done in an executor.
+
+        :param duration: Seconds spent in the executor.
+        """
+        self.offloaded = True
+        self.offloaded_seconds += duration
+
+
+class SwaggerError(Exception):
     """Raised when an error is encountered mapping the JSON objects into the
     model.
+
+    :param msg: String message for the error.
+    :param context: ParsingContext object
     """
-    raise BaseException (error)
+
+    def __init__(self, msg, context=None):
+        super(SwaggerError, self).__init__(msg)
+        self.msg = msg
+        self.context = context
+
+    def __str__(self):
+        if self.context is None:
+            return self.msg
+        return "%s: %s" % (self.context, self.msg)
 
 
 class SwaggerProcessor(object):
@@ -80,57 +151,160 @@ class SwaggerProcessor(object):
 
     This processor can add fields to model objects for additional
     information to use in the templates.
+
+    Hooks may be plain methods, or coroutines for processors that need to
+    do I/O. Plain hooks are called directly, without creating a coroutine
+    per node; hooks that are not overridden are skipped entirely.
     """
 
-    async def apply(self, resources):
+    def get_hooks(self):
+        """Returns the hooks this processor overrides.
+
+        :return: Dict of hook name to (bound method, is_coroutine).
+        """
+        hooks = {}
+        for name in HOOKS:
+            if getattr(type(self), name) is getattr(SwaggerProcessor, name):
+                continue
+            hook = getattr(self, name)
+            hooks[name] = (hook, inspect.iscoroutinefunction(hook))
+        return hooks
+
+    def is_async(self):
+        """Tests whether any of this processor's hooks is a coroutine.
+
+        :return: True if apply() must be used, False if apply_sync() may be.
+        """
+        return any(is_coro for (_, is_coro) in self.get_hooks().values())
+
+    async def apply(self, resources, listing_apis=None, time_budget=None,
+                    stats=None):
         """Apply this processor to a loaded Swagger definition.
 
         :param resources: Top level Swagger definition.
         :type  resources: dict
+        :param listing_apis: Optional subset of resources['apis'] to process;
+                             the others are left untouched.
+        :param time_budget: If set, yield to the event loop whenever
+                            processing has run for this many seconds.
+        :param stats: Optional ProcessingStats to add to.
+        :rtype: ProcessingStats
+        """
+        if stats is None:
+            stats = ProcessingStats()
+        hooks = self.get_hooks()
+        clock = time.perf_counter
+        slice_start = clock()
+        for (name, context) in self.walk(resources, hooks, listing_apis):
+            hook, is_coro = hooks[name]
+            if is_coro:
+                await hook(**context.args)
+            else:
+                hook(**context.args)
+            if time_budget is not None:
+                now = clock()
+                if now - slice_start >= time_budget:
+                    stats.add_slice(now - slice_start)
+                    await asyncio.sleep(0)
+                    slice_start = clock()
+        stats.add_slice(clock() - slice_start)
+        return stats
+
+    def apply_sync(self, resources, listing_apis=None):
+        """Apply this processor without an event loop.
+
+        :param resources: Top level Swagger definition.
+        :type  resources: dict
+        :param listing_apis: Optional subset of resources['apis'] to process.
+        :raise TypeError: If any of the processor's hooks is a coroutine.
+        """
+        hooks = self.get_hooks()
+        # Before walking, so that a failure leaves the model untouched
+        for (name, (_, is_coro)) in hooks.items():
+            if is_coro:
+                raise TypeError("%s.%s is a coroutine; use apply()" %
+                                (self.__class__.__name__, name))
+        for (name, context) in self.walk(resources, hooks, listing_apis):
+            hooks[name][0](**context.args)
+
+    def walk(self, resources, hooks=HOOKS, listing_apis=None):
+        """Walks a loaded Swagger definition, in hook order.
+
+        :param resources: Top level Swagger definition.
+        :type  resources: dict
+        :param hooks: Names of the hooks to visit; nodes whose hook is not
+                      listed are not yielded.
+        :param listing_apis: Optional subset of resources['apis'] to walk.
+        :return: Generator of (hook name, ParsingContext); the hook is called
+                 with context.args as keyword arguments.
         """
+        if listing_apis is None:
+            listing_apis = resources['apis']
         context = ParsingContext()
         resources_url = resources.get('url') or 'json:resource_listing'
-        await context.push_str('resources', resources, resources_url)
-        await self.process_resource_listing(**context.args)
-        for listing_api in resources['apis']:
-            await context.push('listing_api', listing_api, 'path')
-            await self.process_resource_listing_api(**context.args)
-            await context.pop()
-
-            api_url = listing_api.get('url') or 'json:api_declaration'
-            await context.push_str('resource', listing_api['api_declaration'], api_url)
-            await self.process_api_declaration(**context.args)
-
-            for api in listing_api['api_declaration']['apis']:
-                await context.push('api', api, 'path')
-                await self.process_resource_api(**context.args)
-                for operation in api['operations']:
-                    await context.push('operation', operation, 'nickname')
-                    await self.process_operation(**context.args)
+        context.push_str('resources', resources, resources_url)
+        if 'process_resource_listing' in hooks:
+            yield 'process_resource_listing', context
+        for listing_api in listing_apis:
+            for step in self.walk_listing_api(context, listing_api, hooks):
+                yield step
+        context.pop()
+        assert context.is_empty(), "Expected %r to be empty" % context
+
+    def walk_listing_api(self, context, listing_api, hooks=HOOKS):
+        """Walks one entry of a resource listing's apis array.
+
+        :param context: Context holding the resource listing.
+        :type  context: ParsingContext
+        :param listing_api: ResourceApi object, with its api_declaration.
+        :param hooks: Names of the hooks to visit.
+        :return: Generator of (hook name, ParsingContext)
+        """
+        context.push('listing_api', listing_api, 'path')
+        if 'process_resource_listing_api' in hooks:
+            yield 'process_resource_listing_api', context
+        context.pop()
+
+        api_url = listing_api.get('url') or 'json:api_declaration'
+        context.push_str('resource', listing_api['api_declaration'], api_url)
+        if 'process_api_declaration' in hooks:
+            yield 'process_api_declaration', context
+
+        for api in listing_api['api_declaration']['apis']:
+            context.push('api', api, 'path')
+            if 'process_resource_api' in hooks:
+                yield 'process_resource_api', context
+            for operation in api['operations']:
+                context.push('operation', operation, 'nickname')
+                if 'process_operation' in hooks:
+                    yield 'process_operation', context
+                if 'process_parameter' in hooks:
                     for parameter in operation.get('parameters', []):
-                        await context.push('parameter', parameter, 'name')
-                        await self.process_parameter(**context.args)
-                        await context.pop()
+                        context.push('parameter', parameter, 'name')
+                        yield 'process_parameter', context
+                        context.pop()
+                if 'process_error_response' in hooks:
                     for response in operation.get('errorResponses', []):
-                        await context.push('error_response', response, 'code')
-                        await self.process_error_response(**context.args)
-                        await context.pop()
-                    await context.pop()
-                await context.pop()
+                        context.push('error_response', response, 'code')
+                        yield 'process_error_response', context
+                        context.pop()
+                context.pop()
+            context.pop()
+        if 'process_model' in hooks or 'process_property' in hooks:
             models = listing_api['api_declaration'].get('models', {})
             for (name, model) in list(models.items()):
-                await context.push('model', model, 'id')
-                await self.process_model(**context.args)
-                for (name, prop) in list(model['properties'].items()):
-                    await context.push('prop', prop, 'name')
-                    await self.process_property(**context.args)
-                    await context.pop()
-                await context.pop()
-            await context.pop()
-        await context.pop()
-        assert await context.is_empty(), "Expected %r to be empty" % context
-
-    async def process_resource_listing(self, resources, context):
+                context.push('model', model, 'id')
+                if 'process_model' in hooks:
+                    yield 'process_model', context
+                if 'process_property' in hooks:
+                    for (name, prop) in list(model['properties'].items()):
+                        context.push('prop', prop, 'name')
+                        yield 'process_property', context
+                        context.pop()
+                context.pop()
+        context.pop()
+
+    def process_resource_listing(self, resources, context):
         """Post process a resources.json object.
 
         :param resources: ResourceApi object.
@@ -139,7 +313,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_resource_listing_api(self, resources, listing_api, context):
+    def process_resource_listing_api(self, resources, listing_api, context):
         """Post process entries in a resource.json's api array.
 
         :param resources: Resource listing object
@@ -149,7 +323,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_api_declaration(self, resources, resource, context):
+    def process_api_declaration(self, resources, resource, context):
         """Post process a resource object.
 
         This is parsed from a .json file reference by a resource listing's
@@ -162,7 +336,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_resource_api(self, resources, resource, api, context):
+    def process_resource_api(self, resources, resource, api, context):
         """Post process entries in a resource's api array
 
         :param resources: Resource listing object
@@ -173,7 +347,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_operation(self, resources, resource, api, operation, context):
+    def process_operation(self, resources, resource, api, operation, context):
         """Post process an operation on an api.
 
         :param resources: Resource listing object
@@ -185,7 +359,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_parameter(self, resources, resource, api, operation, parameter,
+    def process_parameter(self, resources, resource, api, operation, parameter,
                           context):
         """Post process a parameter on an operation.
 
@@ -199,7 +373,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_error_response(self, resources, resource, api, operation,
+    def process_error_response(self, resources, resource, api, operation,
                                error_response, context):
         """Post process an errorResponse on an operation.
 
@@ -213,7 +387,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_model(self, resources, resource, model, context):
+    def process_model(self, resources, resource, model, context):
         """Post process a model from a resources model dictionary.
 
         :param resources: Resource listing object
@@ -224,7 +398,7 @@ class SwaggerProcessor(object):
         """
         pass
 
-    async def process_property(self, resources, resource, model, prop, context):
+    def process_property(self, resources, resource, model, prop, context):
         """Post process a property from a model.
 
         :param resources: Resource listing object
@@ -242,10 +416,10 @@ class WebsocketProcessor(SwaggerProcessor):
     """Process the WebSocket extension for Swagger
     """
 
-    async def process_resource_api(self, resources, resource, api, context):
+    def process_resource_api(self, resources, resource, api, context):
         api.setdefault('has_websocket', False)
 
-    async def process_operation(self, resources, resource, api, operation, context):
+    def process_operation(self, resources, resource, api, operation, context):
         operation['is_websocket'] = operation.get('upgrade') == 'websocket'
 
         if operation['is_websocket']:
@@ -264,9 +438,9 @@ class FlatenningProcessor(SwaggerProcessor):
     Mustache requires a regular schema.
     """
 
-    async def process_api_declaration(self, resources, resource, context):
+    def process_api_declaration(self, resources, resource, context):
         resource.model_list = list(resource.models.values())
 
-    async def process_model(self, resources, resource, model, context):
+    def process_model(self, resources, resource, model, context):
         # Convert properties dict to list
         model.property_list = list(model.properties.values())
@@ -0,0 +1,375 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Profiling of connect() and of operation calls.
+
+A Profiler set as the 'profiler' setting of a client profiles connect(),
+attributing time to the phases of the Loader, and a window of operation
+calls, attributing time to the nickname of each operation::
+
+    profiler = Profiler(mode=SAMPLE, calls=1000, memory=True)
+    client.configure(profiler=profiler)
+    await client.connect(url)
+    ...
+    profiler.dump('/tmp/profile')
+
+Profiles are labelled 'connect' (for connect() itself), 'fetch' (loading
+the resource listing and API declarations), 'process:<processor class>',
+and the nickname of each operation called.
+
+Each step of a profiled coroutine, between two points where it awaits, is
+attributed to its label; time spent by other tasks running meanwhile is
+not. In CPROFILE mode, every label has a cProfile.Profile, dumped as
+<label>.pstats (and all.pstats for all of them); only the thread running
+the profiled coroutines is traced, as a single profiler may be active at
+a time, and steps run in other threads (like those of an offloaded Loader)
+are timed instead, into Profiler.thread_seconds. In SAMPLE mode, a thread
+samples the stacks of profiled steps every interval seconds, which costs
+less than tracing every call; the samples are dumped as collapsed stacks
+(profile.collapsed), the input format of flamegraph.pl and speedscope.
+
+With memory=True, tracemalloc snapshots are taken before and after
+connect() and the window of calls, and dumped as
+<window>-before.tracemalloc and <window>-after.tracemalloc;
+top_allocations() compares them.
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+CPROFILE = 'cprofile'
+SAMPLE = 'sample'
+
+
+class _Step(object):
+    """Awaitable driving a coroutine, profiling each of its steps.
+    """
+
+    def __init__(self, profiler, label, awaitable):
+        self.profiler = profiler
+        self.label = label
+        self.iterator = awaitable.__await__()
+
+    def __await__(self):
+        iterator = self.iterator
+        value = None
+        error = None
+        while True:
+            self.profiler._enter(self.label)
+            try:
+                if error is None:
+                    pending = iterator.send(value)
+                else:
+                    pending = iterator.throw(error)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self.profiler._exit()
+            try:
+                value = yield pending
+                error = None
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except BaseException as e:
+                value = None
+                error = e
+
+
+_STEP_CODE = _Step.__await__.__code__
+
+
+class Profiler(object):
+    """Profiles connect() and a window of operation calls.
+
+    :param mode: CPROFILE or SAMPLE.
+    :param calls: Number of operation calls profiled, or None to profile
+                  them until stop().
+    :param interval: Seconds between two samples, in SAMPLE mode.
+    :param memory: If True, take tracemalloc snapshots around connect() and
+                   the window of calls.
+    :param frames: Number of frames tracemalloc keeps per allocation.
+    """
+
+    def __init__(self, mode=CPROFILE, calls=None, interval=0.001,
+                 memory=False, frames=10):
+        if mode not in (CPROFILE, SAMPLE):
+            raise ValueError("Unknown profiling mode '%s'" % mode)
+        self.mode = mode
+        self.calls = calls
+        self.interval = interval
+        self.memory = memory
+        self.frames = frames
+        #: cProfile.Profile of each label, in CPROFILE mode
+        self.profiles = {}
+        #: Seconds of run() calls in other threads, by label, in CPROFILE
+        #: mode
+        self.thread_seconds = {}
+        #: Counts of each collapsed stack, by label, in SAMPLE mode
+        self.samples = {}
+        #: (before, after) tracemalloc snapshots, by window
+        self.snapshots = {}
+        #: Number of profiled calls of each operation
+        self.operation_calls = {}
+        self.started_calls = 0
+        self.completed_calls = 0
+        self.stopped = False
+        self._local = threading.local()
+        # Thread traced by cProfile, in CPROFILE mode
+        self._thread = None
+        self._lock = threading.Lock()
+        # Label of the step running in each thread, for the sampler
+        self._active = {}
+        self._sampler = None
+        self._sampler_stop = threading.Event()
+        self._started_tracemalloc = False
+
+    def __repr__(self):
+        return "%s(%s, calls=%d/%s)" % (
+            self.__class__.__name__, self.mode, self.started_calls,
+            self.calls)
+
+    async def profile(self, label, awaitable):
+        """Profiles an awaitable under a label.
+
+        :return: Result of the awaitable.
+        """
+        return await _Step(self, label, awaitable)
+
+    def run(self, label, fn, *args):
+        """Profiles a function call under a label.
+
+        May be called from any thread. In CPROFILE mode, calls from a thread
+        other than the traced one are only timed: cProfile would refuse to
+        enable a second profiler on Python 3.12 and later.
+
+        :return: Result of fn.
+        """
+        if self.mode == CPROFILE and \
+                self._thread not in (None, threading.get_ident()):
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.thread_seconds[label] = \
+                        self.thread_seconds.get(label, 0.0) + \
+                        time.perf_counter() - start
+        self._enter(label)
+        try:
+            return fn(*args)
+        finally:
+            self._exit()
+
+    async def operation(self, nickname, awaitable):
+        """Profiles a call of an operation, if it is in the window.
+
+        The window ends, and stop() is called, once the calls it holds have
+        completed.
+
+        :param nickname: Nickname of the operation.
+        :param awaitable: Awaitable of the call.
+        :return: Result of the call.
+        """
+        if self.stopped or \
+                (self.calls is not None and self.started_calls >= self.calls):
+            return await awaitable
+        if self.started_calls == 0:
+            self.begin('calls')
+        self.started_calls += 1
+        self.operation_calls[nickname] = \
+            self.operation_calls.get(nickname, 0) + 1
+        try:
+            return await self.profile(nickname, awaitable)
+        finally:
+            self.completed_calls += 1
+            if self.completed_calls == self.calls:
+                self.stop()
+
+    def begin(self, window):
+        """Takes the 'before' memory snapshot of a window.
+
+        :param window: Name of the window, like 'connect' or 'calls'.
+        """
+        if not self.memory:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracemalloc = True
+        self.snapshots[window] = [self._snapshot(), None]
+
+    def end(self, window):
+        """Takes the 'after' memory snapshot of a window.
+        """
+        snapshots = self.snapshots.get(window)
+        if snapshots is not None and snapshots[1] is None:
+            snapshots[1] = self._snapshot()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),
+             tracemalloc.Filter(False, __file__)))
+
+    def stop(self):
+        """Ends the window of calls, and stops sampling and tracing memory.
+        """
+        if self.stopped:
+            return
+        self.stopped = True
+        self.end('calls')
+        if self._sampler is not None:
+            self._sampler_stop.set()
+            self._sampler.join()
+            self._sampler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _enter(self, label):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        if stack:
+            self._suspend(stack[-1])
+        stack.append(label)
+        self._resume(label)
+
+    def _exit(self):
+        stack = self._local.stack
+        self._suspend(stack.pop())
+        if stack:
+            self._resume(stack[-1])
+
+    def _resume(self, label):
+        if self.mode == CPROFILE:
+            if self._thread is None:
+                self._thread = threading.get_ident()
+            elif self._thread != threading.get_ident():
+                return
+            profile = self.profiles.get(label)
+            if profile is None:
+                profile = self.profiles[label] = cProfile.Profile()
+            profile.enable()
+            return
+        self._active[threading.get_ident()] = label
+        if self._sampler is None and not self.stopped:
+            self._sampler = threading.Thread(
+                target=self._sample, name='swaggerpy3-profiler', daemon=True)
+            self._sampler.start()
+
+    def _suspend(self, label):
+        if self.mode == CPROFILE:
+            if self._thread == threading.get_ident():
+                self.profiles[label].disable()
+        else:
+            self._active.pop(threading.get_ident(), None)
+
+    def _sample(self):
+        while not self._sampler_stop.wait(self.interval):
+            frames = sys._current_frames()
+            for (thread_id, label) in list(self._active.items()):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = collapse(frame)
+                counts = self.samples.setdefault(label, {})
+                counts[stack] = counts.get(stack, 0) + 1
+
+    def stats(self, label=None):
+        """Returns the cProfile statistics of a label, or of all of them.
+
+        :rtype: pstats.Stats
+        :raise KeyError: If nothing was profiled under the label.
+        """
+        if label is not None:
+            return pstats.Stats(self.profiles[label])
+        if not self.profiles:
+            raise KeyError("Nothing was profiled")
+        return pstats.Stats(*self.profiles.values())
+
+    def collapsed(self):
+        """Returns the samples as collapsed stacks.
+
+        :return: Lines like 'label;outer (file:line);inner (file:line) 12'.
+        """
+        lines = []
+        for (label, counts) in sorted(self.samples.items()):
+            for (stack, count) in sorted(counts.items()):
+                lines.append('%s;%s %d' % (label, stack, count) if stack
+                             else '%s %d' % (label, count))
+        return lines
+
+    def top_allocations(self, window, limit=10):
+        """Compares the memory snapshots of a window.
+
+        :param window: Name of the window.
+        :param limit: Maximum number of differences returned.
+        :return: tracemalloc.StatisticDiff list, largest first.
+        """
+        before, after = self.snapshots[window]
+        if after is None:
+            after = self._snapshot()
+        return after.compare_to(before, 'lineno')[:limit]
+
+    def dump(self, directory):
+        """Writes the profiles to a directory.
+
+        :return: Paths of the files written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for (label, profile) in sorted(self.profiles.items()):
+            path = os.path.join(directory, '%s.pstats' % file_name(label))
+            profile.dump_stats(path)
+            paths.append(path)
+        if self.profiles:
+            path = os.path.join(directory, 'all.pstats')
+            self.stats().dump_stats(path)
+            paths.append(path)
+        if self.samples:
+            path = os.path.join(directory, 'profile.collapsed')
+            with open(path, 'w') as fp:
+                fp.writelines(line + '\n' for line in self.collapsed())
+            paths.append(path)
+        for (window, snapshots) in sorted(self.snapshots.items()):
+            for (name, snapshot) in zip(('before', 'after'), snapshots):
+                if snapshot is None:
+                    continue
+                path = os.path.join(directory, '%s-%s.tracemalloc' % (
+                    file_name(window), name))
+                snapshot.dump(path)
+                paths.append(path)
+        return paths
+
+
+def collapse(frame):
+    """Formats the stack of a frame, up to the profiled step, outermost
+    first.
+    """
+    names = []
+    while frame is not None and frame.f_code is not _STEP_CODE:
+        code = frame.f_code
+        if code is _RUN_CODE:
+            break
+        names.append('%s (%s:%d)' % (code.co_name,
+                                     os.path.basename(code.co_filename),
+                                     code.co_firstlineno))
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+def file_name(label):
+    """Turns a label into a file name.
+    """
+    return re.sub(r'[^\w.-]', '_', label)
+
+
+_RUN_CODE = Profiler.run.__code__
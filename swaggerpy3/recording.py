@@ -0,0 +1,439 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Recording and replay of HTTP and websocket traffic.
+
+A RecordingTransport sends requests through another transport, and records
+every exchange, and every websocket frame, to a log file::
+
+    recorder = RecordingTransport('traffic.log.gz')
+    await client.connect(url, http_client=AsyncHttpClient(
+        transport=recorder))
+    ...
+    await client.close()
+
+A ReplayTransport answers from such a log, without network access; the
+resource listing and API declarations are replayed too, if connect() was
+recorded::
+
+    replay = ReplayTransport('traffic.log.gz', speed=None)
+    await client.connect(url, http_client=AsyncHttpClient(transport=replay))
+
+With speed=1.0, responses take as long as they took when recorded, and
+websocket frames arrive at their recorded offsets from the opening of
+their websocket; with speed=2.0, twice as fast; with speed=None, as fast
+as possible. Requests are matched on their method and URL, query string
+included (parameters sorted); equal requests get the recorded responses
+in order. Requests that were not recorded raise ReplayError.
+
+Requests that failed without a response are recorded too, and replayed as
+asyncio.TimeoutError for timeouts, and as aiohttp.ClientConnectionError
+otherwise, naming the original error. Websockets that failed to open are
+not recorded; replaying them raises ReplayError.
+
+The log is a gzip stream of records: a 9 byte header (kind, length of the
+JSON metadata, length of the body), the metadata, and the raw body, so
+bodies are stored as is, and compressed with the rest. Recording only
+buffers the records; a background task compresses and writes them from
+the loop's default executor, so the event loop, and the timings recorded,
+are not held up by the log.
+"""
+
+import asyncio
+import gzip
+import json
+import struct
+import time
+
+from .transport import (BufferedResponse, SessionTransport, Transport,
+                        request_url)
+
+#: Record of a request and its response
+EXCHANGE = 1
+#: Record of the opening of a websocket
+WS_OPEN = 2
+#: Record of a websocket frame
+WS_FRAME = 3
+
+_HEADER = struct.Struct('>BII')
+
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class ReplayError(Exception):
+    """Raised when a request has no recorded response left.
+    """
+
+
+def encode_record(kind, meta, body=b''):
+    """Encodes a record of a log.
+
+    :param kind: EXCHANGE, WS_OPEN or WS_FRAME.
+    :param meta: JSON serializable metadata.
+    :param body: Body bytes.
+    :rtype: bytes
+    """
+    meta = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+    return b''.join((_HEADER.pack(kind, len(meta), len(body)), meta, body))
+
+
+def write_record(fp, kind, meta, body=b''):
+    """Writes a record to a log.
+
+    :param fp: Binary file.
+    :param kind: EXCHANGE, WS_OPEN or WS_FRAME.
+    :param meta: JSON serializable metadata.
+    :param body: Body bytes.
+    """
+    fp.write(encode_record(kind, meta, body))
+
+
+def read_log(path):
+    """Reads the records of a log.
+
+    :return: Generator of (kind, metadata, body).
+    """
+    with gzip.open(path, 'rb') as fp:
+        while True:
+            header = fp.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            kind, meta_size, body_size = _HEADER.unpack(header)
+            meta = json.loads(fp.read(meta_size).decode('utf-8'))
+            yield kind, meta, fp.read(body_size)
+
+
+class RecordingTransport(Transport):
+    """Transport recording the traffic of another one.
+
+    :param path: Path of the log; it is overwritten.
+    :param transport: Transport sending the requests; by default, a
+                      SessionTransport.
+    :param compresslevel: gzip compression level of the log.
+    """
+
+    def __init__(self, path, transport=None, compresslevel=6):
+        if transport is None:
+            transport = SessionTransport()
+        self.path = path
+        self.transport = transport
+        self.fp = gzip.open(path, 'wb', compresslevel=compresslevel)
+        # Encoded records waiting to be written by self.task
+        self.buffer = []
+        self.task = None
+        self.closed = False
+        self.start = time.monotonic()
+        self.websocket_ids = 0
+        #: Number of exchanges recorded
+        self.exchanges = 0
+        #: Number of websocket frames recorded
+        self.frames = 0
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.path)
+
+    def get_session(self):
+        return self.transport.get_session()
+
+    def _offset(self):
+        return round(time.monotonic() - self.start, 6)
+
+    def _record(self, kind, meta, body=b''):
+        """Buffers a record, to be written by the background task.
+
+        Must be called from the event loop.
+        """
+        if self.closed:
+            return
+        self.buffer.append(encode_record(kind, meta, body))
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        # Runs while there are records to write
+        loop = asyncio.get_running_loop()
+        while self.buffer:
+            batch = self.buffer
+            self.buffer = []
+            await loop.run_in_executor(None, self._write, batch)
+
+    def _write(self, batch):
+        for record in batch:
+            self.fp.write(record)
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        offset = self._offset()
+        start = time.monotonic()
+        try:
+            response = await self.transport.request(
+                method, url, params=params, data=data, headers=headers,
+                auth=auth, timeout=timeout)
+            body = await response.read()
+        except Exception as e:
+            self._record(EXCHANGE, {
+                't': offset,
+                'duration': round(time.monotonic() - start, 6),
+                'method': method,
+                'url': request_url(url, params),
+                'error': type(e).__name__,
+                'timeout': isinstance(e, asyncio.TimeoutError),
+                'message': str(e),
+            })
+            self.exchanges += 1
+            raise
+        # The body is recorded decoded
+        headers = [(name, value)
+                   for (name, value) in response.headers.items()
+                   if name.lower() not in _DROPPED_HEADERS]
+        headers.append(('Content-Length', str(len(body))))
+        self._record(EXCHANGE, {
+            't': offset,
+            'duration': round(time.monotonic() - start, 6),
+            'method': method,
+            'url': request_url(url, params),
+            'status': response.status,
+            'reason': response.reason,
+            'headers': headers,
+        }, body)
+        self.exchanges += 1
+        return response
+
+    async def ws_connect(self, url, auth=None, heartbeat=None):
+        offset = self._offset()
+        ws = await self.transport.ws_connect(url, auth=auth,
+                                             heartbeat=heartbeat)
+        self.websocket_ids += 1
+        self._record(WS_OPEN, {
+            't': offset, 'id': self.websocket_ids, 'url': url})
+        return RecordingWebSocket(self, ws, self.websocket_ids)
+
+    def record_frame(self, websocket_id, direction, msg_type, data):
+        """Records a websocket frame.
+
+        :param direction: 'in' for received frames, 'out' for sent ones.
+        :param msg_type: Name of the aiohttp.WSMsgType of the frame.
+        :param data: Data of the frame, as text or bytes.
+        """
+        if isinstance(data, str):
+            body, text = data.encode('utf-8'), True
+        else:
+            body, text = data or b'', False
+        self._record(WS_FRAME, {
+            't': self._offset(), 'id': websocket_id, 'dir': direction,
+            'type': msg_type, 'text': text}, body)
+        self.frames += 1
+
+    async def close(self):
+        """Closes the transport, and writes the rest of the log.
+        """
+        await self.transport.close()
+        self.closed = True
+        if self.task is not None:
+            await self.task
+            self.task = None
+        if not self.fp.closed:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._close_log)
+
+    def _close_log(self):
+        self._write(self.buffer)
+        self.buffer = []
+        self.fp.close()
+
+
+class RecordingWebSocket(object):
+    """Websocket recording the frames it sends and receives.
+    """
+
+    def __init__(self, recorder, ws, websocket_id):
+        self.recorder = recorder
+        self.ws = ws
+        self.id = websocket_id
+
+    def __getattr__(self, item):
+        return getattr(self.ws, item)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        msg = await self.receive()
+        if msg.type.name in ('CLOSE', 'CLOSING', 'CLOSED'):
+            raise StopAsyncIteration
+        return msg
+
+    async def receive(self, timeout=None):
+        msg = await self.ws.receive(timeout)
+        self.recorder.record_frame(self.id, 'in', msg.type.name,
+                                   msg.data if msg.type.name in
+                                   ('TEXT', 'BINARY') else b'')
+        return msg
+
+    async def receive_str(self, timeout=None):
+        msg = await self.receive(timeout)
+        if msg.type.name != 'TEXT':
+            raise TypeError("Received message %s:%r is not TEXT" %
+                            (msg.type.name, msg.data))
+        return msg.data
+
+    async def receive_bytes(self, timeout=None):
+        msg = await self.receive(timeout)
+        if msg.type.name != 'BINARY':
+            raise TypeError("Received message %s:%r is not BINARY" %
+                            (msg.type.name, msg.data))
+        return msg.data
+
+    async def receive_json(self, loads=json.loads, timeout=None):
+        return loads(await self.receive_str(timeout))
+
+    async def send_str(self, data, compress=None):
+        self.recorder.record_frame(self.id, 'out', 'TEXT', data)
+        await self.ws.send_str(data, compress)
+
+    async def send_bytes(self, data, compress=None):
+        self.recorder.record_frame(self.id, 'out', 'BINARY', data)
+        await self.ws.send_bytes(data, compress)
+
+    async def send_json(self, data, compress=None, dumps=json.dumps):
+        await self.send_str(dumps(data), compress)
+
+    async def close(self, **kwargs):
+        return await self.ws.close(**kwargs)
+
+
+class ReplayTransport(Transport):
+    """Transport answering from a recorded log.
+
+    :param path: Path of the log.
+    :param speed: Replay speed relative to the recording, or None for as
+                  fast as possible.
+    """
+
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+        self.exchanges = {}
+        self.websockets = {}
+        frames = {}
+        opened = {}
+        for (kind, meta, body) in read_log(path):
+            if kind == EXCHANGE:
+                key = (meta['method'], meta['url'])
+                self.exchanges.setdefault(key, []).append((meta, body))
+            elif kind == WS_OPEN:
+                opened[meta['id']] = meta
+                frames[meta['id']] = []
+                self.websockets.setdefault(meta['url'], []).append(
+                    (meta, frames[meta['id']]))
+            elif kind == WS_FRAME and meta['dir'] == 'in':
+                frames[meta['id']].append(
+                    (meta['t'] - opened[meta['id']]['t'], meta, body))
+        # Serve each list in order
+        for exchanges in self.exchanges.values():
+            exchanges.reverse()
+        for websockets in self.websockets.values():
+            websockets.reverse()
+        #: Number of requests answered
+        self.replayed = 0
+
+    def __repr__(self):
+        return "%s(%s, speed=%r)" % (self.__class__.__name__, self.path,
+                                     self.speed)
+
+    async def _wait(self, seconds):
+        if self.speed is not None and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        url = request_url(url, params)
+        recorded = self.exchanges.get((method, url))
+        if not recorded:
+            raise ReplayError("No recorded response left for %s %s" %
+                              (method, url))
+        meta, body = recorded.pop()
+        await self._wait(meta['duration'])
+        self.replayed += 1
+        error = meta.get('error')
+        if error is not None:
+            if meta.get('timeout'):
+                raise asyncio.TimeoutError()
+            import aiohttp
+            raise aiohttp.ClientConnectionError(
+                "%s: %s" % (error, meta['message']))
+        return BufferedResponse(method, url, meta['status'],
+                                meta['headers'], body, meta.get('reason'))
+
+    async def ws_connect(self, url, auth=None, heartbeat=None):
+        recorded = self.websockets.get(url)
+        if not recorded:
+            raise ReplayError("No recorded websocket left for %s" % url)
+        meta, frames = recorded.pop()
+        return ReplayWebSocket(self, frames)
+
+
+class ReplayWebSocket(object):
+    """Websocket replaying recorded frames.
+
+    Frames sent are discarded.
+    """
+
+    def __init__(self, transport, frames):
+        self.transport = transport
+        self.frames = list(frames)
+        self.frames.reverse()
+        self.opened = time.monotonic()
+        self.closed = False
+        #: Frames sent, as (type name, data)
+        self.sent = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        msg = await self.receive()
+        if msg.type.name in ('CLOSE', 'CLOSING', 'CLOSED'):
+            raise StopAsyncIteration
+        return msg
+
+    async def receive(self, timeout=None):
+        from aiohttp import WSMessage, WSMsgType
+        if self.closed or not self.frames:
+            self.closed = True
+            return WSMessage(WSMsgType.CLOSED, None, None)
+        offset, meta, body = self.frames.pop()
+        speed = self.transport.speed
+        if speed is not None:
+            delay = self.opened + offset / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        msg_type = WSMsgType[meta['type']]
+        data = body.decode('utf-8') if meta['text'] else body
+        if msg_type in (WSMsgType.CLOSE, WSMsgType.CLOSED, WSMsgType.ERROR):
+            self.closed = True
+            return WSMessage(msg_type, None, None)
+        return WSMessage(msg_type, data, None)
+
+    async def send_str(self, data, compress=None):
+        self.sent.append(('TEXT', data))
+
+    async def send_bytes(self, data, compress=None):
+        self.sent.append(('BINARY', data))
+
+    async def send_json(self, data, compress=None, dumps=json.dumps):
+        await self.send_str(dumps(data))
+
+    async def receive_str(self, timeout=None):
+        return (await self.receive(timeout)).data
+
+    async def receive_bytes(self, timeout=None):
+        return (await self.receive(timeout)).data
+
+    async def receive_json(self, loads=json.loads, timeout=None):
+        return loads(await self.receive_str(timeout))
+
+    async def close(self, **kwargs):
+        self.closed = True
+        return True
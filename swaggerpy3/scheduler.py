@@ -0,0 +1,200 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Priority scheduling of requests.
+
+A Scheduler bounds the number of requests an AsyncHttpClient has in flight,
+and queues the others by priority class. Classes share the slots freed by
+weighted fair queuing: under saturation, a class of weight 8 gets eight
+times the slots of a class of weight 1, so call control keeps a low latency
+while bulk requests still progress. A request that has waited longer than
+max_wait is dispatched first, whatever its class, so none starve.
+
+::
+
+    http_client = AsyncHttpClient(scheduler=Scheduler(concurrency=50))
+    await client.connect(url, http_client=http_client)
+    client.configure(priority='bulk')
+    client.configure('answer', priority='critical')
+    await client.recordings.listStored(_priority='normal')
+"""
+
+import asyncio
+import collections
+import time
+
+from .deadline import check
+
+#: Default classes and their weights
+DEFAULT_WEIGHTS = {'critical': 8, 'normal': 4, 'bulk': 1}
+
+
+class ClassStats(object):
+    """Counters of a priority class.
+    """
+
+    def __init__(self):
+        #: Number of requests dispatched
+        self.dispatched = 0
+        #: Number of requests that had to queue
+        self.queued = 0
+        #: Total seconds spent queuing
+        self.wait = 0.0
+        #: Longest wait, in seconds
+        self.max_wait = 0.0
+        #: Number of requests dispatched ahead of their turn, after waiting
+        #: max_wait
+        self.starved = 0
+
+    def __repr__(self):
+        return "ClassStats(dispatched=%d, queued=%d, max_wait=%.1fms)" % (
+            self.dispatched, self.queued, self.max_wait * 1e3)
+
+
+class Scheduler(object):
+    """Weighted fair queue of requests.
+
+    :param concurrency: Maximum number of requests in flight.
+    :param weights: Weight of each priority class, by name.
+    :param default: Class of requests without a priority.
+    :param max_wait: Seconds after which a queued request is dispatched
+                     before the others.
+    :param clock: Time source, for testing.
+    """
+
+    def __init__(self, concurrency=100, weights=None, default='normal',
+                 max_wait=1.0, clock=time.monotonic):
+        self.concurrency = concurrency
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        if default not in self.weights:
+            raise ValueError("Default class '%s' has no weight" % default)
+        self.default = default
+        self.max_wait = max_wait
+        self.clock = clock
+        self.active = 0
+        self.queues = {name: collections.deque() for name in self.weights}
+        # Virtual time, and virtual finish time of the last request of each
+        # class (self-clocked fair queuing)
+        self.vtime = 0.0
+        self.finish = dict.fromkeys(self.weights, 0.0)
+        self.stats = {name: ClassStats() for name in self.weights}
+
+    def __repr__(self):
+        return "%s(active=%d, queued=%r)" % (
+            self.__class__.__name__, self.active, self.depth())
+
+    def depth(self):
+        """Returns the number of queued requests, by class.
+        """
+        return {name: sum(1 for (_, _, f) in queue if not f.cancelled())
+                for (name, queue) in self.queues.items()}
+
+    def slot(self, priority=None):
+        """Async context manager holding a slot for a request.
+
+        :param priority: Class of the request; defaults to the default class.
+        """
+        return _Slot(self, priority)
+
+    async def acquire(self, priority=None):
+        """Waits for a slot; release() it when the request completes.
+
+        :param priority: Class of the request; defaults to the default class.
+        :raise ValueError: If the class is unknown.
+        :raise swaggerpy3.deadline.DeadlineExceeded: If the deadline of the
+            request passed while it was queued; no slot is held then.
+        """
+        name = priority or self.default
+        queue = self.queues.get(name)
+        if queue is None:
+            raise ValueError("Unknown priority '%s'" % name)
+        stats = self.stats[name]
+        tag = self._tag(name)
+        if self.active < self.concurrency and \
+                not any(self.queues.values()):
+            self.active += 1
+            self.vtime = tag
+            stats.dispatched += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        queue.append((tag, self.clock(), future))
+        stats.queued += 1
+        # Slots may be free, if the queue only held cancelled requests
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        try:
+            check()
+        except Exception:
+            self.release()
+            raise
+
+    def release(self):
+        """Frees the slot of a completed request.
+        """
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Dispatches queued requests to the free slots.
+        """
+        while self.active < self.concurrency:
+            name = self._next()
+            if name is None:
+                return
+            tag, enqueued, future = self.queues[name].popleft()
+            self.vtime = max(self.vtime, tag)
+            waited = self.clock() - enqueued
+            stats = self.stats[name]
+            stats.dispatched += 1
+            stats.wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+            self.active += 1
+            future.set_result(None)
+
+    def _next(self):
+        """Picks the class of the next request to dispatch, or None.
+        """
+        now = self.clock()
+        starved = None
+        ready = []
+        for (name, queue) in self.queues.items():
+            while queue and queue[0][2].cancelled():
+                queue.popleft()
+            if not queue:
+                continue
+            ready.append(name)
+            if now - queue[0][1] >= self.max_wait and (
+                    starved is None or
+                    queue[0][1] < self.queues[starved][0][1]):
+                starved = name
+        if not ready:
+            return None
+        if starved is not None:
+            self.stats[starved].starved += 1
+            return starved
+        return min(ready, key=lambda n: self.queues[n][0][0])
+
+    def _tag(self, name):
+        """Computes the virtual finish time of a new request of a class.
+        """
+        tag = max(self.finish[name], self.vtime) + 1.0 / self.weights[name]
+        self.finish[name] = tag
+        return tag
+
+
+class _Slot(object):
+    def __init__(self, scheduler, priority):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    async def __aenter__(self):
+        await self.scheduler.acquire(self.priority)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.scheduler.release()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Local stub server for a Swagger API, and load-test command line app.
+
+A StubServer serves the resource listing and API declarations of a local
+API definition, and answers every operation with a synthetic body shaped
+like its responseClass, after an optional latency, or with an injected
+error::
+
+    stub = StubServer('test-data/1.1/simple/resources.json',
+                      latency=0.005, jitter=0.002, error_rate=0.01)
+    url = await stub.start()
+    await client.connect(url)
+
+Errors use the status codes of the operation's errorResponses, or 500.
+Websocket operations are answered with 501.
+
+The swagger-stub command serves an API, or load tests one, through
+SwaggerClient, with swaggerpy3.loadgen::
+
+    swagger-stub serve test-data/1.1/simple/resources.json --port 8088
+    swagger-stub load test-data/1.1/simple/resources.json \\
+        -o simple.getAsteriskInfo --rps 500 --duration 10
+
+Unless --url is given, load starts a stub server in the same process.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+import random
+import re
+import sys
+import urllib.parse
+
+from optparse import OptionParser
+
+USAGE = """usage: %prog serve [options] resources.json
+       %prog load [options] resources.json
+       %prog load --url URL [options]"""
+
+#: Path the resource listing is served at
+LISTING_PATH = '/api-docs/resources.json'
+
+_LIST_TYPE = re.compile(r'^(?:List|Array|Set)\[(.+)\]$')
+
+
+def synthesize(type_name, models, rng, list_size=3, depth=0):
+    """Builds a value of a Swagger type.
+
+    :param type_name: Primitive type, model id, or List[...] of them.
+    :param models: Models of the API declaration, by id.
+    :param rng: random.Random instance.
+    :param list_size: Number of items of lists.
+    :param depth: Nesting depth; models nested deeper than 4 are empty.
+    :return: JSON compatible value; None for void.
+    """
+    match = _LIST_TYPE.match(type_name or '')
+    if match:
+        return [synthesize(match.group(1), models, rng, list_size, depth + 1)
+                for _ in range(list_size)]
+    lower = (type_name or 'void').lower()
+    if lower == 'void':
+        return None
+    if lower == 'string':
+        return 'string-%d' % rng.randint(0, 9999)
+    if lower in ('int', 'integer', 'long', 'byte'):
+        return rng.randint(0, 9999)
+    if lower in ('double', 'float', 'number'):
+        return round(rng.uniform(0, 9999), 2)
+    if lower == 'boolean':
+        return rng.random() < 0.5
+    if lower in ('date', 'datetime', 'date-time'):
+        return datetime.datetime.fromtimestamp(
+            rng.randint(0, 2 ** 31), datetime.timezone.utc).isoformat()
+    model = models.get(type_name)
+    if model is None or depth > 4:
+        return {}
+    properties = model.get('properties') or {}
+    if isinstance(properties, list):
+        properties = {prop['name']: prop for prop in properties}
+    return {name: synthesize_property(prop, models, rng, list_size, depth)
+            for (name, prop) in properties.items()}
+
+
+def synthesize_property(prop, models, rng, list_size=3, depth=0):
+    """Builds the value of a model property.
+    """
+    allowable = prop.get('allowableValues') or {}
+    if allowable.get('valueType') == 'LIST' and allowable.get('values'):
+        return rng.choice(allowable['values'])
+    type_name = prop.get('type') or prop.get('dataType') or prop.get('$ref')
+    items = prop.get('items')
+    if type_name in ('Array', 'List', 'Set', 'array') and items:
+        type_name = 'List[%s]' % (items.get('type') or items.get('$ref'))
+    return synthesize(type_name, models, rng, list_size, depth + 1)
+
+
+def load_definition(resources_file):
+    """Reads a resource listing and its API declarations from files.
+
+    :param resources_file: Path of the resource listing.
+    :return: Resource listing, with each API's ['api_declaration'].
+    """
+    with open(resources_file) as fp:
+        listing = json.load(fp)
+    directory = os.path.dirname(os.path.abspath(resources_file))
+    for api in listing.get('apis') or []:
+        path = api['path'].replace('{format}', 'json').strip('/')
+        with open(os.path.join(directory, path)) as fp:
+            api['api_declaration'] = json.load(fp)
+    return listing
+
+
+class StubServer(object):
+    """aiohttp server answering the operations of an API.
+
+    :param resources_file: Path of the resource listing.
+    :param latency: Seconds every response is delayed by.
+    :param jitter: Maximum random extra delay, in seconds.
+    :param error_rate: Fraction of the calls answered with an error.
+    :param error_status: Status of injected errors; by default, one of the
+                         operation's errorResponses, or 500.
+    :param list_size: Number of items of synthetic lists.
+    :param rng: random.Random instance, for testing.
+    """
+
+    def __init__(self, resources_file, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=None, list_size=3, rng=None):
+        self.listing = load_definition(resources_file)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.list_size = list_size
+        self.rng = rng or random.Random()
+        self.runner = None
+        self.url = None
+        #: Number of calls answered, by nickname
+        self.calls = {}
+        #: Number of errors injected
+        self.errors = 0
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.url)
+
+    def app(self):
+        """Builds the aiohttp application of the stub.
+
+        :rtype: aiohttp.web.Application
+        """
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get(LISTING_PATH, self.get_listing)
+        for api in self.listing.get('apis') or []:
+            declaration = api['api_declaration']
+            path = api['path'].replace('{format}', 'json')
+            app.router.add_get('/api-docs/' + path.strip('/'),
+                               self.declaration_handler(declaration))
+            prefix = urllib.parse.urlsplit(
+                declaration.get('basePath') or '').path.rstrip('/')
+            models = declaration.get('models') or {}
+            for entry in declaration.get('apis') or []:
+                for operation in entry.get('operations') or []:
+                    app.router.add_route(
+                        operation['httpMethod'], prefix + entry['path'],
+                        self.operation_handler(operation, models))
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Starts serving.
+
+        :return: URL of the resource listing.
+        """
+        from aiohttp import web
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = 'http://%s:%d%s' % (host, port, LISTING_PATH)
+        return self.url
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def get_listing(self, request):
+        from aiohttp import web
+        origin = str(request.url.origin())
+        listing = dict(self.listing, basePath=origin + '/api-docs')
+        listing['apis'] = [
+            {key: value for (key, value) in api.items()
+             if key != 'api_declaration'}
+            for api in listing['apis']]
+        return web.json_response(listing)
+
+    def declaration_handler(self, declaration):
+        from aiohttp import web
+
+        async def get_declaration(request):
+            path = urllib.parse.urlsplit(
+                declaration.get('basePath') or '').path
+            base_path = str(request.url.origin()) + path.rstrip('/')
+            return web.json_response(dict(declaration, basePath=base_path))
+
+        return get_declaration
+
+    def operation_handler(self, operation, models):
+        from aiohttp import web
+        nickname = operation['nickname']
+        response_class = operation.get('responseClass')
+        codes = [error['code'] for error in
+                 operation.get('errorResponses') or [] if 'code' in error]
+        websocket = operation.get('upgrade') == 'websocket'
+
+        async def handle(request):
+            self.calls[nickname] = self.calls.get(nickname, 0) + 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if websocket:
+                return web.Response(status=501)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors += 1
+                status = self.error_status or \
+                    (self.rng.choice(codes) if codes else 500)
+                return web.json_response(
+                    {'message': 'Injected error'}, status=status)
+            body = synthesize(response_class, models, self.rng,
+                              self.list_size)
+            if body is None:
+                return web.Response(status=204)
+            return web.json_response(body)
+
+        return handle
+
+
+def parse_params(values):
+    """Parses name=value command line arguments.
+    """
+    params = {}
+    for value in values or ():
+        name, sep, param = value.partition('=')
+        if not sep:
+            raise ValueError("Expected name=value, got '%s'" % value)
+        params[name] = param
+    return params
+
+
+async def serve(resources_file, host, port, **kwargs):
+    stub = StubServer(resources_file, **kwargs)
+    url = await stub.start(host, port)
+    print("Serving %s at %s" % (resources_file, url))
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await stub.close()
+
+
+async def load(resources_file, url, operations, params, stub_options,
+               **options):
+    from .client import SwaggerClient
+    from .loadgen import LoadGenerator
+    stub = None
+    if url is None:
+        stub = StubServer(resources_file, **stub_options)
+        url = await stub.start()
+    client = SwaggerClient()
+    try:
+        await client.connect(url)
+        generator = LoadGenerator(client, operations, params, **options)
+        report = await generator.run()
+    finally:
+        await client.close()
+        if stub is not None:
+            await stub.close()
+    print(report.format())
+    return report
+
+
+def main(argv=None):
+    """Main method, as invoked by setuptools launcher script.
+
+    :param argv: Command line argument list.
+    """
+    if argv is None:
+        argv = sys.argv
+
+    parser = OptionParser(usage=USAGE)
+    parser.add_option("--host", dest="host", default="127.0.0.1",
+                      help="Address to serve on")
+    parser.add_option("--port", dest="port", type="int", default=8088,
+                      help="Port to serve on")
+    parser.add_option("--latency", dest="latency", type="float", default=0,
+                      help="Response latency, in milliseconds")
+    parser.add_option("--jitter", dest="jitter", type="float", default=0,
+                      help="Maximum random extra latency, in milliseconds")
+    parser.add_option("--error-rate", dest="error_rate", type="float",
+                      default=0, help="Fraction of calls failing")
+    parser.add_option("--error-status", dest="error_status", type="int",
+                      help="Status of failing calls")
+    parser.add_option("--url", dest="url",
+                      help="load: resource listing URL of a running server")
+    parser.add_option("-o", "--operation", dest="operations",
+                      action="append", default=[],
+                      help="load: resource.nickname of an operation to call")
+    parser.add_option("-p", "--param", dest="params", action="append",
+                      help="load: name=value parameter of the calls")
+    parser.add_option("--rps", dest="rps", type="float",
+                      help="load: target requests per second")
+    parser.add_option("-c", "--concurrency", dest="concurrency", type="int",
+                      default=10, help="load: maximum calls in flight")
+    parser.add_option("-d", "--duration", dest="duration", type="float",
+                      default=10, help="load: duration, in seconds")
+    parser.add_option("-n", "--requests", dest="requests", type="int",
+                      help="load: number of calls, instead of a duration")
+
+    (options, args) = parser.parse_args(argv)
+
+    if len(args) < 2:
+        parser.error("Missing arguments")
+    elif len(args) > 3:
+        parser.error("Too many arguments")
+
+    command = args[1]
+    resources_file = args[2] if len(args) > 2 else None
+    # load calls a running server instead, with --url
+    if resources_file is None and not (command == 'load' and options.url):
+        parser.error("Missing resources.json")
+    stub_options = {
+        'latency': options.latency / 1000.0,
+        'jitter': options.jitter / 1000.0,
+        'error_rate': options.error_rate,
+        'error_status': options.error_status,
+    }
+    try:
+        if command == 'serve':
+            asyncio.run(serve(resources_file, options.host, options.port,
+                              **stub_options))
+        elif command == 'load':
+            if not options.operations:
+                parser.error("load requires at least one --operation")
+            asyncio.run(load(
+                resources_file, options.url, options.operations,
+                parse_params(options.params), stub_options,
+                rps=options.rps, concurrency=options.concurrency,
+                duration=options.duration, requests=options.requests))
+        else:
+            parser.error("Unknown command '%s'" % command)
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+# And sometimes you just want to run the script...
+if __name__ == "__main__":
+    sys.exit(main() or 0)
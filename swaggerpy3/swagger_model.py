@@ -6,13 +6,19 @@
 """Code for handling the base Swagger API model.
 """
 
+import asyncio
+import hashlib
 import json
+import logging
 import os
-import urllib.request, urllib.parse, urllib.error
+import time
 import urllib.parse
 
+from .compact import CompiledSpec
 from .http_client import AsyncHttpClient
-from .processors import SwaggerProcessor, SwaggerError
+from .processors import SwaggerProcessor, SwaggerError, ProcessingStats
+
+log = logging.getLogger(__name__)
 
 SWAGGER_VERSIONS = ["1.1", "1.2"]
 
@@ -34,22 +40,22 @@ class ValidationProcessor(SwaggerProcessor):
     """A processor that validates the Swagger model.
     """
 
-    async def process_resource_listing(self, resources, context):
+    def process_resource_listing(self, resources, context):
         required_fields = ['basePath', 'apis', 'swaggerVersion']
         validate_required_fields(resources, required_fields, context)
 
         if not resources['swaggerVersion'] in SWAGGER_VERSIONS:
             raise SwaggerError(
-                "Unsupported Swagger version %s" % resources.swaggerVersion,
+                "Unsupported Swagger version %s" % resources['swaggerVersion'],
                 context)
 
-    async def process_resource_listing_api(self, resources, listing_api, context):
+    def process_resource_listing_api(self, resources, listing_api, context):
         validate_required_fields(listing_api, ['path', 'description'], context)
 
         if not listing_api['path'].startswith("/"):
             raise SwaggerError("Path must start with /", context)
 
-    async def process_api_declaration(self, resources, resource, context):
+    def process_api_declaration(self, resources, resource, context):
         required_fields = [
             'swaggerVersion', 'basePath', 'resourcePath', 'apis',
             'models'
@@ -61,15 +67,15 @@ class ValidationProcessor(SwaggerProcessor):
                 raise SwaggerError("Model id doesn't match name", context)
                 # Convert models dict to list
 
-    async def process_resource_api(self, resources, resource, api, context):
+    def process_resource_api(self, resources, resource, api, context):
         required_fields = ['path', 'operations']
         validate_required_fields(api, required_fields, context)
 
-    async def process_operation(self, resources, resource, api, operation, context):
+    def process_operation(self, resources, resource, api, operation, context):
         required_fields = ['httpMethod', 'nickname']
         validate_required_fields(operation, required_fields, context)
 
-    async def process_parameter(self, resources, resource, api, operation, parameter,
+    def process_parameter(self, resources, resource, api, operation, parameter,
                           context):
         required_fields = ['name', 'paramType']
         validate_required_fields(parameter, required_fields, context)
@@ -85,19 +91,19 @@ class ValidationProcessor(SwaggerProcessor):
                 "Field 'allowedValues' invalid; use 'allowableValues'",
                 context)
 
-    async def process_error_response(self, resources, resource, api, operation,
+    def process_error_response(self, resources, resource, api, operation,
                                error_response, context):
         required_fields = ['code', 'reason']
         validate_required_fields(error_response, required_fields, context)
 
-    async def process_model(self, resources, resource, model, context):
+    def process_model(self, resources, resource, model, context):
         required_fields = ['id', 'properties']
         validate_required_fields(model, required_fields, context)
         # Move property field name into the object
         for (prop_name, prop) in list(model['properties'].items()):
             prop['name'] = prop_name
 
-    async def process_property(self, resources, resource, model, prop,
+    def process_property(self, resources, resource, model, prop,
                          context):
         required_fields = ['type']
         validate_required_fields(prop, required_fields, context)
@@ -114,7 +120,8 @@ async def json_load_url(http_client, url):
     scheme = urllib.parse.urlparse(url).scheme
     if scheme == 'file':
         # requests can't handle file: URLs
-        fp = urllib.request.urlopen(url)
+        from urllib.request import urlopen
+        fp = urlopen(url)
         try:
             return json.load(fp)
         finally:
@@ -134,15 +141,32 @@ class Loader(object):
     :type  http_client: http_client.HttpClient
     :param processors: List of processors to apply to the API.
     :type  processors: list of SwaggerProcessor
+    :param time_budget: If set, processing yields to the event loop whenever
+                        it has run for this many seconds.
+    :param offload: If True, processing runs in a worker thread when none of
+                    the processors has coroutine hooks, and so does
+                    compaction.
+    :param executor: Executor for offloaded processing; defaults to the
+                     loop's default executor.
+    :param profiler: Optional profiler of the loading phases ('fetch', and
+                     'process:<processor class>').
+    :type  profiler: swaggerpy3.profiling.Profiler
     """
 
-    def __init__(self, http_client, processors=None):
+    def __init__(self, http_client, processors=None, time_budget=None,
+                 offload=False, executor=None, profiler=None):
         self.http_client = http_client
         if processors is None:
             processors = []
             # always go through the validation processor first
         # noinspection PyTypeChecker
         self.processors = [ValidationProcessor()] + processors
+        self.time_budget = time_budget
+        self.offload = offload
+        self.executor = executor
+        self.profiler = profiler
+        #: ProcessingStats of the last process_resource_listing()
+        self.stats = None
 
     async def load_resource_listing(self, resources_url, base_url=None):
         """Load a resource listing, loading referenced API declarations.
@@ -160,6 +184,27 @@ class Loader(object):
                             resource listing is used.
         """
 
+        resource_listing = await self.fetch_resource_listing(
+            resources_url, base_url=base_url)
+
+        # Now that the raw object model has been loaded, apply the processors
+        await self.process_resource_listing(resource_listing)
+        return resource_listing
+
+    async def fetch_resource_listing(self, resources_url, base_url=None):
+        """Load a resource listing and its API declarations, unprocessed.
+
+        :param resources_url:   File name for resources.json
+        :param base_url:    Optional URL to be the base URL for finding API
+                            declarations. If not specified, 'basePath' from the
+                            resource listing is used.
+        """
+        if self.profiler is not None:
+            return await self.profiler.profile(
+                'fetch', self._fetch_resource_listing(resources_url, base_url))
+        return await self._fetch_resource_listing(resources_url, base_url)
+
+    async def _fetch_resource_listing(self, resources_url, base_url):
         # Load the resource listing
         resource_listing = await json_load_url(self.http_client, resources_url)
 
@@ -171,9 +216,6 @@ class Loader(object):
         # Load the API declarations
         for api in resource_listing.get('apis'):
             await self.load_api_declaration(base_url, api)
-
-        # Now that the raw object model has been loaded, apply the processors
-        await self.process_resource_listing(resource_listing)
         return resource_listing
 
     async def load_api_declaration(self, base_url, api_dict):
@@ -191,13 +233,115 @@ class Loader(object):
         api_dict['api_declaration'] = await json_load_url(
             self.http_client, api_dict['url'])
 
-    async def process_resource_listing(self, resources):
+    async def process_resource_listing(self, resources, listing_apis=None):
         """Apply processors to a resource listing.
 
+        The time the event loop was kept busy is measured, logged, and kept
+        in self.stats.
+
+        :param resources: Resource listing to process.
+        :param listing_apis: Optional subset of resources['apis'] to process,
+                             e.g. only the API declarations that changed.
+        """
+        stats = ProcessingStats()
+        if self.offload and not any(p.is_async() for p in self.processors):
+            loop = asyncio.get_running_loop()
+            duration, _ = await loop.run_in_executor(
+                self.executor, _timed, self.process_resource_listing_sync,
+                resources, listing_apis)
+            stats.add_offloaded(duration)
+        else:
+            for processor in self.processors:
+                applied = processor.apply(resources, listing_apis,
+                                          self.time_budget, stats)
+                if self.profiler is not None:
+                    applied = self.profiler.profile(
+                        'process:%s' % type(processor).__name__, applied)
+                await applied
+        self.stats = stats
+        log.debug("Processed %s: %r", resources.get('url'), stats)
+
+    async def compact(self, compactor, value):
+        """Compacts processed resources, where processing ran.
+
+        Offloaded compaction runs in the executor; otherwise, it runs on
+        the event loop, and is counted as a slice of self.stats.
+
+        :param compactor: compact_resource_listing or another compactor of
+                          swaggerpy3.compact.
+        :param value: Processed object to compact.
+        :return: Compacted node.
+        """
+        if self.stats is None:
+            self.stats = ProcessingStats()
+        if self.offload:
+            loop = asyncio.get_running_loop()
+            duration, node = await loop.run_in_executor(
+                self.executor, _timed, compactor, value)
+            self.stats.add_offloaded(duration)
+            return node
+        start = time.perf_counter()
+        node = compactor(value)
+        self.stats.add_slice(time.perf_counter() - start)
+        return node
+
+    def process_resource_listing_sync(self, resources, listing_apis=None):
+        """Apply processors to a resource listing, without an event loop.
+
+        Only processors whose hooks are all plain methods can be applied this
+        way.
+
         :param resources: Resource listing to process.
+        :param listing_apis: Optional subset of resources['apis'] to process.
+        :raise TypeError: If a processor has coroutine hooks.
         """
         for processor in self.processors:
-            await processor.apply(resources)
+            if self.profiler is not None:
+                self.profiler.run('process:%s' % type(processor).__name__,
+                                  processor.apply_sync, resources,
+                                  listing_apis)
+            else:
+                processor.apply_sync(resources, listing_apis)
+
+    async def compile(self, url_or_resource, base_url=None):
+        """Load and process a resource listing into a CompiledSpec.
+
+        The result is immutable, and may be shared by any number of clients.
+
+        :param url_or_resource: URL for resources.json, or an already parsed
+                                (unprocessed) resource listing.
+        :param base_url:    Optional URL to be the base URL for finding API
+                            declarations, when loading from a URL.
+        :rtype: CompiledSpec
+        """
+        if isinstance(url_or_resource, str):
+            resources = await self.load_resource_listing(
+                url_or_resource, base_url=base_url)
+        else:
+            resources = url_or_resource
+            await self.process_resource_listing(resources)
+        return CompiledSpec(resources)
+
+def _timed(fn, *args):
+    """Calls fn(*args).
+
+    :return: (seconds the call took, result).
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def declaration_hash(api_declaration):
+    """Hashes the content of an unprocessed API declaration.
+
+    :param api_declaration: Parsed API declaration.
+    :return: Hex digest, equal for declarations with equal content.
+    """
+    content = json.dumps(api_declaration, sort_keys=True,
+                         separators=(',', ':'))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
 
 def validate_required_fields(json, required_fields, context):
     """Checks a JSON object for a set of required fields.
@@ -224,11 +368,12 @@ def load_file(resource_listing_file, http_client=None, processors=None):
     :return: Processed object model from
     :raise: IOError: On error reading api-docs.
     """
+    from urllib.request import pathname2url
     file_path = os.path.abspath(resource_listing_file)
-    url = urllib.parse.urljoin('file:', urllib.request.pathname2url(file_path))
+    url = urllib.parse.urljoin('file:', pathname2url(file_path))
     # When loading from files, everything is relative to the resource listing
     dir_path = os.path.dirname(file_path)
-    base_url = urllib.parse.urljoin('file:', urllib.request.pathname2url(dir_path))
+    base_url = urllib.parse.urljoin('file:', pathname2url(dir_path))
     return load_url(url, http_client=http_client, processors=processors,
                     base_url=base_url)
 
@@ -267,5 +412,5 @@ def load_json(resource_listing, http_client=None, processors=None):
         http_client = AsyncHttpClient()
 
     loader = Loader(http_client=http_client, processors=processors)
-    loader.process_resource_listing(resource_listing)
+    loader.process_resource_listing_sync(resource_listing)
     return resource_listing
@@ -0,0 +1,217 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Thread-safe synchronous facade for SwaggerClient.
+
+SyncSwaggerClient owns one event loop, running in a background thread,
+with a single AsyncHttpClient session. Any number of threads may call
+operations concurrently; each call is handed to the loop as a thread-safe
+future, so connections are pooled and reused across all threads.
+
+::
+
+    ari = SyncSwaggerClient()
+    ari.connect("http://localhost:8088/ari/api-docs/resources.json")
+    ari.channels.answer(channelId=channel_id)
+    future = ari.channels.hangup.submit(channelId=channel_id)
+    ari.close()
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+from .client import SwaggerClient
+from .http_client import AsyncHttpClient
+
+
+class SyncOperation(object):
+    """Blocking wrapper for an Operation.
+
+    :param operation: Wrapped operation.
+    :type  operation: swaggerpy3.client.Operation
+    :param client: Client owning the event loop.
+    :type  client: SyncSwaggerClient
+    """
+
+    def __init__(self, operation, client):
+        self.operation = operation
+        self.client = client
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__,
+                           self.operation.json['nickname'])
+
+    def __call__(self, **kwargs):
+        """Invoke the operation, blocking until it completes.
+
+        :param kwargs: Operation arguments.
+        :return: Response, with its body already read.
+        """
+        return self.client.run(self.operation(**kwargs))
+
+    def submit(self, **kwargs):
+        """Invoke the operation without blocking.
+
+        :param kwargs: Operation arguments.
+        :rtype: concurrent.futures.Future
+        """
+        return self.client.submit(self.operation(**kwargs))
+
+    def paginate(self, **kwargs):
+        """Iterate over the items of every page of a paged operation.
+
+        :param kwargs: Operation.paginate() arguments.
+        :return: Generator of items.
+        """
+        pages = self.operation.paginate(**kwargs).iter_pages()
+        try:
+            while True:
+                try:
+                    page = self.client.run(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+                for item in page:
+                    yield item
+        finally:
+            self.client.run(pages.aclose())
+
+
+class SyncResource(object):
+    """Blocking wrapper for a Resource.
+
+    :param resource: Wrapped resource.
+    :type  resource: swaggerpy3.client.Resource
+    :param client: Client owning the event loop.
+    :type  client: SyncSwaggerClient
+    """
+
+    def __init__(self, resource, client):
+        self.resource = resource
+        self.client = client
+        self.operations = {}
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.resource.get_name())
+
+    def __getattr__(self, item):
+        op = self.get_operation(item)
+        if not op:
+            raise AttributeError("Resource '%s' has no operation '%s'" %
+                                 (self.resource.get_name(), item))
+        return op
+
+    def get_operation(self, name):
+        """Gets the operation with the given nickname.
+
+        :param name: Nickname of the operation.
+        :rtype:  SyncOperation
+        :return: Operation, or None if not found.
+        """
+        op = self.operations.get(name)
+        if op is None:
+            operation = self.resource.get_operation(name)
+            if operation is None:
+                return None
+            op = self.operations[name] = SyncOperation(operation, self.client)
+        return op
+
+
+class SyncSwaggerClient(object):
+    """Synchronous, thread-safe client for a Swagger API.
+
+    :param timeout: Default number of seconds to wait for a blocking call,
+                    or None to wait forever.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.client = SwaggerClient()
+        self.resources = {}
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self._run_loop, name="swaggerpy3-loop", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.client)
+
+    def __getattr__(self, item):
+        resource = self.get_resource(item)
+        if not resource:
+            raise AttributeError("API has no resource '%s'" % item)
+        return resource
+
+    def submit(self, coro):
+        """Schedule a coroutine on the client's event loop.
+
+        :param coro: Coroutine to run.
+        :rtype: concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the client's event loop, and wait for it.
+
+        This is the way to use objects bound to the loop, like responses or
+        websockets: client.run(response.json())
+
+        :param coro: Coroutine to run.
+        :param timeout: Seconds to wait; defaults to the client's timeout.
+        :return: Result of the coroutine.
+        :raise concurrent.futures.TimeoutError: If the coroutine did not
+                                                complete in time; it is
+                                                cancelled.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Don't leave it holding a connection, or a scheduler slot
+            future.cancel()
+            raise
+
+    def connect(self, url_or_resource, http_client=None, **kwargs):
+        """Load the API; see SwaggerClient.connect().
+
+        :param url_or_resource: URL of the resource listing, an already
+                                parsed resource listing, or a CompiledSpec.
+        :param http_client: HTTP client API, shared by all threads.
+        :param kwargs: Additional SwaggerClient.connect() arguments.
+        """
+        if not http_client:
+            http_client = AsyncHttpClient()
+        self.run(self.client.connect(
+            url_or_resource, http_client=http_client, **kwargs))
+        self.resources = {}
+
+    def get_resource(self, name):
+        """Gets the resource with the given name.
+
+        :param name: Name of the resource.
+        :rtype: SyncResource
+        :return: Resource, or None if not found.
+        """
+        resource = self.resources.get(name)
+        if resource is None:
+            wrapped = self.client.get_resource(name)
+            if wrapped is None:
+                return None
+            resource = self.resources[name] = SyncResource(wrapped, self)
+        return resource
+
+    def close(self):
+        """Close the HTTP client, and stop the event loop thread.
+        """
+        if self.client.http_client:
+            self.run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
@@ -0,0 +1,330 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Tracing spans of operation calls.
+
+A Tracer given to the HTTP client records a span for every sampled
+operation call, with a child span for its HTTP request::
+
+    tracer = Tracer(sample=0.01, exporter=LogExporter())
+    await client.connect(url, http_client=AsyncHttpClient(tracer=tracer))
+
+The HTTP span times the phases of the request, as attributes, in seconds:
+queue_wait (in the scheduler), connection_wait (for a pooled connection),
+dns (for host names), connect, ttfb (from sending the request to receiving
+the response headers) and body_read. Operation.fetch() and view() record a
+decode span, within the span of the call.
+
+Spans opened with Tracer.span() nest the calls made within them, in this
+task and in the tasks it starts, so a call flow shows as a single trace::
+
+    with tracer.span('bridge call', channel=channel_id):
+        await client.channels.answer(channelId=channel_id)
+        await client.bridges.addChannel(bridgeId=bridge_id,
+                                         channel=channel_id)
+
+Sampling is decided once per trace, when its first span is opened (head
+sampling); a trace continued from a W3C traceparent header follows the
+decision of its caller. Requests carry a traceparent header, so servers can
+continue their trace; the header of a trace that is not sampled has its
+sampled flag cleared (00), so servers don't sample it either. A sample rate
+of 0 turns tracing off, unless continuing a trace: opening a span costs a
+single context variable lookup, and requests carry no header.
+
+Finished spans are handed to the exporter: a MemoryExporter keeps them in a
+list, a LogExporter writes them as JSON lines to the 'swaggerpy3.trace'
+logger, and other exporters implement Exporter.export().
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import random
+import time
+
+#: Span of the current context; a Span, an UnsampledSpan or None
+current_span = contextvars.ContextVar('swaggerpy3_span', default=None)
+
+
+class Span(object):
+    """A timed step of a trace.
+
+    :param name: Name of the span.
+    :param trace_id: 128 bit id of the trace.
+    :param parent_id: 64 bit id of the parent span, or None for a root.
+    :param span_id: 64 bit id of the span.
+    :param attributes: Initial attributes.
+    """
+
+    __slots__ = ('name', 'trace_id', 'parent_id', 'span_id', 'start',
+                 'duration', 'attributes', 'error', '_clock')
+
+    def __init__(self, name, trace_id, parent_id, span_id, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = span_id
+        #: Wall clock time the span started
+        self.start = time.time()
+        #: Seconds the span lasted, once it ended
+        self.duration = None
+        self.attributes = dict(attributes or ())
+        #: Description of the exception that ended the span, if any
+        self.error = None
+        self._clock = time.perf_counter()
+
+    def __repr__(self):
+        return "%s(%s, %016x)" % (self.__class__.__name__, self.name,
+                                  self.span_id)
+
+    def set(self, key, value):
+        """Sets an attribute of the span.
+        """
+        self.attributes[key] = value
+
+    def elapsed(self):
+        """Returns the seconds elapsed since the span started.
+        """
+        return time.perf_counter() - self._clock
+
+    def end(self):
+        self.duration = self.elapsed()
+
+    def traceparent(self):
+        """Returns the W3C traceparent header value of the span.
+        """
+        return '00-%032x-%016x-01' % (self.trace_id, self.span_id)
+
+    def as_dict(self):
+        """Returns the span as a JSON serializable dict.
+        """
+        return {
+            'name': self.name,
+            'trace_id': '%032x' % self.trace_id,
+            'span_id': '%016x' % self.span_id,
+            'parent_id': '%016x' % self.parent_id
+            if self.parent_id is not None else None,
+            'start': self.start,
+            'duration': self.duration,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class UnsampledSpan(object):
+    """Marks contexts within a trace that is not sampled.
+
+    Nothing is recorded; the ids are only propagated to servers.
+
+    :param trace_id: 128 bit id of the trace.
+    :param span_id: 64 bit id given as parent to servers.
+    """
+
+    __slots__ = ('trace_id', 'span_id')
+
+    def __init__(self, trace_id, span_id):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def traceparent(self):
+        """Returns the W3C traceparent header value, not sampled.
+        """
+        return '00-%032x-%016x-00' % (self.trace_id, self.span_id)
+
+
+class RemoteParent(object):
+    """Parent span of a trace continued from another service.
+    """
+
+    def __init__(self, trace_id, span_id, sampled):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+def parse_traceparent(header):
+    """Parses a W3C traceparent header.
+
+    :param header: Header value, like
+                   00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01
+    :return: RemoteParent, or None if the header is invalid.
+    """
+    parts = header.strip().split('-') if header else ()
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == 'ff' or \
+            len(parts[1]) != 32 or len(parts[2]) != 16 or \
+            len(parts[3]) != 2:
+        return None
+    try:
+        trace_id = int(parts[1], 16)
+        span_id = int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if not trace_id or not span_id:
+        return None
+    return RemoteParent(trace_id, span_id, bool(flags & 1))
+
+
+class Exporter(object):
+    """Receives finished spans.
+    """
+
+    def export(self, span):
+        """Handles a finished span.
+
+        Called on the event loop; must not block.
+
+        :type span: Span
+        """
+        raise NotImplementedError()
+
+
+class MemoryExporter(Exporter):
+    """Keeps finished spans in a list.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class LogExporter(Exporter):
+    """Writes finished spans as JSON lines to a logger.
+
+    :param logger: Logger name.
+    """
+
+    def __init__(self, logger='swaggerpy3.trace'):
+        self.logger = logging.getLogger(logger)
+
+    def export(self, span):
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(json.dumps(span.as_dict()))
+
+
+class Tracer(object):
+    """Opens spans, and samples traces.
+
+    :param sample: Fraction of the traces recorded, between 0 and 1.
+    :param exporter: Exporter of finished spans; a LogExporter by default.
+    :param rng: random.Random instance, for testing.
+    """
+
+    def __init__(self, sample=1.0, exporter=None, rng=None):
+        if not 0 <= sample <= 1:
+            raise ValueError("sample must be between 0 and 1")
+        self.sample = sample
+        if exporter is None:
+            exporter = LogExporter()
+        self.exporter = exporter
+        self.rng = rng or random.Random()
+
+    def __repr__(self):
+        return "%s(sample=%r, exporter=%r)" % (
+            self.__class__.__name__, self.sample, self.exporter)
+
+    @contextlib.contextmanager
+    def span(self, name, traceparent=None, **attributes):
+        """Opens a span for the block, as a child of the current span.
+
+        :param name: Name of the span.
+        :param traceparent: W3C traceparent header of a remote parent; the
+                            current span is ignored when given.
+        :param attributes: Initial attributes of the span.
+        :return: Span, or None if the trace is not sampled.
+        """
+        parent = current_span.get()
+        if traceparent is not None:
+            parent = parse_traceparent(traceparent)
+        unsampled = None
+        if parent is None:
+            if not self.sample:
+                # Nothing inside can be sampled either; skip the context
+                yield None
+                return
+            if self.sample < 1 and self.rng.random() >= self.sample:
+                unsampled = UnsampledSpan(self.rng.getrandbits(128),
+                                          self.rng.getrandbits(64))
+            else:
+                span = Span(name, self.rng.getrandbits(128), None,
+                            self.rng.getrandbits(64), attributes)
+        elif isinstance(parent, UnsampledSpan):
+            # Already in the context
+            yield None
+            return
+        elif isinstance(parent, RemoteParent) and not parent.sampled:
+            unsampled = UnsampledSpan(parent.trace_id,
+                                      self.rng.getrandbits(64))
+        else:
+            span = Span(name, parent.trace_id, parent.span_id,
+                        self.rng.getrandbits(64), attributes)
+        if unsampled is not None:
+            token = current_span.set(unsampled)
+            try:
+                yield None
+            finally:
+                current_span.reset(token)
+            return
+
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            status = getattr(e, 'status', None)
+            if status is not None:
+                span.set('status', status)
+            raise
+        finally:
+            current_span.reset(token)
+            span.end()
+            self.exporter.export(span)
+
+    def trace_config(self):
+        """Builds the aiohttp TraceConfig timing the phases of requests.
+
+        :rtype: aiohttp.TraceConfig
+        """
+        import aiohttp
+        config = aiohttp.TraceConfig()
+
+        def phase(name):
+            async def on_start(session, context, params):
+                setattr(context, name, time.perf_counter())
+
+            async def on_end(session, context, params):
+                span = current_span.get()
+                start = getattr(context, name, None)
+                if isinstance(span, Span) and start is not None:
+                    span.set(name, time.perf_counter() - start)
+
+            return on_start, on_end
+
+        for (name, start, end) in [
+                ('connection_wait', config.on_connection_queued_start,
+                 config.on_connection_queued_end),
+                ('dns', config.on_dns_resolvehost_start,
+                 config.on_dns_resolvehost_end),
+                ('connect', config.on_connection_create_start,
+                 config.on_connection_create_end)]:
+            on_start, on_end = phase(name)
+            start.append(on_start)
+            end.append(on_end)
+
+        # Time to first byte runs from sending the request headers to
+        # receiving the response headers.
+        on_start, on_end = phase('ttfb')
+        config.on_request_headers_sent.append(on_start)
+        config.on_request_end.append(on_end)
+
+        async def on_reuse(session, context, params):
+            span = current_span.get()
+            if isinstance(span, Span):
+                span.set('reused_connection', True)
+
+        config.on_connection_reuseconn.append(on_reuse)
+        return config
@@ -0,0 +1,715 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Transports sending the requests of an AsyncHttpClient.
+
+The client's breakers, scheduler and tracer all sit above the transport,
+which only sends requests and opens websockets. By default, a
+SessionTransport sends them over TCP with an aiohttp ClientSession; other
+transports record or replay traffic (see swaggerpy3.recording)::
+
+    http_client = AsyncHttpClient(transport=RecordingTransport('calls.log'))
+
+Services on the same host, or in the same process, are reached without
+the network stack:
+
+ * UnixTransport sends requests to a Unix domain socket;
+ * AppTransport hands them to an aiohttp application in this process,
+   through in-memory pipes instead of sockets;
+ * AsgiTransport calls an ASGI application directly, without HTTP
+   serialization at all.
+
+The host of the URLs only fills the Host header; every request goes to
+the socket or application of the transport::
+
+    transport = AppTransport(app)
+    await client.connect('http://service/api-docs/resources.json',
+                         http_client=AsyncHttpClient(transport=transport))
+
+A transport's request() returns a response whose body may be read(), with
+the status, headers, content_length and raise_for_status() of an
+aiohttp.ClientResponse. BufferedResponse is such a response, for
+transports that have the whole body at hand.
+"""
+
+import asyncio
+import functools
+import http
+import json
+import urllib.parse
+
+
+class Transport(object):
+    """Sends requests, and opens websockets.
+    """
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        """Sends a request.
+
+        :param timeout: Timeouts of the request, or None for the default.
+        :type  timeout: swaggerpy3.deadline.Timeouts
+        :return: Response, like an aiohttp.ClientResponse.
+        """
+        raise NotImplementedError()
+
+    async def ws_connect(self, url, auth=None, heartbeat=None):
+        """Opens a websocket.
+
+        :return: Websocket, like an aiohttp.ClientWebSocketResponse.
+        """
+        raise NotImplementedError()
+
+    async def close(self):
+        """Releases the resources of the transport.
+        """
+
+
+class SessionTransport(Transport):
+    """Sends requests with an aiohttp ClientSession.
+
+    The session is created on first use, and bound to the event loop it is
+    created on.
+
+    :param tracer: Optional tracer, whose aiohttp trace hooks are installed
+                   on the session.
+    :type  tracer: swaggerpy3.tracing.Tracer
+    """
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+        self.session = None
+
+    def __repr__(self):
+        return "%s()" % self.__class__.__name__
+
+    def connector(self):
+        """Builds the connector of a new session.
+
+        :return: aiohttp.BaseConnector, or None for the default TCP one.
+        """
+        return None
+
+    def get_session(self):
+        """Returns the aiohttp session, creating it on first use.
+
+        :rtype: aiohttp.ClientSession
+        """
+        if self.session is None or self.session.closed:
+            import aiohttp
+            trace_configs = None
+            if self.tracer is not None:
+                trace_configs = [self.tracer.trace_config()]
+            self.session = aiohttp.ClientSession(
+                connector=self.connector(), trace_configs=trace_configs)
+        return self.session
+
+    def client_timeout(self, timeout):
+        """Converts the timeouts of a request for aiohttp.
+
+        Timeouts left to None keep the session's, so that a call with only
+        a read timeout is still bounded by the session's total.
+
+        :type  timeout: swaggerpy3.deadline.Timeouts
+        :rtype: aiohttp.ClientTimeout
+        """
+        import aiohttp
+        default = self.get_session().timeout
+
+        def pick(value, default_value):
+            return default_value if value is None else value
+
+        return aiohttp.ClientTimeout(
+            total=pick(timeout.total, default.total),
+            connect=pick(timeout.connect, default.connect),
+            sock_read=pick(timeout.read, default.sock_read),
+            sock_connect=default.sock_connect)
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        kwargs = {}
+        if timeout is not None:
+            kwargs['timeout'] = self.client_timeout(timeout)
+        return await self.get_session().request(
+            method, url, params=params, data=data, headers=headers,
+            auth=auth, **kwargs)
+
+    async def ws_connect(self, url, auth=None, heartbeat=None):
+        return await self.get_session().ws_connect(
+            url, auth=auth, heartbeat=heartbeat)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+class UnixTransport(SessionTransport):
+    """Sends requests to a Unix domain socket.
+
+    :param path: Path of the socket.
+    :param tracer: Optional tracer, whose aiohttp trace hooks are installed
+                   on the session.
+    """
+
+    def __init__(self, path, tracer=None):
+        super().__init__(tracer)
+        self.path = path
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.path)
+
+    def connector(self):
+        import aiohttp
+        return aiohttp.UnixConnector(self.path)
+
+
+class AppTransport(SessionTransport):
+    """Sends requests to an aiohttp application in this process.
+
+    Requests and responses go through the HTTP parsers of aiohttp, as over
+    a socket, so everything, websockets included, works as it would over
+    TCP; only the sockets are replaced by in-memory pipes.
+
+    An application is started (its on_startup signals run) on first use,
+    and cleaned up by close(). For an application already served in this
+    process, pass its AppRunner, once set up, instead: it is neither
+    started nor cleaned up again.
+
+    :param app: aiohttp.web.Application, or set up aiohttp.web.AppRunner.
+    :param tracer: Optional tracer, whose aiohttp trace hooks are installed
+                   on the session.
+    """
+
+    def __init__(self, app, tracer=None):
+        super().__init__(tracer)
+        self.app = app
+        self.runner = None
+        self._owned_runner = None
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.app)
+
+    def connector(self):
+        return _memory_connector_class()(self)
+
+    async def server(self):
+        """Returns the aiohttp server of the application, starting it on
+        first use.
+
+        :rtype: aiohttp.web.Server
+        """
+        if self.runner is None:
+            from aiohttp import web
+            if isinstance(self.app, web.BaseRunner):
+                self.runner = self.app
+            else:
+                runner = web.AppRunner(self.app, handle_signals=False)
+                await runner.setup()
+                self.runner = self._owned_runner = runner
+        return self.runner.server
+
+    async def close(self):
+        await super().close()
+        if self._owned_runner is not None:
+            await self._owned_runner.cleanup()
+            self._owned_runner = None
+            self.runner = None
+
+
+@functools.lru_cache(maxsize=None)
+def _memory_connector_class():
+    """Defines the connector of AppTransport, once aiohttp is imported.
+    """
+    import aiohttp
+
+    class MemoryConnector(aiohttp.BaseConnector):
+        """Connects to an application through in-memory pipes.
+
+        aiohttp has no public hook for connecting over something other
+        than a socket, so this overrides BaseConnector._create_connection()
+        and builds the client protocol with BaseConnector._factory, both
+        private. They are stable across aiohttp 3.x, the range setup.py
+        allows; check them when raising that bound.
+        """
+
+        def __init__(self, transport):
+            super().__init__()
+            self.transport = transport
+
+        async def _create_connection(self, req, traces, timeout):
+            server = await self.transport.server()
+            loop = asyncio.get_running_loop()
+            client = self._factory()
+            handler = server()
+            client_end = _MemoryPipe(loop, client)
+            server_end = _MemoryPipe(loop, handler)
+            client_end.peer, server_end.peer = server_end, client_end
+            handler.connection_made(server_end)
+            client.connection_made(client_end)
+            return client
+
+    return MemoryConnector
+
+
+class _MemoryPipe(asyncio.Transport):
+    """End of an in-memory connection, delivering what is written straight
+    to the protocol of the other end.
+
+    :param loop: Event loop.
+    :param protocol: Protocol of this end.
+    """
+
+    def __init__(self, loop, protocol):
+        super().__init__()
+        self.loop = loop
+        self.protocol = protocol
+        self.peer = None
+        self.closing = False
+        self.paused = False
+        self.pending = []
+
+    def get_protocol(self):
+        return self.protocol
+
+    def set_protocol(self, protocol):
+        self.protocol = protocol
+
+    def is_closing(self):
+        return self.closing
+
+    def write(self, data):
+        if data and not self.closing:
+            self.peer._deliver(bytes(data))
+
+    def writelines(self, list_of_data):
+        self.write(b''.join(list_of_data))
+
+    def _deliver(self, data):
+        if self.closing:
+            return
+        if self.paused:
+            self.pending.append(data)
+        else:
+            self.protocol.data_received(data)
+
+    def pause_reading(self):
+        self.paused = True
+
+    def resume_reading(self):
+        self.paused = False
+        pending, self.pending = self.pending, []
+        for data in pending:
+            self._deliver(data)
+
+    def is_reading(self):
+        return not self.paused
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def get_write_buffer_limits(self):
+        return 0, 0
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        pass
+
+    def can_write_eof(self):
+        return False
+
+    def write_eof(self):
+        self.close()
+
+    def close(self):
+        if self.closing:
+            return
+        self.closing = True
+        # Protocols expect connection_lost() from the loop, not from within
+        # their own calls to close()
+        self.loop.call_soon(self.protocol.connection_lost, None)
+        self.loop.call_soon(self.peer.close)
+
+    def abort(self):
+        self.close()
+
+
+class AsgiTransport(Transport):
+    """Calls an ASGI application in this process.
+
+    Each request is one call of the application, whose whole response is
+    buffered; request bodies are serialized as aiohttp would send them.
+    Websockets are supported. The lifespan of the application is not
+    managed: start it as the server running it would.
+
+    :param app: ASGI 3 application.
+    :param root_path: root_path of the requests' scopes.
+    :param client: (host, port) of the client in the requests' scopes.
+    """
+
+    def __init__(self, app, root_path='', client=('127.0.0.1', 0)):
+        self.app = app
+        self.root_path = root_path
+        self.client = client
+        self.websockets = set()
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.app)
+
+    def scope(self, scope_type, url, headers, method=None):
+        """Builds the scope of a call of the application.
+
+        :param scope_type: 'http' or 'websocket'.
+        :param url: yarl.URL of the request.
+        :param headers: Request headers.
+        """
+        scope = {
+            'type': scope_type,
+            'asgi': {'version': '3.0', 'spec_version': '2.3'},
+            'http_version': '1.1',
+            'scheme': url.scheme,
+            'path': url.path,
+            'raw_path': url.raw_path.encode('ascii'),
+            'query_string': url.raw_query_string.encode('ascii'),
+            'root_path': self.root_path,
+            'headers': [(name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for (name, value) in headers.items()],
+            'client': self.client,
+            'server': (url.host, url.port),
+        }
+        if method is not None:
+            scope['method'] = method
+        else:
+            scope['subprotocols'] = []
+        return scope
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        from multidict import CIMultiDict
+        from yarl import URL
+        url = URL(request_url(url, params), encoded=True)
+        headers = CIMultiDict(headers or {})
+        body = b''
+        if data is not None:
+            body, content_type = await encode_data(data)
+            if content_type is not None:
+                headers.setdefault('Content-Type', content_type)
+            headers['Content-Length'] = str(len(body))
+        _base_headers(headers, url, auth)
+        scope = self.scope('http', url, headers, method)
+        received = False
+        disconnected = asyncio.Event()
+        response = {}
+        chunks = []
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': body,
+                        'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = [
+                    (name.decode('latin-1'), value.decode('latin-1'))
+                    for (name, value) in message.get('headers') or ()]
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        call = self.app(scope, receive, send)
+        if timeout is not None and timeout.total is not None:
+            call = asyncio.wait_for(call, timeout.total)
+        try:
+            await call
+        finally:
+            disconnected.set()
+        if 'status' not in response:
+            raise RuntimeError("ASGI application returned without a "
+                               "response to %s %s" % (method, url))
+        status = response['status']
+        try:
+            reason = http.HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        return BufferedResponse(
+            method, str(url), status, response['headers'],
+            b'' if method == 'HEAD' else b''.join(chunks), reason)
+
+    async def ws_connect(self, url, auth=None, heartbeat=None):
+        from multidict import CIMultiDict
+        from yarl import URL
+        url = URL(url, encoded=True)
+        headers = CIMultiDict()
+        _base_headers(headers, url, auth)
+        ws = AsgiWebSocket(self.app, self.scope('websocket', url, headers))
+        await ws.connect()
+        self.websockets = set(w for w in self.websockets if not w.closed)
+        self.websockets.add(ws)
+        return ws
+
+    async def close(self):
+        for ws in list(self.websockets):
+            await ws.close()
+        self.websockets.clear()
+
+
+class AsgiWebSocket(object):
+    """Websocket to an ASGI application, like an
+    aiohttp.ClientWebSocketResponse.
+
+    :param app: ASGI 3 application.
+    :param scope: Websocket scope of the call.
+    :param close_timeout: Seconds the application is given to return once
+                          the websocket is closed; it is then cancelled.
+    """
+
+    def __init__(self, app, scope, close_timeout=10.0):
+        self.app = app
+        self.scope = scope
+        self.close_timeout = close_timeout
+        #: Messages to the application
+        self.incoming = asyncio.Queue()
+        #: Messages from the application; None once it returned
+        self.outgoing = asyncio.Queue()
+        self.task = None
+        self.closed = False
+        self.close_code = None
+
+    def __repr__(self):
+        return "<%s(%s)>" % (self.__class__.__name__, self.scope['path'])
+
+    async def _run(self):
+        try:
+            await self.app(self.scope, self.incoming.get, self.outgoing.put)
+        finally:
+            await self.outgoing.put(None)
+
+    async def connect(self):
+        """Runs the handshake.
+
+        :raise aiohttp.WSServerHandshakeError: If the application does not
+                                               accept the websocket.
+        """
+        self.task = asyncio.ensure_future(self._run())
+        await self.incoming.put({'type': 'websocket.connect'})
+        message = await self.outgoing.get()
+        if message is not None and message['type'] == 'websocket.accept':
+            return
+        self.closed = True
+        status = 403
+        if message is not None and \
+                message['type'] == 'websocket.http.response.start':
+            status = message['status']
+        await self._finish()
+        import aiohttp
+        from multidict import CIMultiDict, CIMultiDictProxy
+        from yarl import URL
+        url = URL.build(scheme='ws', host=self.scope['server'][0],
+                        path=self.scope['path'])
+        info = aiohttp.RequestInfo(url, 'GET',
+                                   CIMultiDictProxy(CIMultiDict()), url)
+        raise aiohttp.WSServerHandshakeError(
+            info, (), status=status, message="Websocket rejected")
+
+    async def _finish(self):
+        done, _ = await asyncio.wait([self.task], timeout=self.close_timeout)
+        if not done:
+            self.task.cancel()
+        try:
+            await self.task
+        except (Exception, asyncio.CancelledError):
+            pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        msg = await self.receive()
+        if msg.type.name in ('CLOSE', 'CLOSING', 'CLOSED'):
+            raise StopAsyncIteration
+        return msg
+
+    def exception(self):
+        return None
+
+    async def receive(self, timeout=None):
+        from aiohttp import WSMessage, WSMsgType
+        if self.closed:
+            return WSMessage(WSMsgType.CLOSED, None, None)
+        if timeout is None:
+            message = await self.outgoing.get()
+        else:
+            message = await asyncio.wait_for(self.outgoing.get(), timeout)
+        if message is None or message['type'] == 'websocket.close':
+            self.closed = True
+            self.close_code = (message or {}).get('code', 1000)
+            await self.incoming.put({'type': 'websocket.disconnect',
+                                     'code': self.close_code})
+            await self._finish()
+            return WSMessage(WSMsgType.CLOSE, self.close_code,
+                             (message or {}).get('reason'))
+        if message.get('text') is not None:
+            return WSMessage(WSMsgType.TEXT, message['text'], None)
+        return WSMessage(WSMsgType.BINARY, message.get('bytes'), None)
+
+    async def receive_str(self, timeout=None):
+        return (await self.receive(timeout)).data
+
+    async def receive_bytes(self, timeout=None):
+        return (await self.receive(timeout)).data
+
+    async def receive_json(self, loads=json.loads, timeout=None):
+        return loads(await self.receive_str(timeout))
+
+    async def send_str(self, data, compress=None):
+        await self.incoming.put({'type': 'websocket.receive', 'text': data})
+
+    async def send_bytes(self, data, compress=None):
+        await self.incoming.put({'type': 'websocket.receive',
+                                 'bytes': bytes(data)})
+
+    async def send_json(self, data, compress=None, dumps=json.dumps):
+        await self.send_str(dumps(data))
+
+    async def close(self, code=1000, message=b''):
+        if self.closed:
+            return False
+        self.closed = True
+        self.close_code = code
+        await self.incoming.put({'type': 'websocket.disconnect',
+                                 'code': code})
+        await self._finish()
+        return True
+
+
+def _base_headers(headers, url, auth):
+    """Adds the Host and Authorization headers of a request.
+    """
+    if 'Host' not in headers:
+        host = url.raw_host or ''
+        if url.explicit_port:
+            host += ':%d' % url.port
+        headers['Host'] = host
+    if auth is not None and 'Authorization' not in headers:
+        headers['Authorization'] = auth.encode()
+
+
+async def encode_data(data):
+    """Serializes a request body, as aiohttp would send it.
+
+    :param data: Body given to AsyncHttpClient.request(): bytes, text, a
+                 form as a dict, a file, or an aiohttp payload.
+    :return: (body bytes, Content-Type or None).
+    """
+    import aiohttp
+    import aiohttp.payload
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data), None
+    if isinstance(data, dict):
+        data = aiohttp.FormData(data)
+    if isinstance(data, aiohttp.FormData):
+        payload = data()
+    elif isinstance(data, aiohttp.payload.Payload):
+        payload = data
+    else:
+        payload = aiohttp.payload.get_payload(data)
+    # Payload.write() is in every aiohttp 3.x; as_bytes() is not
+    writer = _BufferWriter()
+    await payload.write(writer)
+    return b''.join(writer.chunks), payload.headers.get('Content-Type')
+
+
+class _BufferWriter(object):
+    """Stream writer collecting what a payload writes, for encode_data().
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk):
+        self.chunks.append(bytes(chunk))
+
+
+class BufferedResponse(object):
+    """Response whose whole body is in memory.
+
+    :param method: Method of the request.
+    :param url: URL of the request, including its query string.
+    :param status: Status code.
+    :param headers: Response headers, as a mapping or (name, value) pairs.
+    :param body: Body bytes.
+    :param reason: Reason phrase.
+    """
+
+    def __init__(self, method, url, status, headers, body, reason=None):
+        from multidict import CIMultiDict, CIMultiDictProxy
+        from yarl import URL
+        self.method = method
+        self.url = URL(url)
+        self.status = status
+        self.reason = reason or ''
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self.body = body
+
+    def __repr__(self):
+        return "<%s(%s) [%d]>" % (self.__class__.__name__, self.url,
+                                  self.status)
+
+    @property
+    def content_length(self):
+        length = self.headers.get('Content-Length')
+        return int(length) if length is not None else None
+
+    @property
+    def content_type(self):
+        return self.headers.get('Content-Type', 'application/octet-stream') \
+            .split(';')[0].strip()
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    async def read(self):
+        return self.body
+
+    async def text(self, encoding='utf-8'):
+        return self.body.decode(encoding)
+
+    async def json(self, loads=json.loads, **kwargs):
+        return loads(self.body) if self.body else None
+
+    def raise_for_status(self):
+        """Raises aiohttp.ClientResponseError on error statuses.
+        """
+        if self.status < 400:
+            return
+        import aiohttp
+        from multidict import CIMultiDictProxy, CIMultiDict
+        info = aiohttp.RequestInfo(self.url, self.method,
+                                   CIMultiDictProxy(CIMultiDict()),
+                                   self.url)
+        raise aiohttp.ClientResponseError(
+            info, (), status=self.status, message=self.reason,
+            headers=self.headers)
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def request_url(url, params=None):
+    """Returns the URL of a request, with its parameters.
+
+    Parameters are sorted, so that equal requests have equal URLs.
+    """
+    if not params:
+        return url
+    query = urllib.parse.urlencode(sorted(
+        (str(name), str(value)) for (name, value) in params.items()))
+    return url + ('&' if '?' in url else '?') + query
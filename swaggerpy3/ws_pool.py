@@ -0,0 +1,280 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Managed pool of websocket connections.
+
+A WebSocketPool keeps many websocket connections open, say the event streams
+of several ARI applications on several nodes, and multiplexes their messages
+onto one bounded queue::
+
+    pool = WebSocketPool(heartbeat=20)
+    for app in apps:
+        await pool.open(client.events.eventWebsocket, name=app, app=app)
+    async for (ws, msg) in pool:
+        handle(ws.name, msg.json())
+
+Each connection is read by its own task, which waits while the shared queue
+is full, so a slow consumer holds back all readers alike. Connections that
+drop, or miss heartbeats, are reopened by calling their operation again,
+after a jittered exponential backoff; on_connect callbacks run after every
+(re)connection, to resubscribe. Every connection keeps WebSocketStats.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+log = logging.getLogger(__name__)
+
+
+class WebSocketStats(object):
+    """Counters of a managed websocket.
+    """
+
+    def __init__(self):
+        #: Time the connection was first opened
+        self.started = time.monotonic()
+        #: Number of successful connections, including the first
+        self.connects = 0
+        #: Number of failed connection attempts
+        self.connect_failures = 0
+        #: Number of messages received
+        self.messages = 0
+        #: Number of bytes received
+        self.bytes = 0
+        #: Number of messages waiting in the pool's queue
+        self.queued = 0
+        #: Seconds the last delivered message waited in the queue
+        self.lag = 0.0
+        #: Longest wait of a message in the queue
+        self.max_lag = 0.0
+
+    def __repr__(self):
+        return ("WebSocketStats(connects=%d, messages=%d, %.1f msg/s, "
+                "queued=%d, lag=%.1fms)" % (
+                    self.connects, self.messages, self.throughput(),
+                    self.queued, self.lag * 1e3))
+
+    def throughput(self):
+        """Returns the average number of messages received per second.
+        """
+        elapsed = time.monotonic() - self.started
+        return self.messages / elapsed if elapsed > 0 else 0.0
+
+
+class ManagedWebSocket(object):
+    """A websocket connection kept open by a WebSocketPool.
+
+    :param pool: Pool managing the connection.
+    :param connect: Function returning an awaitable of a new connection.
+    :param name: Name of the connection.
+    :param on_connect: Optional coroutine function called with the
+                       ManagedWebSocket after every (re)connection.
+    """
+
+    def __init__(self, pool, connect, name, on_connect=None):
+        self.pool = pool
+        self.connect = connect
+        self.name = name
+        self.on_connect = on_connect
+        self.ws = None
+        self.task = None
+        self.closed = False
+        self.stats = WebSocketStats()
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.name)
+
+    async def send_str(self, data):
+        """Sends a text message on the current connection.
+        """
+        await self.ws.send_str(data)
+
+    async def open(self):
+        """Opens the first connection, and starts reading it.
+
+        :raise Exception: If the first connection fails.
+        """
+        await self._connect()
+        self.task = asyncio.ensure_future(self._run())
+
+    async def _connect(self):
+        try:
+            ws = self.ws = await self.connect()
+        except Exception:
+            self.stats.connect_failures += 1
+            raise
+        self.stats.connects += 1
+        if self.on_connect is not None:
+            try:
+                await self.on_connect(self)
+            except BaseException:
+                # The next attempt opens another connection
+                self.stats.connect_failures += 1
+                await ws.close()
+                raise
+
+    async def _run(self):
+        attempt = 0
+        while not self.closed:
+            received = await self._read()
+            if self.closed:
+                return
+            if received:
+                attempt = 0
+            while not self.closed:
+                delay = self.pool.backoff(attempt)
+                attempt += 1
+                log.info("Reconnecting %s in %.2fs" % (self.name, delay))
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning("Failed to reconnect %s: %s" % (self.name, e))
+
+    async def _read(self):
+        """Reads messages into the pool's queue, until the connection ends.
+
+        :return: True if messages were received.
+        """
+        from aiohttp import WSMsgType
+        data_types = (WSMsgType.TEXT, WSMsgType.BINARY)
+        received = False
+        ws = self.ws
+        while True:
+            try:
+                msg = await ws.receive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Failed to read %s: %s" % (self.name, e))
+                break
+            if msg.type not in data_types:
+                log.info("Websocket %s closed (%s)" % (
+                    self.name, msg.type.name))
+                break
+            received = True
+            self.stats.messages += 1
+            self.stats.bytes += len(msg.data)
+            self.stats.queued += 1
+            await self.pool.queue.put((self, msg, time.monotonic()))
+        if not ws.closed:
+            await ws.close()
+        return received
+
+    async def close(self):
+        """Closes the connection for good.
+        """
+        self.closed = True
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.close()
+        self.pool.websockets.discard(self)
+
+
+class WebSocketPool(object):
+    """Registry of managed websocket connections.
+
+    :param queue_size: Maximum number of received messages waiting to be
+                       consumed, across all connections.
+    :param heartbeat: Seconds between pings; connections not answering are
+                      reopened. None disables heartbeats.
+    :param backoff_base: Upper bound of the first reconnection delay.
+    :param backoff_max: Upper bound of every reconnection delay.
+    :param rng: random.Random instance, for testing.
+    """
+
+    def __init__(self, queue_size=1000, heartbeat=30.0, backoff_base=0.1,
+                 backoff_max=30.0, rng=None):
+        self.queue = asyncio.Queue(queue_size)
+        self.heartbeat = heartbeat
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rng = rng or random.Random()
+        self.websockets = set()
+        self.closed = False
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__,
+                           sorted(ws.name for ws in self.websockets))
+
+    def backoff(self, attempt):
+        """Delay before a reconnection attempt ("full jitter").
+
+        :param attempt: Number of attempts since the last good connection.
+        """
+        return self.rng.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def open(self, operation, name=None, on_connect=None, **kwargs):
+        """Opens a managed connection to a websocket operation.
+
+        :param operation: Websocket operation.
+        :type  operation: swaggerpy3.client.Operation
+        :param name: Name of the connection; defaults to the operation's.
+        :param on_connect: Optional coroutine function called with the
+                           ManagedWebSocket after every (re)connection.
+        :param kwargs: Arguments of the operation.
+        :rtype: ManagedWebSocket
+        """
+        def connect():
+            return operation(_heartbeat=self.heartbeat, **kwargs)
+
+        ws = ManagedWebSocket(self, connect, name or operation.nickname,
+                              on_connect)
+        await ws.open()
+        self.websockets.add(ws)
+        return ws
+
+    async def receive(self):
+        """Waits for the next message of any connection.
+
+        :return: (ManagedWebSocket, aiohttp.WSMessage), or None once the
+                 pool is closed.
+        """
+        item = await self.queue.get()
+        if item is None:
+            # Wake up the other consumers too
+            self.queue.put_nowait(None)
+            return None
+        ws, msg, received = item
+        lag = time.monotonic() - received
+        ws.stats.queued -= 1
+        ws.stats.lag = lag
+        ws.stats.max_lag = max(ws.stats.max_lag, lag)
+        return ws, msg
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.receive()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    def stats(self):
+        """Returns the stats of every connection, by name.
+        """
+        return {ws.name: ws.stats for ws in self.websockets}
+
+    async def close(self):
+        """Closes every connection, and ends iteration over the pool.
+
+        Messages not consumed yet are dropped.
+        """
+        self.closed = True
+        await asyncio.gather(*[ws.close() for ws in list(self.websockets)])
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Access log tests.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.access_log import AccessLog
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3_test.support import api_listing, start_server
+
+
+# noinspection PyDocstring
+class AccessLogTest(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+
+    def test_batches(self):
+        uut = AccessLog(sink=self.batches.append, batch_size=3,
+                        flush_interval=10)
+
+        async def run():
+            for i in range(7):
+                uut.record('getPet', 'GET', '/pet/%d' % i, 200, 0.01, 10)
+                if i % 3 == 2:
+                    await asyncio.sleep(0.01)
+            full = [len(batch) for batch in self.batches]
+            await uut.close()
+            return full
+
+        full = asyncio.run(run())
+        self.assertEqual([3, 3], full)
+        self.assertEqual([3, 3, 1], [len(batch) for batch in self.batches])
+        self.assertEqual({'nickname': 'getPet', 'method': 'GET',
+                          'url': '/pet/0', 'status': 200, 'latency': 0.01,
+                          'bytes': 10}, self.batches[0][0])
+        self.assertEqual(7, uut.emitted)
+
+    def test_interval(self):
+        async def sink(batch):
+            self.batches.append(batch)
+
+        uut = AccessLog(sink=sink, flush_interval=0.01)
+
+        async def run():
+            uut.record('getPet', 'GET', '/pet/1', 200, 0.01, 10)
+            await asyncio.sleep(0.05)
+            # The task stops when there is nothing left to flush
+            self.assertTrue(uut.task.done())
+
+        asyncio.run(run())
+        self.assertEqual(1, len(self.batches))
+
+    def test_sampling(self):
+        uut = AccessLog(sample=0.25, rng=random.Random(1))
+        sampled = sum(uut.sampled() for _ in range(1000))
+        self.assertTrue(200 < sampled < 300, sampled)
+        self.assertFalse(AccessLog(sample=0).sampled())
+        self.assertRaises(ValueError, AccessLog, sample=2)
+
+    def test_dropped(self):
+        uut = AccessLog(sink=self.batches.append, max_buffered=2)
+
+        async def run():
+            for _ in range(5):
+                uut.record('getPet', 'GET', '/pet/1', 200, 0.01, 10)
+            await uut.close()
+
+        asyncio.run(run())
+        self.assertEqual(2, uut.recorded)
+        self.assertEqual(3, uut.dropped)
+
+    def test_logger(self):
+        uut = AccessLog()
+
+        async def run():
+            uut.record('getPet', 'GET', '/pet/1', 404, 0.01, 0)
+            await uut.close()
+
+        with self.assertLogs('swaggerpy3.access', logging.INFO) as logs:
+            asyncio.run(run())
+        self.assertEqual(404, json.loads(logs.records[0].getMessage())
+                         ['status'])
+
+
+# noinspection PyDocstring
+class AccessLogClientTest(unittest.TestCase):
+    def setUp(self):
+        async def pet(request):
+            pet_id = request.match_info['petId']
+            if pet_id == '0':
+                raise web.HTTPNotFound()
+            return web.json_response({'id': pet_id})
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', pet)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def test_calls(self):
+        listing = api_listing(self.base_path, [{
+            "path": "/pet/{petId}",
+            "operations": [{
+                "httpMethod": "GET", "nickname": "getPet",
+                "parameters": [{"name": "petId", "paramType": "path",
+                                "dataType": "int", "required": True}]
+            }]
+        }])
+        batches = []
+
+        async def run():
+            client = SwaggerClient()
+            await client.connect(listing)
+            client.configure(access_log=AccessLog(sink=batches.append))
+            try:
+                await client.pet.getPet(petId=1)
+                with self.assertRaises(Exception):
+                    await client.pet.getPet(petId=0)
+            finally:
+                await client.close()
+
+        asyncio.run(run())
+        records = [record for batch in batches for record in batch]
+        self.assertEqual([200, 404], [r['status'] for r in records])
+        self.assertEqual(self.base_path + '/pet/1', records[0]['url'])
+        self.assertEqual(len(b'{"id": "1"}'), records[0]['bytes'])
+        self.assertGreater(records[0]['latency'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Load balancing tests.
+"""
+
+import asyncio
+import random
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from swaggerpy3.balancer import Balancer, POWER_OF_TWO
+from swaggerpy3.breaker import CircuitOpenError
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.deadline import DeadlineExceeded, deadline
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.transport import Transport
+from swaggerpy3_test.support import (FakeClock, resource_listing,
+                                     start_server)
+
+
+# noinspection PyDocstring
+class BalancerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.uut = Balancer(['http://a', 'http://b', 'http://c'],
+                            max_failures=2, max_latency=1.0, eject_time=5.0,
+                            clock=self.clock, rng=random.Random(1))
+
+    def test_least_outstanding(self):
+        a, b, c = self.uut.hosts
+        self.uut.start(a)
+        self.uut.start(b)
+        self.assertIs(c, self.uut.choose())
+        self.uut.start(c)
+        self.uut.start(c)
+        self.assertIn(self.uut.choose(), (a, b))
+
+    def test_power_of_two(self):
+        uut = Balancer(['http://a', 'http://b'], strategy=POWER_OF_TWO,
+                       rng=random.Random(1))
+        a, b = uut.hosts
+        uut.start(a)
+        for _ in range(10):
+            self.assertIs(b, uut.choose())
+
+    def test_eject_failing(self):
+        a = self.uut.hosts[0]
+        for _ in range(2):
+            self.uut.finish(a, self.uut.start(a), True)
+        self.assertNotIn(a, self.uut.available())
+        self.clock.now = 5.0
+        self.assertIn(a, self.uut.available())
+
+    def test_success_resets_failures(self):
+        a = self.uut.hosts[0]
+        self.uut.finish(a, self.uut.start(a), True)
+        self.uut.finish(a, self.uut.start(a), False)
+        self.uut.finish(a, self.uut.start(a), True)
+        self.assertIn(a, self.uut.available())
+
+    def test_eject_slow(self):
+        a = self.uut.hosts[0]
+        start = self.uut.start(a)
+        self.clock.now = 2.0
+        self.uut.finish(a, start, False)
+        self.assertNotIn(a, self.uut.available())
+
+    def test_all_ejected(self):
+        for host in self.uut.hosts:
+            self.uut.eject(host, 0.0)
+        self.assertEqual(3, len(self.uut.available()))
+
+    def test_affinity(self):
+        host = self.uut.choose('channel-1')
+        for _ in range(10):
+            self.assertIs(host, self.uut.choose('channel-1'))
+        self.uut.eject(host, 0.0)
+        other = self.uut.choose('channel-1')
+        self.assertIsNot(host, other)
+        # Keys of the other hosts don't move
+        keys = ['channel-%d' % i for i in range(50)]
+        before = {k: self.uut.choose(k) for k in keys}
+        self.clock.now = 5.0
+        after = {k: self.uut.choose(k) for k in keys}
+        self.assertTrue(all(after[k] is before[k] for k in keys
+                            if after[k] is not host))
+
+    def test_empty(self):
+        self.assertRaises(ValueError, Balancer, [])
+
+
+# noinspection PyDocstring
+class BalancedClientTest(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+        self.hits = []
+        for status in (200, 200, 503):
+            self.servers.append(start_server(self.app(status)))
+
+    def app(self, status):
+        async def handler(request):
+            self.hits.append((status, request.match_info['petId']))
+            return web.json_response({}, status=status)
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', handler)
+        return app
+
+    def tearDown(self):
+        for (_, stop) in self.servers:
+            stop()
+
+    def test_balanced(self):
+        urls = [url for (url, _) in self.servers]
+
+        async def run():
+            client = SwaggerClient()
+            await client.connect(resource_listing('http://unused'),
+                                 base_url=urls)
+            try:
+                failures = 0
+                for i in range(20):
+                    try:
+                        await client.pet.getPet(petId=i)
+                    except aiohttp.ClientResponseError:
+                        failures += 1
+                for _ in range(5):
+                    await client.pet.getPet(petId='sticky', _affinity='x')
+                return client, failures
+            finally:
+                await client.close()
+
+        client, failures = asyncio.run(run())
+        balancer = client.pet.getPet.balancer
+        # The failing replica is ejected after max_failures calls
+        self.assertEqual(balancer.max_failures, failures)
+        self.assertEqual({200}, set(s for (s, p) in self.hits
+                                    if p == 'sticky'))
+        self.assertTrue(all(h.outstanding == 0 for h in balancer.hosts))
+        self.assertEqual(2, len(balancer.available()))
+
+
+# noinspection PyDocstring
+class RefusingTransport(Transport):
+    """Fails every request before it is sent.
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        raise self.errors.pop()
+
+
+# noinspection PyDocstring
+class SlowTransport(Transport):
+    """Times out every request, once its total timeout has passed.
+    """
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        await asyncio.sleep(timeout.total)
+        raise asyncio.TimeoutError()
+
+
+# noinspection PyDocstring
+class NotSentTest(unittest.TestCase):
+    def test_not_host_failures(self):
+        errors = [CircuitOpenError('http://a', 1.0),
+                  DeadlineExceeded("Deadline exceeded")] * 3
+
+        async def run():
+            client = SwaggerClient()
+            await client.connect(
+                resource_listing('http://unused'),
+                http_client=AsyncHttpClient(
+                    transport=RefusingTransport(errors)),
+                base_url=['http://a', 'http://b'])
+            try:
+                for i in range(len(errors)):
+                    with self.assertRaises(
+                            (CircuitOpenError, DeadlineExceeded)):
+                        await client.pet.getPet(petId=i)
+                return client
+            finally:
+                await client.close()
+
+        balancer = asyncio.run(run()).pet.getPet.balancer
+        self.assertEqual([0.0, 0.0],
+                         [h.ejected_until for h in balancer.hosts])
+        self.assertEqual([0, 0], [h.failures for h in balancer.hosts])
+        self.assertEqual([0, 0], [h.outstanding for h in balancer.hosts])
+
+    def timeouts(self, seconds, within_deadline):
+        """Makes calls timing out, and returns the balanced hosts.
+        """
+        async def run():
+            client = SwaggerClient()
+            await client.connect(
+                resource_listing('http://unused'),
+                http_client=AsyncHttpClient(transport=SlowTransport()),
+                base_url=['http://a', 'http://b'])
+            try:
+                for i in range(2):
+                    with self.assertRaises(asyncio.TimeoutError):
+                        if not within_deadline:
+                            await client.pet.getPet(petId=i, _timeout=seconds)
+                            continue
+                        with deadline(seconds):
+                            await client.pet.getPet(petId=i)
+                return client.pet.getPet.balancer.hosts
+            finally:
+                await client.close()
+
+        return asyncio.run(run())
+
+    def test_deadline_timeouts(self):
+        hosts = self.timeouts(0.01, within_deadline=True)
+        self.assertEqual([0, 0], [h.failures for h in hosts])
+        # Timeouts of the operation itself count
+        hosts = self.timeouts(0.01, within_deadline=False)
+        self.assertEqual(2, sum(h.failures for h in hosts))
+
+
+if __name__ == '__main__':
+    unittest.main()
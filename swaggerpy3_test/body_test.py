@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Request body tests.
+"""
+
+import asyncio
+import tempfile
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3_test.support import api_listing, start_server
+
+APIS = [
+    {
+        "path": "/recordings/{name}",
+        "operations": [
+            {
+                "httpMethod": "POST",
+                "nickname": "upload",
+                "consumes": ["audio/wav"],
+                "parameters": [
+                    {"name": "name", "paramType": "path"},
+                    {"name": "audio", "paramType": "body",
+                     "dataType": "binary"}
+                ]
+            },
+            {
+                "httpMethod": "PUT",
+                "nickname": "update",
+                "parameters": [
+                    {"name": "name", "paramType": "path"},
+                    {"name": "variables", "paramType": "body",
+                     "dataType": "object"},
+                    {"name": "fields", "paramType": "body",
+                     "dataType": "object"}
+                ]
+            }
+        ]
+    },
+    {
+        "path": "/recordings",
+        "operations": [
+            {
+                "httpMethod": "POST",
+                "nickname": "form",
+                "parameters": [
+                    {"name": "name", "paramType": "form",
+                     "dataType": "string"},
+                    {"name": "file", "paramType": "form",
+                     "dataType": "File"}
+                ]
+            }
+        ]
+    }
+]
+
+
+# noinspection PyDocstring
+class BodyTest(unittest.TestCase):
+    def setUp(self):
+        async def echo(request):
+            reply = {
+                'content_type': request.content_type,
+                'chunked': request.headers.get('Transfer-Encoding') ==
+                'chunked',
+            }
+            if request.content_type == 'multipart/form-data':
+                reader = await request.multipart()
+                parts = {}
+                async for part in reader:
+                    parts[part.name] = [part.filename,
+                                        (await part.read()).decode()]
+                reply['parts'] = parts
+            elif request.content_type == 'application/json':
+                reply['json'] = await request.json()
+            else:
+                reply['body'] = (await request.read()).decode()
+            return web.json_response(reply)
+
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', echo)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def call(self, operation, **kwargs):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(api_listing(self.base_path, APIS))
+            try:
+                resp = await client.pet.get_operation(operation)(**kwargs)
+                return await resp.json()
+            finally:
+                await client.close()
+        return asyncio.run(run())
+
+    def test_bytes(self):
+        reply = self.call('upload', name='a', audio=memoryview(b'RIFF'))
+        self.assertEqual('audio/wav', reply['content_type'])
+        self.assertEqual('RIFF', reply['body'])
+
+    def test_file(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b'x' * 100000)
+            f.seek(0)
+            reply = self.call('upload', name='a', audio=f)
+        self.assertEqual(100000, len(reply['body']))
+
+    def test_async_generator(self):
+        async def chunks():
+            for i in range(3):
+                yield b'chunk%d;' % i
+
+        reply = self.call('upload', name='a', audio=chunks())
+        self.assertTrue(reply['chunked'])
+        self.assertEqual('chunk0;chunk1;chunk2;', reply['body'])
+
+    def test_json_merge(self):
+        variables = {'a': 1}
+        reply = self.call('update', name='a', variables=variables,
+                          fields={'b': 2})
+        self.assertEqual({'a': 1, 'b': 2}, reply['json'])
+        self.assertEqual({'a': 1}, variables)
+
+    def test_mixed(self):
+        self.assertRaises(TypeError, self.call, 'update', name='a',
+                          variables={'a': 1}, fields=b'raw')
+
+    def test_form(self):
+        reply = self.call('form', name='hello')
+        self.assertEqual('application/x-www-form-urlencoded',
+                         reply['content_type'])
+
+    def test_multipart(self):
+        with tempfile.NamedTemporaryFile(suffix='.wav') as f:
+            f.write(b'RIFF')
+            f.flush()
+            with open(f.name, 'rb') as audio:
+                reply = self.call('form', name='hello', file=audio)
+        self.assertEqual('multipart/form-data', reply['content_type'])
+        self.assertEqual([None, 'hello'], reply['parts']['name'])
+        self.assertEqual('RIFF', reply['parts']['file'][1])
+        self.assertTrue(reply['parts']['file'][0].endswith('.wav'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Circuit breaker tests.
+"""
+
+import asyncio
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from swaggerpy3.breaker import (CircuitBreaker, CircuitBreakers,
+                                CircuitOpenError, CLOSED, HALF_OPEN, OPEN)
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3_test.support import (FakeClock, resource_listing,
+                                     start_server)
+
+
+# noinspection PyDocstring
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.changes = []
+        self.uut = CircuitBreaker(
+            'http://a', window=4, min_calls=4, error_rate=0.5,
+            max_latency=1.0, open_time=10.0, clock=self.clock,
+            listener=lambda b, old, new: self.changes.append((old, new)))
+
+    def call(self, failed, elapsed=0.0):
+        start = self.uut.before_call()
+        self.clock.now += elapsed
+        self.uut.after_call(start, failed)
+
+    def test_stays_closed(self):
+        for failed in (True, False, False, False, True, False):
+            self.call(failed)
+        self.assertEqual(CLOSED, self.uut.state)
+
+    def test_opens_on_errors(self):
+        for failed in (False, True, False, True):
+            self.call(failed)
+        self.assertEqual(OPEN, self.uut.state)
+        self.assertRaises(CircuitOpenError, self.uut.before_call)
+        self.assertEqual(1, self.uut.rejected)
+
+    def test_opens_on_latency(self):
+        for elapsed in (2.0, 0.0, 2.0, 0.0):
+            self.call(False, elapsed)
+        self.assertEqual(OPEN, self.uut.state)
+
+    def test_half_open(self):
+        for _ in range(4):
+            self.call(True)
+        self.clock.now += 10.0
+        start = self.uut.before_call()
+        self.assertEqual(HALF_OPEN, self.uut.state)
+        # A single probe at a time
+        self.assertRaises(CircuitOpenError, self.uut.before_call)
+        self.uut.after_call(start, False)
+        self.assertEqual(CLOSED, self.uut.state)
+        self.assertEqual([(CLOSED, OPEN), (OPEN, HALF_OPEN),
+                          (HALF_OPEN, CLOSED)], self.changes)
+
+    def test_failed_probe(self):
+        for _ in range(4):
+            self.call(True)
+        self.clock.now += 10.0
+        self.call(True)
+        self.assertEqual(OPEN, self.uut.state)
+        self.assertRaises(CircuitOpenError, self.uut.before_call)
+
+    def test_cancelled_probe(self):
+        for _ in range(4):
+            self.call(True)
+        self.clock.now += 10.0
+        self.call(None)
+        self.assertEqual(HALF_OPEN, self.uut.state)
+        self.call(False)
+        self.assertEqual(CLOSED, self.uut.state)
+
+    def test_metrics(self):
+        for _ in range(4):
+            self.call(True)
+        metrics = self.uut.metrics()
+        self.assertEqual(OPEN, metrics['state'])
+        self.assertEqual(4, metrics['failures'])
+        self.assertEqual({'closed->open': 1}, metrics['transitions'])
+
+
+# noinspection PyDocstring
+class BreakerClientTest(unittest.TestCase):
+    def setUp(self):
+        self.hits = 0
+
+        async def handler(request):
+            self.hits += 1
+            status = int(request.match_info['petId'])
+            return web.json_response({}, status=status)
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', handler)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def run_calls(self, breakers, statuses):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(resource_listing(self.base_path),
+                                 http_client=AsyncHttpClient(breakers))
+            errors = []
+            try:
+                for status in statuses:
+                    try:
+                        await client.pet.getPet(petId=status)
+                        errors.append(None)
+                    except (aiohttp.ClientError, CircuitOpenError) as e:
+                        errors.append(type(e))
+            finally:
+                await client.close()
+            return errors
+
+        return asyncio.run(run())
+
+    def test_fail_fast(self):
+        breakers = CircuitBreakers(min_calls=3)
+        errors = self.run_calls(breakers, [503] * 3 + [200] * 2)
+        self.assertEqual([aiohttp.ClientResponseError] * 3 +
+                         [CircuitOpenError] * 2, errors)
+        self.assertEqual(3, self.hits)
+        self.assertEqual(OPEN, breakers.metrics()[self.base_path]['state'])
+
+    def test_client_errors(self):
+        breakers = CircuitBreakers(min_calls=3)
+        self.run_calls(breakers, [404] * 5)
+        self.assertEqual(5, self.hits)
+        self.assertEqual(CLOSED, breakers.metrics()[self.base_path]['state'])
+
+    def test_per_operation(self):
+        breakers = CircuitBreakers(per_operation=True, min_calls=3)
+        self.run_calls(breakers, [503] * 3)
+        self.assertEqual(['%s getPet' % self.base_path],
+                         list(breakers.metrics()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Compact model tests.
+"""
+
+import asyncio
+import subprocess
+import sys
+import unittest
+
+import swaggerpy3
+from swaggerpy3.client import SwaggerClient, load_spec
+from swaggerpy3.compact import (CompiledSpec, attach_spec,
+                                compact_resource_listing, share_spec,
+                                strip_documentation)
+
+
+# noinspection PyDocstring
+class CompactTest(unittest.TestCase):
+    def setUp(self):
+        self.resources = asyncio.run(
+            swaggerpy3.load_file('test-data/1.1/simple/resources.json'))
+
+    def test_fields(self):
+        uut = compact_resource_listing(self.resources)
+        self.assertEqual('1.1', uut['swaggerVersion'])
+        decl = uut['apis'][0]['api_declaration']
+        oper = decl['apis'][0]['operations'][0]
+        self.assertEqual('getAsteriskInfo', oper['nickname'])
+        self.assertEqual('query', oper['parameters'][0]['paramType'])
+        self.assertFalse(oper['parameters'][0].get('required'))
+        properties = decl['models']['Simple']['properties']
+        self.assertEqual('id', properties['id']['name'])
+        self.assertEqual(['id'], [p.name for p in properties.values()])
+
+    def test_documentation_stripped(self):
+        uut = compact_resource_listing(self.resources)
+        oper = uut.apis[0].api_declaration.apis[0].operations[0]
+        self.assertNotIn('summary', oper)
+        self.assertNotIn('errorResponses', oper)
+        self.assertIsNone(oper.get('summary'))
+        self.assertRaises(KeyError, lambda: oper['summary'])
+
+    def test_contains_unset(self):
+        uut = compact_resource_listing(self.resources)
+        oper = uut.apis[0].api_declaration.apis[0].operations[0]
+        # No consumes in the JSON, so none in the node
+        self.assertIsNone(oper.consumes)
+        self.assertNotIn('consumes', oper)
+        self.assertNotIn('consumes', oper.keys())
+        self.assertIn('nickname', oper)
+
+    def test_interned(self):
+        uut = compact_resource_listing(self.resources)
+        param = uut.apis[0].api_declaration.apis[0].operations[0] \
+            .parameters[0]
+        self.assertIs(sys.intern('query'), param.paramType)
+
+    def test_strip_documentation(self):
+        strip_documentation(self.resources)
+        oper = self.resources['apis'][0]['api_declaration']['apis'][0][
+            'operations'][0]
+        self.assertNotIn('summary', oper)
+        self.assertNotIn('allowableValues', oper['parameters'][0])
+        self.assertEqual('getAsteriskInfo', oper['nickname'])
+
+    def test_client(self):
+        uut = SwaggerClient()
+        asyncio.run(uut.connect(self.resources, compact=True))
+        oper = uut.simple.getAsteriskInfo
+        self.assertEqual('http://localhost/swagger/test/test', oper.uri)
+        self.assertEqual('GET', oper.json['httpMethod'])
+
+
+# noinspection PyDocstring
+class CompiledSpecTest(unittest.TestCase):
+    def setUp(self):
+        resources = asyncio.run(
+            swaggerpy3.load_file('test-data/1.1/simple/resources.json'))
+        self.spec = asyncio.run(load_spec(resources))
+
+    def test_immutable(self):
+        self.assertIsInstance(self.spec, CompiledSpec)
+        self.assertRaises(AttributeError, setattr, self.spec, 'api_docs', None)
+        oper = self.spec.operations['simple']['getAsteriskInfo'][2]
+        self.assertRaises(AttributeError, setattr, oper, 'nickname', 'x')
+
+    def test_shared(self):
+        first = SwaggerClient()
+        first.bind(self.spec)
+        second = SwaggerClient()
+        asyncio.run(second.connect(self.spec, base_url='http://other/ari'))
+        self.assertIs(first.api_docs, second.api_docs)
+        self.assertIs(first.simple.getAsteriskInfo.json,
+                      second.simple.getAsteriskInfo.json)
+        self.assertIsNot(first.http_client, second.http_client)
+        self.assertEqual('http://localhost/swagger/test/test',
+                         first.simple.getAsteriskInfo.uri)
+        self.assertEqual('http://other/ari/test',
+                         second.simple.getAsteriskInfo.uri)
+        self.assertEqual(['getAsteriskInfo'],
+                         list(second.simple.operations.keys()))
+
+    def test_dumps(self):
+        uut = CompiledSpec.loads(self.spec.dumps())
+        oper = uut.operations['simple']['getAsteriskInfo']
+        self.assertEqual(('http://localhost/swagger/test', '/test'), oper[:2])
+        self.assertEqual('query', oper[2].parameters[0].paramType)
+        self.assertIs(sys.intern('query'), oper[2].parameters[0].paramType)
+        self.assertEqual(['id'], [p.name for p in uut.api_docs.apis[0]
+                                  .api_declaration.models['Simple']
+                                  .properties.values()])
+
+    def test_loads_garbage(self):
+        self.assertRaises(ValueError, CompiledSpec.loads, b'{"apis": []}')
+
+    def test_shared_memory(self):
+        shm = share_spec(self.spec)
+        try:
+            uut = attach_spec(shm.name)
+        finally:
+            shm.close()
+            shm.unlink()
+        self.assertEqual(['simple'], list(uut.resources.keys()))
+
+    def test_shared_memory_child_exit(self):
+        shm = share_spec(self.spec)
+        try:
+            subprocess.run(
+                [sys.executable, '-c',
+                 'import sys; from swaggerpy3.compact import attach_spec; '
+                 'attach_spec(sys.argv[1])', shm.name],
+                check=True, stderr=subprocess.PIPE)
+            # The child's exit left the segment alone
+            uut = attach_spec(shm.name)
+        finally:
+            shm.close()
+            shm.unlink()
+        self.assertEqual(['simple'], list(uut.resources.keys()))
+
+
+if __name__ == '__main__':
+    unittest.main()
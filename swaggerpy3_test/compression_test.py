@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Compression tests.
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.compression import Compression, accept_encoding
+from swaggerpy3_test.support import api_listing, start_server
+
+APIS = [
+    {
+        "path": "/channels",
+        "operations": [
+            {
+                "httpMethod": "POST",
+                "nickname": "bulk",
+                "parameters": [
+                    {"name": "body", "paramType": "body",
+                     "dataType": "object"}
+                ]
+            },
+            {
+                "httpMethod": "GET",
+                "nickname": "list"
+            }
+        ]
+    }
+]
+
+
+# noinspection PyDocstring
+class CompressionTest(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+
+        async def bulk(request):
+            # aiohttp decodes the Content-Encoding of requests
+            raw = await request.read()
+            self.requests.append((request.headers, raw))
+            return web.json_response({'size': len(raw)})
+
+        async def channels(request):
+            self.requests.append((request.headers, None))
+            response = web.json_response([{'id': str(i)} for i in range(500)])
+            response.enable_compression()
+            return response
+
+        app = web.Application()
+        app.router.add_post('/channels', bulk)
+        app.router.add_get('/channels', channels)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def call(self, configure, operation, **kwargs):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(api_listing(self.base_path, APIS))
+            configure(client)
+            try:
+                resp = await client.pet.get_operation(operation)(**kwargs)
+                return await resp.json()
+            finally:
+                await client.close()
+        return asyncio.run(run())
+
+    def test_compress(self):
+        policy = Compression('deflate', threshold=100)
+        body = {'items': ['x' * 10] * 100}
+        reply = self.call(lambda c: c.configure(compression=policy),
+                          'bulk', body=body)
+        headers, _ = self.requests[0]
+        self.assertEqual('deflate', headers['Content-Encoding'])
+        self.assertEqual(len(json.dumps(body)), reply['size'])
+        self.assertEqual(1, policy.stats.requests)
+        self.assertGreater(policy.stats.request_bytes_saved, 0)
+        self.assertEqual(int(headers['Content-Length']),
+                         policy.stats.request_wire_bytes)
+
+    def test_threshold(self):
+        policy = Compression('deflate', threshold=10000)
+        self.call(lambda c: c.configure(compression=policy),
+                  'bulk', body={'a': 1})
+        headers, _ = self.requests[0]
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(0, policy.stats.requests)
+
+    def test_per_operation(self):
+        def configure(client):
+            client.configure(compression=Compression(threshold=0))
+            client.configure('bulk', compression=None)
+
+        self.call(configure, 'bulk', body={'a': 1})
+        headers, _ = self.requests[0]
+        self.assertNotIn('Content-Encoding', headers)
+
+    def test_stream(self):
+        async def chunks():
+            for _ in range(10):
+                yield b'0123456789' * 100
+
+        policy = Compression('gzip')
+        self.call(lambda c: c.configure(compression=policy),
+                  'bulk', body=chunks())
+        headers, raw = self.requests[0]
+        self.assertEqual('gzip', headers['Content-Encoding'])
+        self.assertEqual(b'0123456789' * 1000, raw)
+        self.assertLess(policy.stats.request_wire_bytes, 1000)
+
+    def test_response(self):
+        policy = Compression()
+        reply = self.call(lambda c: c.configure(compression=policy), 'list')
+        headers, _ = self.requests[0]
+        self.assertIn('gzip', headers['Accept-Encoding'])
+        self.assertEqual(500, len(reply))
+        self.assertEqual(1, policy.stats.responses)
+
+    def test_text_file(self):
+        policy = Compression('gzip')
+        text = 'caf\u00e9' * 100
+        data, headers = policy.encode_body(io.StringIO(text), None)
+
+        async def read():
+            return b''.join([chunk async for chunk in data])
+
+        self.assertEqual('gzip', headers['Content-Encoding'])
+        self.assertEqual(text.encode('utf-8'),
+                         gzip.decompress(asyncio.run(read())))
+
+    def test_accept_encoding(self):
+        from aiohttp import http_parser
+        encodings = accept_encoding().split(', ')
+        self.assertEqual(['gzip', 'deflate'], encodings[:2])
+        self.assertEqual(getattr(http_parser, 'HAS_BROTLI', False),
+                         'br' in encodings)
+        self.assertEqual(getattr(http_parser, 'HAS_ZSTD', False),
+                         'zstd' in encodings)
+
+    def test_unavailable(self):
+        self.assertRaises(ValueError, Compression, 'lzma')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Timeout and deadline tests.
+"""
+
+import asyncio
+import time
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.deadline import (DeadlineExceeded, Timeouts, call_timeouts,
+                                 deadline, remaining)
+from swaggerpy3.transport import SessionTransport
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+# noinspection PyDocstring
+class DeadlineTest(unittest.TestCase):
+    def test_no_deadline(self):
+        self.assertIsNone(remaining())
+        self.assertIsNone(call_timeouts(None))
+        self.assertEqual(Timeouts(total=5), call_timeouts(5))
+
+    def test_nested(self):
+        with deadline(10):
+            self.assertLessEqual(remaining(), 10)
+            with deadline(100):
+                # Never extends the enclosing deadline
+                self.assertLessEqual(remaining(), 10)
+            with deadline(1):
+                self.assertLessEqual(remaining(), 1)
+        self.assertIsNone(remaining())
+
+    def test_bounded(self):
+        with deadline(1):
+            timeouts = call_timeouts(Timeouts(connect=0.5, total=30))
+            self.assertEqual(0.5, timeouts.connect)
+            self.assertLessEqual(timeouts.total, 1)
+            self.assertEqual(Timeouts(total=0.1), call_timeouts(0.1))
+
+    def test_expired(self):
+        with deadline(0):
+            self.assertRaises(DeadlineExceeded, call_timeouts, None)
+
+    def test_inherited_by_tasks(self):
+        async def run():
+            with deadline(5):
+                return await asyncio.gather(
+                    asyncio.sleep(0, remaining()),
+                    asyncio.ensure_future(asyncio.sleep(0, remaining())))
+
+        for left in asyncio.run(run()):
+            self.assertLessEqual(left, 5)
+
+
+# noinspection PyDocstring
+class TimeoutClientTest(unittest.TestCase):
+    def setUp(self):
+        self.hits = 0
+
+        async def handler(request):
+            self.hits += 1
+            await asyncio.sleep(float(request.match_info['petId']))
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', handler)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def run_client(self, test):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(resource_listing(self.base_path))
+            try:
+                return await test(client)
+            finally:
+                await client.close()
+
+        return asyncio.run(run())
+
+    def test_per_call(self):
+        async def test(client):
+            with self.assertRaises(asyncio.TimeoutError):
+                await client.pet.getPet(petId=1, _timeout=0.1)
+
+        self.run_client(test)
+
+    def test_configured(self):
+        async def test(client):
+            client.configure('getPet', timeout=Timeouts(total=0.1))
+            with self.assertRaises(asyncio.TimeoutError):
+                await client.pet.getPet(petId=1)
+            await client.pet.getPet(petId=0, _timeout=5)
+
+        self.run_client(test)
+
+    def test_deadline(self):
+        async def test(client):
+            start = time.monotonic()
+            with deadline(0.2):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.gather(client.pet.getPet(petId=0.1),
+                                         client.pet.getPet(petId=1))
+                await asyncio.sleep(0.2)
+                with self.assertRaises(DeadlineExceeded):
+                    await client.pet.getPet(petId=0)
+            return time.monotonic() - start
+
+        self.assertLess(self.run_client(test), 0.9)
+        # The last call was never sent
+        self.assertEqual(2, self.hits)
+
+
+# noinspection PyDocstring
+class SessionTimeoutTest(unittest.TestCase):
+    def test_session_defaults(self):
+        async def run():
+            transport = SessionTransport()
+            try:
+                return (transport.get_session().timeout,
+                        transport.client_timeout(Timeouts(read=5)),
+                        transport.client_timeout(Timeouts(total=1)))
+            finally:
+                await transport.close()
+
+        default, read, total = asyncio.run(run())
+        # Calls with only a read timeout keep the session's total
+        self.assertIsNotNone(default.total)
+        self.assertEqual(default.total, read.total)
+        self.assertEqual(5, read.sock_read)
+        self.assertEqual(1, total.total)
+        self.assertEqual(default.sock_connect, total.sock_connect)
+
+
+if __name__ == '__main__':
+    unittest.main()
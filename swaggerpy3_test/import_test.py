@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Import side effect tests.
+
+Each test imports the package in a fresh interpreter.
+"""
+
+import subprocess
+import sys
+import unittest
+
+
+def run(code):
+    result = subprocess.run([sys.executable, '-c', code],
+                            stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True)
+    return result.stdout.strip()
+
+
+# noinspection PyDocstring
+class ImportTest(unittest.TestCase):
+    def test_package_is_light(self):
+        out = run("import sys, swaggerpy3; "
+                  "print('aiohttp' in sys.modules, "
+                  "'swaggerpy3.swagger_model' in sys.modules)")
+        self.assertEqual('False False', out)
+
+    def test_client_defers_aiohttp(self):
+        out = run("import sys, swaggerpy3.client; "
+                  "print('aiohttp' in sys.modules)")
+        self.assertEqual('False', out)
+
+    def test_ws_pool_defers_aiohttp(self):
+        out = run("import sys, swaggerpy3.ws_pool; "
+                  "print('aiohttp' in sys.modules)")
+        self.assertEqual('False', out)
+
+    def test_no_logging_configuration(self):
+        out = run("import logging, swaggerpy3.client; "
+                  "root = logging.getLogger(); "
+                  "print(len(root.handlers), root.level)")
+        self.assertEqual('0 30', out)
+
+    def test_lazy_attributes(self):
+        out = run("import swaggerpy3; "
+                  "print(swaggerpy3.Loader.__module__, "
+                  "swaggerpy3.SwaggerError.__name__, "
+                  "swaggerpy3.client.__name__)")
+        self.assertEqual(
+            'swaggerpy3.swagger_model SwaggerError swaggerpy3.client', out)
+
+    def test_unknown_attribute(self):
+        import swaggerpy3
+        self.assertRaises(AttributeError, getattr, swaggerpy3, 'nothing')
+
+
+if __name__ == '__main__':
+    unittest.main()
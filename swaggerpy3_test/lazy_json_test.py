@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Lazy JSON view tests.
+"""
+
+import asyncio
+import json
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3 import lazy_json
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.compact import compact_model
+from swaggerpy3.lazy_json import ListView, RecordView, model_fields, view
+from swaggerpy3_test.support import api_listing, start_server
+
+CHANNELS = [
+    {'id': '1.%d' % i, 'name': 'PJSIP/%d' % i, 'state': 'Up',
+     'caller': {'name': 'Alice', 'number': '100%d' % i},
+     'channelvars': {'X': [1, 2]}}
+    for i in range(3)
+]
+BODY = json.dumps(CHANNELS).encode('utf-8')
+
+
+# noinspection PyDocstring
+class ViewTest(unittest.TestCase):
+    def test_view(self):
+        channels = view(BODY)
+        self.assertIsInstance(channels, ListView)
+        self.assertEqual(3, len(channels))
+        self.assertIsInstance(channels[0], RecordView)
+        self.assertEqual('1.2', channels[-1]['id'])
+        self.assertEqual('1001', channels[1]['caller']['number'])
+        self.assertEqual([1, 2], list(channels[0]['channelvars']['X']))
+        self.assertEqual(['1.0', '1.1', '1.2'], [c['id'] for c in channels])
+        self.assertEqual(CHANNELS, channels.as_python())
+
+    def test_projection(self):
+        channels = view(BODY, ['id', 'caller'])
+        channel = channels[0]
+        self.assertEqual(['id', 'caller'], channel.keys())
+        self.assertNotIn('name', channel)
+        self.assertRaises(KeyError, channel.__getitem__, 'name')
+        self.assertIsNone(channel.get('state'))
+        # Nested objects are not projected
+        self.assertEqual({'name': 'Alice', 'number': '1000'},
+                         channel['caller'].as_python())
+        self.assertEqual({'id': '1.0', 'caller': CHANNELS[0]['caller']},
+                         channel.as_python())
+
+    def test_scalar(self):
+        self.assertEqual(42, view(b'42'))
+
+    def test_model_fields(self):
+        models = {'Channel': {'id': 'Channel', 'properties': {
+            'id': {'type': 'string'}, 'name': {'type': 'string'}}}}
+        self.assertEqual({'id', 'name'},
+                         model_fields(models, 'List[Channel]'))
+        compact = {'Channel': compact_model(models['Channel'])}
+        self.assertEqual({'id', 'name'}, model_fields(compact, 'Channel'))
+        self.assertIsNone(model_fields(models, 'Bridge'))
+        self.assertIsNone(model_fields(None, 'Channel'))
+
+
+# noinspection PyDocstring
+class FallbackViewTest(ViewTest):
+    """Same tests, decoding with the json module.
+    """
+
+    def setUp(self):
+        self.simdjson = lazy_json.simdjson
+        lazy_json.simdjson = None
+
+    def tearDown(self):
+        lazy_json.simdjson = self.simdjson
+
+
+# noinspection PyDocstring
+class OperationViewTest(unittest.TestCase):
+    def setUp(self):
+        async def channels(request):
+            return web.Response(body=BODY, content_type='application/json')
+
+        app = web.Application()
+        app.router.add_get('/channels', channels)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def test_view(self):
+        listing = api_listing(self.base_path, [{
+            "path": "/channels",
+            "operations": [{
+                "httpMethod": "GET",
+                "nickname": "list",
+                "responseClass": "List[Channel]",
+                "parameters": []
+            }]
+        }], name='channels')
+        listing['apis'][0]['api_declaration']['models'] = {
+            'Channel': {'id': 'Channel', 'properties': {
+                'id': {'type': 'string', 'required': True},
+                'state': {'type': 'string', 'required': True}}}}
+
+        async def run():
+            client = SwaggerClient()
+            await client.connect(listing)
+            try:
+                return (await client.channels.list.view(_fields=True),
+                        await client.channels.list.view())
+            finally:
+                await client.close()
+
+        projected, full = asyncio.run(run())
+        self.assertEqual([{'id': c['id'], 'state': c['state']}
+                          for c in CHANNELS], projected.as_python())
+        self.assertEqual(CHANNELS, full.as_python())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Offload tests.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.offload import Offload, estimate_size
+from swaggerpy3_test.support import api_listing, start_server
+
+PETS = [{'id': i, 'name': 'pet %d' % i, 'tags': ['a', 'b']}
+        for i in range(1000)]
+
+
+# noinspection PyDocstring
+class OffloadTest(unittest.TestCase):
+    def test_threshold(self):
+        uut = Offload(threshold=1000)
+
+        async def run():
+            return (await uut.decode(b'[1, 2]'),
+                    await uut.decode(json.dumps(PETS).encode('utf-8')),
+                    await uut.encode({'a': 1}),
+                    await uut.encode(PETS))
+
+        small, large, encoded, encoded_large = asyncio.run(run())
+        self.assertEqual([1, 2], small)
+        self.assertEqual(PETS, large)
+        self.assertEqual('{"a": 1}', encoded)
+        self.assertEqual(PETS, json.loads(encoded_large))
+        self.assertEqual(2, uut.stats.inline)
+        self.assertEqual(2, uut.stats.offloaded)
+
+    def test_process_pool(self):
+        with concurrent.futures.ProcessPoolExecutor(1) as executor:
+            uut = Offload(threshold=0, executor=executor)
+            body = json.dumps(PETS)
+            self.assertEqual(PETS, asyncio.run(uut.decode(body)))
+
+    def test_estimate_size(self):
+        size = len(json.dumps(PETS))
+        estimate = estimate_size(PETS, size * 10)
+        self.assertLess(abs(estimate - size), size / 2)
+        # Stops early
+        self.assertLess(estimate_size(PETS, 100), size / 10)
+
+    def test_non_str_keys(self):
+        value = {1: 'a', None: 'b', 2.5: 'c'}
+        uut = Offload(threshold=1000)
+        self.assertEqual(json.dumps(value), asyncio.run(uut.encode(value)))
+        self.assertLess(abs(estimate_size(value, 1000) -
+                            len(json.dumps(value))), 10)
+
+
+# noinspection PyDocstring
+class OffloadClientTest(unittest.TestCase):
+    def setUp(self):
+        async def pets(request):
+            if request.method == 'POST':
+                return web.json_response(len(await request.json()))
+            return web.json_response(PETS)
+
+        app = web.Application()
+        app.router.add_route('*', '/pets', pets)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def test_fetch(self):
+        listing = api_listing(self.base_path, [{
+            "path": "/pets",
+            "operations": [
+                {"httpMethod": "GET", "nickname": "listPets",
+                 "parameters": []},
+                {"httpMethod": "POST", "nickname": "addPets",
+                 "parameters": [{"name": "pets", "paramType": "body",
+                                 "dataType": "Pets"}]},
+            ]
+        }])
+        offload = Offload(threshold=1000)
+
+        async def run():
+            client = SwaggerClient()
+            await client.connect(listing)
+            client.configure(offload=offload)
+            try:
+                return (await client.pet.listPets.fetch(),
+                        await client.pet.addPets.fetch(
+                            pets={'pets': PETS}))
+            finally:
+                await client.close()
+
+        pets, added = asyncio.run(run())
+        self.assertEqual(PETS, pets)
+        self.assertEqual(1, added)
+        # The request and the listing were large, the count was not
+        self.assertEqual(2, offload.stats.offloaded)
+        self.assertEqual(1, offload.stats.inline)
+
+
+if __name__ == '__main__':
+    unittest.main()
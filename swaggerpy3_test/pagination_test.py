@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Pagination tests.
+"""
+
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.pagination import (OFFSET, PAGE, TOKEN, Paging,
+                                   detect_paging)
+from swaggerpy3.sync_client import SyncSwaggerClient
+from swaggerpy3_test.support import api_listing, start_server
+
+PETS = list(range(25))
+
+
+def list_operation(nickname, path, params):
+    return {
+        "path": path,
+        "operations": [
+            {
+                "httpMethod": "GET",
+                "nickname": nickname,
+                "parameters": [
+                    {"name": name, "paramType": "query", "dataType": "string"}
+                    for name in params
+                ]
+            }
+        ]
+    }
+
+
+# noinspection PyDocstring
+class DetectPagingTest(unittest.TestCase):
+    def detect(self, *names):
+        return detect_paging([(name, 'query', False) for name in names])
+
+    def test_offset(self):
+        paging = self.detect('status', 'offset', 'limit')
+        self.assertEqual((OFFSET, 'offset', 'limit'),
+                         (paging.kind, paging.param, paging.limit))
+
+    def test_page(self):
+        paging = self.detect('page', 'per_page')
+        self.assertEqual((PAGE, 'page', 'per_page'),
+                         (paging.kind, paging.param, paging.limit))
+
+    def test_token(self):
+        paging = self.detect('pageSize', 'pageToken')
+        self.assertEqual((TOKEN, 'pageToken', 'pageSize'),
+                         (paging.kind, paging.param, paging.limit))
+
+    def test_none(self):
+        self.assertIsNone(self.detect('status', 'limit'))
+        self.assertIsNone(detect_paging([('offset', 'path', True),
+                                         ('limit', 'path', True)]))
+
+    def test_items(self):
+        paging = Paging(TOKEN, 'cursor')
+        self.assertEqual([1], paging.items([1]))
+        self.assertEqual([1], paging.items({'results': [1], 'cursor': 'a'}))
+        self.assertEqual([1], paging.items({'pets': [1]}))
+        self.assertEqual('a', paging.next_token({'cursor': 'a'}))
+        self.assertIsNone(paging.next_token({'pets': [1]}))
+
+
+# noinspection PyDocstring
+class PaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+
+        async def by_offset(request):
+            self.requests.append(dict(request.query))
+            offset = int(request.query.get('offset', 0))
+            limit = int(request.query.get('limit', 10))
+            return web.json_response(PETS[offset:offset + limit])
+
+        async def by_page(request):
+            self.requests.append(dict(request.query))
+            page = int(request.query['page'])
+            return web.json_response(
+                {'pets': PETS[(page - 1) * 10:page * 10]})
+
+        async def by_token(request):
+            self.requests.append(dict(request.query))
+            start = int(request.query.get('cursor', 0))
+            body = {'items': PETS[start:start + 10]}
+            if start + 10 < len(PETS):
+                body['nextCursor'] = str(start + 10)
+            return web.json_response(body)
+
+        async def stuck(request):
+            self.requests.append(dict(request.query))
+            return web.json_response({'items': PETS[:10],
+                                      'nextCursor': '10'})
+
+        app = web.Application()
+        app.router.add_get('/offset', by_offset)
+        app.router.add_get('/page', by_page)
+        app.router.add_get('/token', by_token)
+        app.router.add_get('/stuck', stuck)
+        self.base_path, self.stop_server = start_server(app)
+        self.listing = api_listing(self.base_path, [
+            list_operation('byOffset', '/offset', ['offset', 'limit']),
+            list_operation('byPage', '/page', ['page']),
+            list_operation('byToken', '/token', ['cursor']),
+            list_operation('stuck', '/stuck', ['cursor']),
+            list_operation('unpaged', '/offset', []),
+        ])
+
+    def tearDown(self):
+        self.stop_server()
+
+    def collect(self, test):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(self.listing)
+            try:
+                return await test(client.pet)
+            finally:
+                await client.close()
+
+        return asyncio.run(run())
+
+    def test_offset(self):
+        async def test(pet):
+            return [p async for p in pet.byOffset.paginate(_page_size=10)]
+
+        self.assertEqual(PETS, self.collect(test))
+        self.assertEqual(['0', '10', '20'],
+                         [r['offset'] for r in self.requests])
+
+    def test_page(self):
+        async def test(pet):
+            return [p async for p in pet.byPage.paginate(_read_ahead=0)]
+
+        self.assertEqual(PETS, self.collect(test))
+        # The empty fourth page ends the listing
+        self.assertEqual(4, len(self.requests))
+
+    def test_token(self):
+        async def test(pet):
+            return [p async for p in pet.byToken.paginate()]
+
+        self.assertEqual(PETS, self.collect(test))
+        self.assertEqual([{}, {'cursor': '10'}, {'cursor': '20'}],
+                         self.requests)
+
+    def test_repeated_token(self):
+        async def test(pet):
+            return [p async for p in pet.stuck.paginate()]
+
+        self.assertEqual(PETS[:10] * 2, self.collect(test))
+        self.assertEqual([{}, {'cursor': '10'}], self.requests)
+
+    def test_read_ahead(self):
+        async def test(pet):
+            paginator = pet.byOffset.paginate(_page_size=5, _read_ahead=2)
+            pages = paginator.iter_pages()
+            await pages.__anext__()
+            await asyncio.sleep(0.2)
+            fetched = paginator.pages
+            await pages.aclose()
+            return fetched
+
+        # The page consumed, and two ahead
+        self.assertEqual(3, self.collect(test))
+
+    def test_unpaged(self):
+        async def test(pet):
+            return pet.unpaged.paginate()
+
+        self.assertRaises(TypeError, self.collect, test)
+
+    def test_sync(self):
+        client = SyncSwaggerClient(timeout=5)
+        try:
+            client.connect(self.listing)
+            pets = list(client.pet.byToken.paginate(_read_ahead=2))
+        finally:
+            client.close()
+        self.assertEqual(PETS, pets)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Swagger processor tests.
+"""
+
+import asyncio
+import unittest
+
+import swaggerpy3
+from swaggerpy3.compact import compact_resource_listing
+from swaggerpy3.processors import SwaggerProcessor, SwaggerError
+
+
+# noinspection PyDocstring
+class SyncProcessor(SwaggerProcessor):
+    def process_operation(self, resources, resource, api, operation,
+                          context):
+        operation['sync'] = True
+
+
+# noinspection PyDocstring
+class AsyncProcessor(SwaggerProcessor):
+    async def process_operation(self, resources, resource, api, operation,
+                                context):
+        await asyncio.sleep(0)
+        operation['async'] = True
+
+    def process_property(self, resources, resource, model, prop, context):
+        prop['sync'] = True
+
+
+# noinspection PyDocstring
+class ProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.resources = asyncio.run(
+            swaggerpy3.load_file('test-data/1.1/simple/resources.json'))
+        decl = self.resources['apis'][0]['api_declaration']
+        self.operation = decl['apis'][0]['operations'][0]
+        self.prop = decl['models']['Simple']['properties']['id']
+
+    def test_hooks(self):
+        self.assertEqual(['process_operation'],
+                         list(SyncProcessor().get_hooks().keys()))
+        self.assertFalse(SyncProcessor().is_async())
+        self.assertTrue(AsyncProcessor().is_async())
+
+    def test_sync(self):
+        asyncio.run(SyncProcessor().apply(self.resources))
+        self.assertTrue(self.operation['sync'])
+
+    def test_apply_sync(self):
+        SyncProcessor().apply_sync(self.resources)
+        self.assertTrue(self.operation['sync'])
+
+    def test_mixed(self):
+        asyncio.run(AsyncProcessor().apply(self.resources))
+        self.assertTrue(self.operation['async'])
+        self.assertTrue(self.prop['sync'])
+
+    def test_apply_sync_coroutine(self):
+        self.assertRaises(TypeError, AsyncProcessor().apply_sync,
+                          self.resources)
+        # The synchronous hooks did not run either
+        self.assertNotIn('sync', self.prop)
+
+    def test_time_budget(self):
+        stats = asyncio.run(
+            SyncProcessor().apply(self.resources, time_budget=0))
+        self.assertTrue(self.operation['sync'])
+        self.assertGreater(stats.slices, 1)
+
+    def test_offload(self):
+        loader = swaggerpy3.Loader(None, [SyncProcessor()], offload=True)
+        asyncio.run(loader.process_resource_listing(self.resources))
+        self.assertTrue(self.operation['sync'])
+        self.assertTrue(loader.stats.offloaded)
+        # The loop itself was not kept busy
+        self.assertEqual(0, loader.stats.slices)
+        self.assertEqual(0.0, loader.stats.busy)
+        self.assertGreater(loader.stats.offloaded_seconds, 0)
+
+    def test_compact(self):
+        async def run(offload):
+            loader = swaggerpy3.Loader(None, [SyncProcessor()],
+                                       offload=offload)
+            await loader.process_resource_listing(self.resources)
+            slices = loader.stats.slices
+            node = await loader.compact(compact_resource_listing,
+                                        self.resources)
+            return loader.stats, slices, node
+
+        stats, slices, node = asyncio.run(run(False))
+        self.assertEqual(slices + 1, stats.slices)
+        self.assertEqual('1.1', node['swaggerVersion'])
+        stats, slices, node = asyncio.run(run(True))
+        self.assertEqual(0, stats.slices)
+        self.assertEqual('1.1', node['swaggerVersion'])
+
+    def test_offload_async(self):
+        loader = swaggerpy3.Loader(None, [AsyncProcessor()], offload=True)
+        asyncio.run(loader.process_resource_listing(self.resources))
+        self.assertTrue(self.operation['async'])
+        self.assertFalse(loader.stats.offloaded)
+
+    def test_load_json(self):
+        self.resources['swaggerVersion'] = '0.1'
+        try:
+            swaggerpy3.load_json(self.resources)
+            self.fail("Expected SwaggerError")
+        except SwaggerError as e:
+            self.assertIn("Unsupported Swagger version 0.1", str(e))
+
+
+if __name__ == '__main__':
+    unittest.main()
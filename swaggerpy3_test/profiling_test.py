@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Profiler tests.
+"""
+
+import asyncio
+import os
+import pstats
+import tempfile
+import time
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.profiling import SAMPLE, Profiler
+from swaggerpy3_test.support import api_listing, start_server
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def work(seconds):
+    spin(seconds)
+    await asyncio.sleep(0)
+    spin(seconds)
+    return 'done'
+
+
+async def other_work(seconds):
+    spin(seconds)
+    await asyncio.sleep(0)
+
+
+def functions(stats):
+    return {name for (_, _, name) in stats.stats}
+
+
+# noinspection PyDocstring
+class ProfilerTest(unittest.TestCase):
+    def test_cprofile(self):
+        uut = Profiler()
+
+        async def run():
+            return await asyncio.gather(
+                uut.profile('work', work(0.001)), other_work(0.001))
+
+        self.assertEqual('done', asyncio.run(run())[0])
+        names = functions(uut.stats('work'))
+        self.assertIn('spin', names)
+        # Steps of other tasks are not attributed to the label
+        self.assertNotIn('other_work', names)
+
+    def test_nested(self):
+        uut = Profiler()
+
+        async def outer():
+            spin(0.001)
+            await uut.profile('inner', work(0.001))
+
+        asyncio.run(uut.profile('outer', outer()))
+        self.assertNotIn('work', functions(uut.stats('outer')))
+        self.assertIn('work', functions(uut.stats('inner')))
+
+    def test_exception(self):
+        uut = Profiler()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise KeyError('x')
+
+        self.assertRaises(KeyError, asyncio.run, uut.profile('fail', fail()))
+        self.assertEqual([], uut._local.stack)
+
+    def test_sample(self):
+        uut = Profiler(mode=SAMPLE, interval=0.0005)
+        asyncio.run(uut.profile('work', work(0.05)))
+        uut.stop()
+        lines = uut.collapsed()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.startswith('work;work (') for line in lines))
+        self.assertTrue(any('spin (profiling_test.py' in line
+                            for line in lines))
+
+    def test_memory(self):
+        uut = Profiler(memory=True)
+        uut.begin('calls')
+        data = [bytearray(1000) for _ in range(1000)]
+        uut.stop()
+        top = uut.top_allocations('calls', 1)
+        self.assertGreater(top[0].size_diff, 900000)
+        self.assertTrue(data)
+
+    def test_dump(self):
+        uut = Profiler(memory=True)
+        uut.begin('connect')
+        asyncio.run(uut.profile('get pet', work(0.001)))
+        uut.end('connect')
+        uut.stop()
+        with tempfile.TemporaryDirectory() as directory:
+            paths = uut.dump(directory)
+            self.assertEqual(
+                ['all.pstats', 'connect-after.tracemalloc',
+                 'connect-before.tracemalloc', 'get_pet.pstats'],
+                sorted(os.path.basename(path) for path in paths))
+            stats = pstats.Stats(os.path.join(directory, 'get_pet.pstats'))
+            self.assertIn('spin', functions(stats))
+
+
+# noinspection PyDocstring
+class ProfilerClientTest(unittest.TestCase):
+    def setUp(self):
+        async def pet(request):
+            return web.json_response({'id': request.match_info['petId']})
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', pet)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def listing(self):
+        return api_listing(self.base_path, [{
+            "path": "/pet/{petId}",
+            "operations": [{
+                "httpMethod": "GET", "nickname": "getPet",
+                "parameters": [{"name": "petId", "paramType": "path",
+                                "dataType": "int", "required": True}]
+            }]
+        }])
+
+    def test_window(self):
+        listing = self.listing()
+        profiler = Profiler(calls=2)
+
+        async def run():
+            client = SwaggerClient()
+            client.configure(profiler=profiler)
+            await client.connect(listing)
+            try:
+                for i in range(3):
+                    await client.pet.getPet(petId=i)
+            finally:
+                await client.close()
+
+        asyncio.run(run())
+        self.assertEqual(
+            ['connect', 'getPet', 'process:ClientProcessor',
+             'process:ValidationProcessor', 'process:WebsocketProcessor'],
+            sorted(profiler.profiles))
+        self.assertEqual({'getPet': 2}, profiler.operation_calls)
+        self.assertTrue(profiler.stopped)
+        self.assertIn('_call', functions(profiler.stats('getPet')))
+
+    def test_offload(self):
+        profiler = Profiler()
+
+        async def run():
+            client = SwaggerClient()
+            client.configure(profiler=profiler)
+            await client.connect(self.listing(), offload=True)
+            try:
+                return await client.pet.getPet.fetch(petId=1)
+            finally:
+                await client.close()
+
+        self.assertEqual({'id': '1'}, asyncio.run(run()))
+        # Processing ran in a worker thread, timed but not traced
+        self.assertEqual(['connect', 'getPet'], sorted(profiler.profiles))
+        self.assertEqual(
+            ['process:ClientProcessor', 'process:ValidationProcessor',
+             'process:WebsocketProcessor'], sorted(profiler.thread_seconds))
+
+
+if __name__ == '__main__':
+    unittest.main()
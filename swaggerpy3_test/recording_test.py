@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Record and replay tests.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.recording import (EXCHANGE, WS_FRAME, WS_OPEN,
+                                  RecordingTransport, ReplayError,
+                                  ReplayTransport, read_log)
+from swaggerpy3.stub import StubServer
+from swaggerpy3_test.support import start_server
+
+RESOURCES = 'test-data/1.1/simple/resources.json'
+
+
+# noinspection PyDocstring
+class RecordingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'traffic.log.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, recorder=None, latency=0.0):
+        """Records connect() and two calls to a stub server.
+        """
+        async def run():
+            stub = StubServer(RESOURCES, latency=latency)
+            url = await stub.start()
+            client = SwaggerClient()
+            await client.connect(url, http_client=AsyncHttpClient(
+                transport=recorder or RecordingTransport(self.path)))
+            try:
+                bodies = [await client.simple.getAsteriskInfo.fetch(
+                    test_param=param) for param in ('foo', 'bar')]
+            finally:
+                await client.close()
+                await stub.close()
+            return url, bodies
+
+        return asyncio.run(run())
+
+    def replay(self, url, speed=None):
+        async def run():
+            transport = ReplayTransport(self.path, speed=speed)
+            client = SwaggerClient()
+            await client.connect(url, http_client=AsyncHttpClient(
+                transport=transport))
+            try:
+                start = time.perf_counter()
+                bodies = [await client.simple.getAsteriskInfo.fetch(
+                    test_param=param) for param in ('foo', 'bar')]
+                elapsed = time.perf_counter() - start
+                with self.assertRaises(ReplayError):
+                    await client.simple.getAsteriskInfo(test_param='foo')
+            finally:
+                await client.close()
+            return bodies, elapsed, transport
+
+        return asyncio.run(run())
+
+    def test_replay(self):
+        url, recorded = self.record()
+        kinds = [kind for (kind, _, _) in read_log(self.path)]
+        # Listing, declaration, and two calls
+        self.assertEqual([EXCHANGE] * 4, kinds)
+        # The stub server is gone
+        bodies, _, transport = self.replay(url)
+        self.assertEqual(recorded, bodies)
+        self.assertEqual(4, transport.replayed)
+
+    def test_timing(self):
+        url, _ = self.record(latency=0.05)
+        _, fast, _ = self.replay(url)
+        _, recorded, _ = self.replay(url, speed=1.0)
+        _, double, _ = self.replay(url, speed=2.0)
+        self.assertLess(fast, 0.05)
+        self.assertGreaterEqual(recorded, 0.1)
+        self.assertTrue(0.05 <= double < recorded, double)
+
+    def test_failure(self):
+        # Nothing listens on the port of a stopped server
+        base_path, stop_server = start_server(web.Application())
+        stop_server()
+        url = base_path + '/missing'
+
+        async def run(transport):
+            http_client = AsyncHttpClient(transport=transport)
+            try:
+                with self.assertRaises(aiohttp.ClientConnectionError):
+                    await http_client.request('GET', url)
+            finally:
+                await http_client.close()
+
+        asyncio.run(run(RecordingTransport(self.path)))
+        [(kind, meta, _)] = list(read_log(self.path))
+        self.assertEqual(EXCHANGE, kind)
+        self.assertEqual('ClientConnectorError', meta['error'])
+        # Replayed as a failure, not as a missing record
+        asyncio.run(run(ReplayTransport(self.path)))
+
+    def test_background_writes(self):
+        recorder = RecordingTransport(self.path)
+        threads = []
+        write = recorder._write
+
+        def record_thread(batch):
+            threads.append(threading.current_thread())
+            write(batch)
+
+        recorder._write = record_thread
+        self.record(recorder)
+        self.assertEqual(4, len(list(read_log(self.path))))
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+# noinspection PyDocstring
+class WebSocketRecordingTest(unittest.TestCase):
+    def setUp(self):
+        async def events(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await ws.receive()
+            for i in range(3):
+                await asyncio.sleep(0.02)
+                await ws.send_str('{"event": %d}' % i)
+            await ws.close()
+            return ws
+
+        app = web.Application()
+        app.router.add_get('/events', events)
+        self.base_path, self.stop_server = start_server(app)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'ws.log.gz')
+
+    def tearDown(self):
+        self.stop_server()
+        shutil.rmtree(self.directory)
+
+    def receive_all(self, transport):
+        async def run():
+            http_client = AsyncHttpClient(transport=transport)
+            try:
+                ws = await http_client.ws_connect(
+                    self.base_path.replace('http', 'ws') + '/events',
+                    params={'app': 'test'})
+                await ws.send_str('subscribe')
+                start = time.perf_counter()
+                messages = [msg.data async for msg in ws]
+                return messages, time.perf_counter() - start
+            finally:
+                await http_client.close()
+
+        return asyncio.run(run())
+
+    def test_frames(self):
+        recorded, _ = self.receive_all(RecordingTransport(self.path))
+        self.assertEqual(['{"event": %d}' % i for i in range(3)], recorded)
+        records = [(kind, meta.get('dir'))
+                   for (kind, meta, _) in read_log(self.path)]
+        self.assertEqual((WS_OPEN, None), records[0])
+        self.assertEqual((WS_FRAME, 'out'), records[1])
+        self.assertEqual([(WS_FRAME, 'in')] * 4, records[2:])
+
+        replayed, fast = self.receive_all(ReplayTransport(self.path))
+        self.assertEqual(recorded, replayed)
+        self.assertLess(fast, 0.03)
+        replayed, timed = self.receive_all(
+            ReplayTransport(self.path, speed=1.0))
+        self.assertEqual(recorded, replayed)
+        self.assertGreaterEqual(timed, 0.05)
+
+    def test_receive_json(self):
+        async def run(transport):
+            http_client = AsyncHttpClient(transport=transport)
+            try:
+                ws = await http_client.ws_connect(
+                    self.base_path.replace('http', 'ws') + '/events',
+                    params={'app': 'test'})
+                await ws.send_str('subscribe')
+                return [await ws.receive_json() for _ in range(3)]
+            finally:
+                await http_client.close()
+
+        events = [{'event': i} for i in range(3)]
+        self.assertEqual(events, asyncio.run(
+            run(RecordingTransport(self.path))))
+        # Frames read through receive_json() are recorded too
+        self.assertEqual(
+            ['subscribe'] + [json.dumps(event) for event in events],
+            [body.decode() for (kind, _, body) in read_log(self.path)
+             if kind == WS_FRAME])
+        self.assertEqual(events, asyncio.run(
+            run(ReplayTransport(self.path))))
+
+
+if __name__ == '__main__':
+    unittest.main()
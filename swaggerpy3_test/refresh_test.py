@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Spec refresh tests.
+"""
+
+import asyncio
+import copy
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+# noinspection PyDocstring
+class RefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.docs = {}
+
+        async def api_docs(request):
+            return web.json_response(self.docs[request.match_info['name']])
+
+        app = web.Application()
+        app.router.add_get('/api-docs/{name}', api_docs)
+        self.base_path, self.stop_server = start_server(app)
+        listing = resource_listing(self.base_path)
+        pet = listing['apis'][0].pop('api_declaration')
+        store = copy.deepcopy(pet)
+        store['apis'][0]['operations'][0]['nickname'] = 'getOrder'
+        listing['apis'].append({"path": "/api-docs/store.json",
+                                "description": "Store"})
+        self.docs = {'resources.json': listing,
+                     'pet.json': pet,
+                     'store.json': store}
+        self.url = self.base_path + '/api-docs/resources.json'
+
+    def tearDown(self):
+        self.stop_server()
+
+    def run_client(self, test, compact=False):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(self.url, compact=compact)
+            try:
+                await test(client)
+            finally:
+                await client.close()
+        asyncio.run(run())
+
+    def test_unchanged(self):
+        async def test(uut):
+            resources = uut.resources
+            self.assertEqual([], await uut.refresh())
+            self.assertIs(resources, uut.resources)
+        self.run_client(test)
+
+    def test_changed(self):
+        async def test(uut):
+            store = uut.store
+            pet = self.docs['pet.json']
+            pet['apis'][0]['operations'][0]['nickname'] = 'fetchPet'
+            self.assertEqual(['pet'], await uut.refresh())
+            self.assertIs(store, uut.store)
+            self.assertIsNotNone(uut.pet.fetchPet)
+            self.assertIsNone(uut.pet.get_operation('getPet'))
+            self.assertEqual(2, len(uut.api_docs['apis']))
+        self.run_client(test)
+
+    def test_changed_compact(self):
+        async def test(uut):
+            pet = self.docs['pet.json']
+            pet['apis'][0]['operations'][0]['nickname'] = 'fetchPet'
+            self.assertEqual(['pet'], await uut.refresh())
+            self.assertIsNotNone(uut.pet.fetchPet)
+            self.assertEqual('store', uut.api_docs.apis[1].name)
+        self.run_client(test, compact=True)
+
+    def test_removed(self):
+        async def test(uut):
+            self.docs['resources.json']['apis'].pop()
+            self.assertEqual(['store'], await uut.refresh())
+            self.assertIsNone(uut.get_resource('store'))
+        self.run_client(test)
+
+    def test_background(self):
+        async def test(uut):
+            pet = self.docs['pet.json']
+            pet['apis'][0]['operations'][0]['nickname'] = 'fetchPet'
+            uut.start_refresh(0.01)
+            for _ in range(100):
+                if uut.pet.get_operation('fetchPet'):
+                    break
+                await asyncio.sleep(0.01)
+            uut.stop_refresh()
+            self.assertIsNotNone(uut.pet.get_operation('fetchPet'))
+        self.run_client(test)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Priority scheduler tests.
+"""
+
+import asyncio
+import time
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.deadline import DeadlineExceeded, deadline
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.scheduler import Scheduler
+from swaggerpy3_test.support import (FakeClock, resource_listing,
+                                     start_server)
+
+
+# noinspection PyDocstring
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.uut = Scheduler(concurrency=1, max_wait=5.0, clock=self.clock)
+
+    def dispatch_order(self, priorities, before_release=None):
+        """Queues requests behind a busy slot, and releases them one by one.
+        """
+        order = []
+
+        async def request(i, priority):
+            await self.uut.acquire(priority)
+            order.append(i)
+
+        async def run():
+            await self.uut.acquire()
+            tasks = [asyncio.ensure_future(request(i, p))
+                     for (i, p) in enumerate(priorities)]
+            await asyncio.sleep(0)
+            if before_release:
+                before_release(tasks)
+            while not all(task.done() for task in tasks):
+                self.uut.release()
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(run())
+        return order, results
+
+    def test_weighted(self):
+        priorities = ['bulk'] * 9 + ['critical'] * 9
+        order, _ = self.dispatch_order(priorities)
+        first = [priorities[i] for i in order[:9]]
+        self.assertEqual(8, first.count('critical'))
+        self.assertEqual(1, first.count('bulk'))
+
+    def test_starvation(self):
+        order = []
+
+        async def request(priority):
+            await self.uut.acquire(priority)
+            order.append(priority)
+            self.uut.release()
+
+        async def run():
+            await self.uut.acquire()
+            tasks = [asyncio.ensure_future(request('bulk'))]
+            await asyncio.sleep(0)
+            self.clock.now = 10.0
+            tasks += [asyncio.ensure_future(request('critical'))
+                      for _ in range(8)]
+            await asyncio.sleep(0)
+            self.uut.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        self.assertEqual('bulk', order[0])
+        self.assertEqual(1, self.uut.stats['bulk'].starved)
+
+    def test_cancelled(self):
+        def cancel(tasks):
+            tasks[0].cancel()
+
+        order, results = self.dispatch_order(['normal', 'normal'], cancel)
+        self.assertEqual([1], order)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(1, self.uut.active)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, asyncio.run, self.uut.acquire('vip'))
+
+    def test_deadline(self):
+        async def run():
+            await self.uut.acquire()
+            with deadline(0.01):
+                waiting = asyncio.ensure_future(self.uut.acquire())
+            await asyncio.sleep(0.02)
+            self.uut.release()
+            with self.assertRaises(DeadlineExceeded):
+                await waiting
+            self.assertEqual(0, self.uut.active)
+
+        asyncio.run(run())
+
+
+# noinspection PyDocstring
+class ScheduledDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        async def handler(request):
+            await asyncio.sleep(float(request.match_info['petId']))
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', handler)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def test_queue_wait(self):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(
+                resource_listing(self.base_path),
+                http_client=AsyncHttpClient(
+                    scheduler=Scheduler(concurrency=1)))
+            try:
+                blocker = asyncio.ensure_future(client.pet.getPet(petId=0.4))
+                await asyncio.sleep(0.05)
+                start = time.monotonic()
+                with deadline(0.5):
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await client.pet.getPet(petId=1)
+                elapsed = time.monotonic() - start
+                await blocker
+                return elapsed
+            finally:
+                await client.close()
+
+        # The time spent queued counted against the deadline
+        self.assertLess(asyncio.run(run()), 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
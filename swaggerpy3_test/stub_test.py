@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Stub server and load generator tests.
+"""
+
+import asyncio
+import contextlib
+import io
+import random
+import unittest
+
+from swaggerpy3 import stub
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.loadgen import LoadGenerator, LoadReport
+from swaggerpy3.stub import LISTING_PATH, StubServer, synthesize
+from swaggerpy3_test.support import start_server
+
+RESOURCES = 'test-data/1.1/simple/resources.json'
+
+MODELS = {
+    'Channel': {
+        'id': 'Channel',
+        'properties': {
+            'id': {'type': 'string'},
+            'state': {'type': 'string', 'allowableValues': {
+                'valueType': 'LIST', 'values': ['Up', 'Down']}},
+            'caller': {'type': 'CallerID'},
+            'variables': {'type': 'List[int]'},
+        }
+    },
+    'CallerID': {
+        'id': 'CallerID',
+        'properties': {'name': {'type': 'string'}}
+    },
+}
+
+
+# noinspection PyDocstring
+class SynthesizeTest(unittest.TestCase):
+    def test_model(self):
+        channels = synthesize('List[Channel]', MODELS, random.Random(1),
+                              list_size=2)
+        self.assertEqual(2, len(channels))
+        channel = channels[0]
+        self.assertEqual({'id', 'state', 'caller', 'variables'},
+                         set(channel))
+        self.assertIn(channel['state'], ('Up', 'Down'))
+        self.assertIsInstance(channel['caller']['name'], str)
+        self.assertTrue(all(isinstance(v, int)
+                            for v in channel['variables']))
+
+    def test_primitives(self):
+        rng = random.Random(1)
+        self.assertIsNone(synthesize('void', {}, rng))
+        self.assertIsNone(synthesize(None, {}, rng))
+        self.assertIsInstance(synthesize('boolean', {}, rng), bool)
+        self.assertIsInstance(synthesize('double', {}, rng), float)
+        self.assertEqual({}, synthesize('Unknown', {}, rng))
+
+
+# noinspection PyDocstring
+class StubServerTest(unittest.TestCase):
+    def run_client(self, coro_fn, **kwargs):
+        async def run():
+            server = StubServer(RESOURCES, rng=random.Random(1), **kwargs)
+            url = await server.start()
+            client = SwaggerClient()
+            try:
+                await client.connect(url)
+                return server, await coro_fn(client)
+            finally:
+                await client.close()
+                await server.close()
+
+        return asyncio.run(run())
+
+    def test_call(self):
+        async def call(client):
+            return await client.simple.getAsteriskInfo.fetch(
+                test_param='foo')
+
+        server, body = self.run_client(call)
+        self.assertEqual(['id'], list(body))
+        self.assertEqual({'getAsteriskInfo': 1}, server.calls)
+
+    def test_errors(self):
+        async def call(client):
+            with self.assertRaises(Exception) as cm:
+                await client.simple.getAsteriskInfo()
+            return cm.exception.status
+
+        server, status = self.run_client(call, error_rate=1.0)
+        # From the operation's errorResponses
+        self.assertEqual(404, status)
+        self.assertEqual(1, server.errors)
+
+    def test_load(self):
+        async def load(client):
+            generator = LoadGenerator(
+                client, ['simple.getAsteriskInfo'], requests=50,
+                concurrency=5)
+            return await generator.run()
+
+        server, report = self.run_client(load, error_rate=0.2)
+        self.assertEqual(50, report.requests)
+        self.assertEqual(server.errors, report.errors[404])
+        self.assertEqual(50 - server.errors, len(report.latencies))
+
+    def test_rate(self):
+        async def load(client):
+            generator = LoadGenerator(
+                client, ['simple.getAsteriskInfo'], rps=200, duration=0.2)
+            return await generator.run()
+
+        _, report = self.run_client(load)
+        self.assertTrue(30 <= report.requests <= 45, report.requests)
+
+    def test_unknown_operation(self):
+        async def load(client):
+            LoadGenerator(client, ['simple.nothing'])
+
+        self.assertRaises(ValueError, self.run_client, load)
+
+
+# noinspection PyDocstring
+class LoadReportTest(unittest.TestCase):
+    def test_percentiles(self):
+        uut = LoadReport([i / 1000.0 for i in range(1, 101)], {500: 2}, 2.0)
+        self.assertEqual(0.05, uut.percentile(50))
+        self.assertEqual(0.099, uut.percentile(99))
+        self.assertEqual(0.1, uut.percentile(100))
+        self.assertEqual(51, uut.rps)
+        self.assertIn('p99 99.00ms', uut.format())
+        self.assertIsNone(LoadReport([], {}, 1.0).percentile(50))
+
+
+# noinspection PyDocstring
+class MainTest(unittest.TestCase):
+    def test_load(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            stub.main(['swagger-stub', 'load', RESOURCES,
+                       '-o', 'simple.getAsteriskInfo', '-n', '20',
+                       '--latency', '1'])
+        self.assertIn('20 requests', out.getvalue())
+        self.assertIn('p50', out.getvalue())
+
+    def test_load_url(self):
+        base_path, stop_server = start_server(StubServer(RESOURCES).app())
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                stub.main(['swagger-stub', 'load',
+                           '--url', base_path + LISTING_PATH,
+                           '-o', 'simple.getAsteriskInfo', '-n', '5'])
+        finally:
+            stop_server()
+        self.assertIn('5 requests', out.getvalue())
+
+    def test_missing_resources(self):
+        with contextlib.redirect_stderr(io.StringIO()) as err:
+            with self.assertRaises(SystemExit):
+                stub.main(['swagger-stub', 'load',
+                           '-o', 'simple.getAsteriskInfo'])
+        self.assertIn('Missing resources.json', err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
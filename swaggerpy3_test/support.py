@@ -0,0 +1,109 @@
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Helpers shared by the tests.
+"""
+
+import asyncio
+import threading
+
+from aiohttp import web
+
+
+class FakeClock(object):
+    """Clock returning now, set by the test.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def start_server(app):
+    """Serves app on a loopback port from a background thread.
+
+    :return: (base URL, stop function)
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    return "http://127.0.0.1:%d" % port, stop
+
+
+def api_listing(base_path, apis, name='pet'):
+    """Resource listing with a single, already loaded API declaration.
+
+    :param base_path: basePath of the listing and declaration.
+    :param apis: apis array of the declaration.
+    :param name: Name of the resource.
+    """
+    return {
+        "swaggerVersion": "1.1",
+        "basePath": base_path,
+        "apis": [
+            {
+                "path": "/api-docs/%s.json" % name,
+                "description": name,
+                "api_declaration": {
+                    "swaggerVersion": "1.1",
+                    "basePath": base_path,
+                    "resourcePath": "/%s.json" % name,
+                    "apis": apis,
+                    "models": {}
+                }
+            }
+        ]
+    }
+
+
+def resource_listing(base_path):
+    """Resource listing with a single getPet operation on base_path.
+    """
+    return {
+        "swaggerVersion": "1.1",
+        "basePath": base_path,
+        "apis": [
+            {
+                "path": "/api-docs/pet.json",
+                "description": "Pets",
+                "api_declaration": {
+                    "swaggerVersion": "1.1",
+                    "basePath": base_path,
+                    "resourcePath": "/pet.json",
+                    "apis": [
+                        {
+                            "path": "/pet/{petId}",
+                            "operations": [
+                                {
+                                    "httpMethod": "GET",
+                                    "nickname": "getPet",
+                                    "parameters": [
+                                        {
+                                            "name": "petId",
+                                            "paramType": "path"
+                                        }
+                                    ]
+                                }
+                            ]
+                        }
+                    ],
+                    "models": {}
+                }
+            }
+        ]
+    }
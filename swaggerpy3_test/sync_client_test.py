@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Synchronous client facade tests.
+"""
+
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from aiohttp import web
+
+from swaggerpy3.sync_client import SyncSwaggerClient
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+# noinspection PyDocstring
+class SyncSwaggerClientTest(unittest.TestCase):
+    def setUp(self):
+        async def get_pet(request):
+            return web.json_response({'id': request.match_info['petId']})
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', get_pet)
+        base_path, self.stop_server = start_server(app)
+        self.uut = SyncSwaggerClient(timeout=10)
+        self.uut.connect(resource_listing(base_path))
+
+    def tearDown(self):
+        self.uut.close()
+        self.stop_server()
+
+    def test_call(self):
+        resp = self.uut.pet.getPet(petId=1234)
+        self.assertEqual(200, resp.status)
+        self.assertEqual({'id': '1234'}, self.uut.run(resp.json()))
+
+    def test_threads(self):
+        def get(pet_id):
+            return self.uut.run(self.uut.pet.getPet(petId=pet_id).json())
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(get, range(32)))
+        self.assertEqual([{'id': str(i)} for i in range(32)], results)
+
+    def test_submit(self):
+        future = self.uut.pet.getPet.submit(petId=1)
+        self.assertEqual(200, future.result(10).status)
+
+    def test_timeout(self):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with self.assertRaises(TimeoutError):
+            self.uut.run(slow(), timeout=0.05)
+        # Not left running on the loop
+        self.assertTrue(cancelled.wait(1))
+
+    def test_bad_operation(self):
+        self.assertRaises(AttributeError, lambda: self.uut.pet.doesNotExist)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Tracing tests.
+"""
+
+import asyncio
+import random
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.scheduler import Scheduler
+from swaggerpy3.tracing import (MemoryExporter, Tracer, current_span,
+                                parse_traceparent)
+from swaggerpy3_test.support import api_listing, start_server
+
+TRACEPARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+
+# noinspection PyDocstring
+class TracerTest(unittest.TestCase):
+    def setUp(self):
+        self.uut = Tracer(exporter=MemoryExporter(), rng=random.Random(1))
+
+    def test_nesting(self):
+        with self.uut.span('flow', channel='c1') as root:
+            with self.uut.span('answer') as child:
+                pass
+        self.assertIsNone(current_span.get())
+        self.assertEqual([child, root], self.uut.exporter.spans)
+        self.assertEqual(root.trace_id, child.trace_id)
+        self.assertEqual(root.span_id, child.parent_id)
+        self.assertIsNone(root.parent_id)
+        self.assertEqual({'channel': 'c1'}, root.attributes)
+        self.assertGreaterEqual(root.duration, child.duration)
+
+    def test_error(self):
+        with self.assertRaises(KeyError):
+            with self.uut.span('flow'):
+                raise KeyError('x')
+        self.assertEqual("KeyError('x')", self.uut.exporter.spans[0].error)
+
+    def test_head_sampling(self):
+        uut = Tracer(sample=0.5, exporter=MemoryExporter(),
+                     rng=random.Random(1))
+        for _ in range(100):
+            with uut.span('flow') as root:
+                with uut.span('call') as child:
+                    # Children follow the decision of the root
+                    self.assertEqual(root is None, child is None)
+        self.assertTrue(30 < len(uut.exporter.spans) / 2 < 70)
+
+    def test_not_sampled(self):
+        uut = Tracer(sample=0, exporter=MemoryExporter())
+        with uut.span('flow') as span:
+            self.assertIsNone(span)
+            self.assertIsNone(current_span.get())
+        self.assertEqual([], uut.exporter.spans)
+
+    def test_traceparent(self):
+        with self.uut.span('handler', traceparent=TRACEPARENT) as span:
+            pass
+        self.assertEqual(0x4bf92f3577b34da6a3ce929d0e0e4736, span.trace_id)
+        self.assertEqual(0x00f067aa0ba902b7, span.parent_id)
+        self.assertTrue(span.traceparent().startswith(
+            '00-4bf92f3577b34da6a3ce929d0e0e4736-'))
+        with self.uut.span('handler', traceparent=TRACEPARENT[:-2] + '00') \
+                as span:
+            self.assertIsNone(span)
+            with self.uut.span('call') as child:
+                self.assertIsNone(child)
+                # Passed on, still not sampled
+                unsampled = current_span.get().traceparent()
+        self.assertTrue(unsampled.startswith(
+            '00-4bf92f3577b34da6a3ce929d0e0e4736-'))
+        self.assertTrue(unsampled.endswith('-00'))
+        # Only the sampled handler
+        self.assertEqual(1, len(self.uut.exporter.spans))
+        self.assertIsNone(parse_traceparent('00-abc-def-01'))
+        self.assertIsNone(parse_traceparent(TRACEPARENT.replace('0', 'x')))
+        self.assertIsNone(parse_traceparent(None))
+
+
+# noinspection PyDocstring
+class TracingClientTest(unittest.TestCase):
+    def setUp(self):
+        self.traceparents = []
+
+        async def pet(request):
+            self.traceparents.append(request.headers.get('traceparent'))
+            return web.json_response({'id': request.match_info['petId']})
+
+        app = web.Application()
+        app.router.add_get('/pet/{petId}', pet)
+        self.base_path, self.stop_server = start_server(app)
+        self.listing = api_listing(self.base_path, [{
+            "path": "/pet/{petId}",
+            "operations": [{
+                "httpMethod": "GET", "nickname": "getPet",
+                "parameters": [{"name": "petId", "paramType": "path",
+                                "dataType": "int", "required": True}]
+            }]
+        }])
+
+    def tearDown(self):
+        self.stop_server()
+
+    def call(self, tracer, flow=True):
+        async def run():
+            http_client = AsyncHttpClient(scheduler=Scheduler(),
+                                          tracer=tracer)
+            client = SwaggerClient()
+            await client.connect(self.listing, http_client=http_client)
+            try:
+                if not flow:
+                    return await client.pet.getPet.fetch(petId=1)
+                with tracer.span('flow'):
+                    return await client.pet.getPet.fetch(petId=1)
+            finally:
+                await client.close()
+
+        return asyncio.run(run())
+
+    def test_spans(self):
+        tracer = Tracer(exporter=MemoryExporter())
+        self.assertEqual({'id': '1'}, self.call(tracer))
+        spans = {span.name: span for span in tracer.exporter.spans}
+        self.assertEqual(['HTTP GET', 'decode', 'getPet', 'flow'],
+                         [span.name for span in tracer.exporter.spans])
+        request = spans['HTTP GET']
+        self.assertEqual(spans['getPet'].span_id, request.parent_id)
+        self.assertEqual(spans['getPet'].span_id, spans['decode'].parent_id)
+        self.assertEqual(spans['flow'].span_id, spans['getPet'].parent_id)
+        # No DNS resolution for the IP address
+        for phase in ('queue_wait', 'connect', 'ttfb', 'body_read'):
+            self.assertIn(phase, request.attributes)
+        self.assertEqual(200, request.attributes['status'])
+        self.assertEqual([request.traceparent()], self.traceparents)
+
+    def test_not_sampled(self):
+        tracer = Tracer(sample=0, exporter=MemoryExporter())
+        self.assertEqual({'id': '1'}, self.call(tracer))
+        self.assertEqual([], tracer.exporter.spans)
+        self.assertEqual([None], self.traceparents)
+
+    def test_decode(self):
+        tracer = Tracer(exporter=MemoryExporter())
+        self.call(tracer, flow=False)
+        spans = {span.name: span for span in tracer.exporter.spans}
+        # A single trace, rooted at the call
+        self.assertIsNone(spans['getPet'].parent_id)
+        self.assertEqual(spans['getPet'].span_id, spans['decode'].parent_id)
+        self.assertEqual({spans['getPet'].trace_id},
+                         {span.trace_id for span in spans.values()})
+
+    def test_sampled_out(self):
+        tracer = Tracer(sample=1e-9, exporter=MemoryExporter(),
+                        rng=random.Random(1))
+        self.assertEqual({'id': '1'}, self.call(tracer))
+        self.assertEqual([], tracer.exporter.spans)
+        self.assertEqual(1, len(self.traceparents))
+        self.assertIsNotNone(parse_traceparent(self.traceparents[0]))
+        self.assertTrue(self.traceparents[0].endswith('-00'))
+
+
+if __name__ == '__main__':
+    unittest.main()
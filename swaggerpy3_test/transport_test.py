@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Unix socket and in-process transport tests.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.http_client import AsyncHttpClient
+from swaggerpy3.stub import LISTING_PATH, StubServer
+from swaggerpy3.transport import (AppTransport, AsgiTransport,
+                                  BufferedResponse, Transport, UnixTransport,
+                                  encode_data)
+
+RESOURCES = 'test-data/1.1/simple/resources.json'
+URL = 'http://service' + LISTING_PATH
+
+
+async def call_stub(transport):
+    """Connects to the stub server through a transport, and calls it.
+    """
+    client = SwaggerClient()
+    await client.connect(URL, http_client=AsyncHttpClient(
+        transport=transport))
+    try:
+        return await client.simple.getAsteriskInfo.fetch(test_param='foo')
+    finally:
+        await client.close()
+
+
+async def echo(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for msg in ws:
+        await ws.send_str('echo ' + msg.data)
+    return ws
+
+
+# noinspection PyDocstring
+class UnixTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'stub.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_call(self):
+        async def run():
+            stub = StubServer(RESOURCES)
+            runner = web.AppRunner(stub.app())
+            await runner.setup()
+            await web.UnixSite(runner, self.path).start()
+            try:
+                return await call_stub(UnixTransport(self.path)), stub
+            finally:
+                await runner.cleanup()
+
+        body, stub = asyncio.run(run())
+        self.assertEqual(['id'], list(body))
+        self.assertEqual({'getAsteriskInfo': 1}, stub.calls)
+
+
+# noinspection PyDocstring
+class AppTransportTest(unittest.TestCase):
+    def test_call(self):
+        stub = StubServer(RESOURCES)
+        body = asyncio.run(call_stub(AppTransport(stub.app())))
+        self.assertEqual(['id'], list(body))
+        self.assertEqual({'getAsteriskInfo': 1}, stub.calls)
+
+    def test_runner(self):
+        startups = []
+
+        async def on_startup(app):
+            startups.append(app)
+
+        async def run():
+            app = StubServer(RESOURCES).app()
+            app.on_startup.append(on_startup)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            try:
+                await call_stub(AppTransport(runner))
+                await call_stub(AppTransport(runner))
+            finally:
+                await runner.cleanup()
+
+        asyncio.run(run())
+        self.assertEqual(1, len(startups))
+
+    def test_websocket(self):
+        async def run():
+            app = web.Application()
+            app.router.add_get('/echo', echo)
+            http_client = AsyncHttpClient(transport=AppTransport(app))
+            try:
+                ws = await http_client.ws_connect('ws://service/echo')
+                await ws.send_str('hello')
+                reply = await ws.receive_str()
+                await ws.close()
+                return reply
+            finally:
+                await http_client.close()
+
+        self.assertEqual('echo hello', asyncio.run(run()))
+
+
+async def asgi_app(scope, receive, send):
+    """Echoes requests; /ws echoes websocket messages, /closed refuses
+    websockets.
+    """
+    if scope['type'] == 'websocket':
+        await receive()
+        if scope['path'] == '/closed':
+            await send({'type': 'websocket.close', 'code': 1008})
+            return
+        await send({'type': 'websocket.accept'})
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                return
+            await send({'type': 'websocket.send',
+                        'text': 'echo ' + message['text']})
+    message = await receive()
+    headers = dict((name.decode(), value.decode())
+                   for (name, value) in scope['headers'])
+    body = json.dumps({
+        'method': scope['method'],
+        'path': scope['path'],
+        'query': scope['query_string'].decode(),
+        'headers': headers,
+        'body': message['body'].decode(),
+    }).encode()
+    status = 404 if scope['path'] == '/missing' else 200
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+# noinspection PyDocstring
+class AsgiTransportTest(unittest.TestCase):
+    def request(self, *args, **kwargs):
+        async def run():
+            http_client = AsyncHttpClient(transport=AsgiTransport(asgi_app))
+            try:
+                response = await http_client.request(*args, **kwargs)
+                return response.status, await response.json()
+            finally:
+                await http_client.close()
+
+        return asyncio.run(run())
+
+    def test_request(self):
+        status, echoed = self.request(
+            'POST', 'http://service:8080/pets', params={'b': 2, 'a': 1},
+            data={'name': 'rex'})
+        self.assertEqual(200, status)
+        self.assertEqual('POST', echoed['method'])
+        self.assertEqual('/pets', echoed['path'])
+        self.assertEqual('a=1&b=2', echoed['query'])
+        self.assertEqual('name=rex', echoed['body'])
+        self.assertEqual('service:8080', echoed['headers']['host'])
+        self.assertEqual('application/x-www-form-urlencoded',
+                         echoed['headers']['content-type'])
+
+    def test_error(self):
+        with self.assertRaises(aiohttp.ClientResponseError) as cm:
+            self.request('GET', 'http://service/missing')
+        self.assertEqual(404, cm.exception.status)
+
+    def test_call(self):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(URL, http_client=AsyncHttpClient(
+                transport=AppTransport(StubServer(RESOURCES).app())))
+            # Swap the transport for one calling an ASGI app
+            await client.http_client.transport.close()
+            client.http_client.transport = AsgiTransport(asgi_app)
+            try:
+                return await client.simple.getAsteriskInfo.fetch(
+                    test_param='foo')
+            finally:
+                await client.close()
+
+        echoed = asyncio.run(run())
+        self.assertEqual('/swagger/test/test', echoed['path'])
+        self.assertEqual('test_param=foo', echoed['query'])
+
+    def test_write_only_payload(self):
+        class Chunks(aiohttp.payload.Payload):
+            """Payload implementing only write(), like those of aiohttp
+            releases before as_bytes().
+            """
+
+            async def write(self, writer):
+                for chunk in self._value:
+                    await writer.write(chunk)
+
+            def decode(self, encoding='utf-8', errors='strict'):
+                raise AssertionError("Not written through write()")
+
+        payload = Chunks([b'one ', b'two'], content_type='text/plain')
+        self.assertEqual((b'one two', 'text/plain'),
+                         asyncio.run(encode_data(payload)))
+
+    def test_websocket(self):
+        async def run():
+            transport = AsgiTransport(asgi_app)
+            http_client = AsyncHttpClient(transport=transport)
+            try:
+                ws = await http_client.ws_connect('ws://service/ws')
+                replies = []
+                for text in ('one', 'two'):
+                    await ws.send_str(text)
+                    replies.append(await ws.receive_str())
+                with self.assertRaises(aiohttp.WSServerHandshakeError):
+                    await http_client.ws_connect('ws://service/closed')
+                return replies, ws
+            finally:
+                await http_client.close()
+
+        replies, ws = asyncio.run(run())
+        self.assertEqual(['echo one', 'echo two'], replies)
+        self.assertTrue(ws.closed)
+        self.assertTrue(ws.task.done())
+
+
+# noinspection PyDocstring
+class BrokenResponse(BufferedResponse):
+    """Response whose body fails to read.
+    """
+
+    def __init__(self):
+        super().__init__('GET', 'http://service/', 200, {}, b'')
+        self.closed = False
+
+    async def read(self):
+        raise aiohttp.ClientPayloadError("Connection lost")
+
+    def close(self):
+        self.closed = True
+
+
+# noinspection PyDocstring
+class BrokenTransport(Transport):
+    def __init__(self):
+        self.responses = []
+
+    async def request(self, method, url, params=None, data=None,
+                      headers=None, auth=None, timeout=None):
+        self.responses.append(BrokenResponse())
+        return self.responses[-1]
+
+
+# noinspection PyDocstring
+class ReadErrorTest(unittest.TestCase):
+    def test_request(self):
+        transport = BrokenTransport()
+        http_client = AsyncHttpClient(transport=transport)
+        with self.assertRaises(aiohttp.ClientPayloadError):
+            asyncio.run(http_client.request('GET', 'http://service/'))
+        self.assertTrue(transport.responses[0].closed)
+
+    def test_warmup(self):
+        transport = BrokenTransport()
+        http_client = AsyncHttpClient(transport=transport)
+        self.assertEqual(0, asyncio.run(
+            http_client.warmup('http://service/', 2)))
+        self.assertEqual([True, True],
+                         [r.closed for r in transport.responses])
+
+
+if __name__ == '__main__':
+    unittest.main()
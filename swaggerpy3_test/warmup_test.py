@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Connection warm-up tests.
+"""
+
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3_test.support import resource_listing, start_server
+
+
+# noinspection PyDocstring
+class WarmupTest(unittest.TestCase):
+    def setUp(self):
+        self.peers = []
+
+        async def handler(request):
+            self.peers.append(request.transport.get_extra_info('peername'))
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', handler)
+        self.base_path, self.stop_server = start_server(app)
+
+    def tearDown(self):
+        self.stop_server()
+
+    def test_warmup(self):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(resource_listing(self.base_path), warmup=3)
+            try:
+                warmed = set(self.peers)
+                await client.pet.getPet(petId=1)
+                return warmed, client
+            finally:
+                await client.close()
+
+        warmed, client = asyncio.run(run())
+        self.assertEqual(3, len(warmed))
+        self.assertIn(self.peers[-1], warmed)
+        self.assertIn('getPet', client.pet._operations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+#
+# Copyright (c) 2018, AVOXI, Inc.
+#
+
+"""Websocket pool tests.
+"""
+
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from swaggerpy3.client import SwaggerClient
+from swaggerpy3.ws_pool import WebSocketPool
+from swaggerpy3_test.support import api_listing, start_server
+
+
+# noinspection PyDocstring
+class WebSocketPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+
+        async def events(request):
+            app = request.query['app']
+            drop = request.query.get('drop') == '1'
+            self.connections.append(app)
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            count = self.connections.count(app)
+            for i in range(3):
+                await ws.send_json({'app': app, 'connection': count, 'i': i})
+            if drop and count == 1:
+                await ws.close()
+                return ws
+            async for msg in ws:
+                await ws.send_str(msg.data)
+            return ws
+
+        app = web.Application()
+        app.router.add_get('/events', events)
+        self.base_path, self.stop_server = start_server(app)
+        self.listing = api_listing(self.base_path.replace('http', 'ws'), [{
+            "path": "/events",
+            "operations": [
+                {
+                    "httpMethod": "GET",
+                    "upgrade": "websocket",
+                    "nickname": "eventWebsocket",
+                    "parameters": [
+                        {"name": "app", "paramType": "query",
+                         "dataType": "string", "required": True},
+                        {"name": "drop", "paramType": "query",
+                         "dataType": "string"}
+                    ]
+                }
+            ]
+        }], name='events')
+
+    def tearDown(self):
+        self.stop_server()
+
+    def run_client(self, test):
+        async def run():
+            client = SwaggerClient()
+            await client.connect(self.listing)
+            try:
+                return await test(client)
+            finally:
+                await client.close()
+
+        return asyncio.run(run())
+
+    def test_multiplex(self):
+        async def test(client):
+            pool = WebSocketPool(heartbeat=5)
+            for app in ('a', 'b'):
+                await pool.open(client.events.eventWebsocket, name=app,
+                                app=app)
+            received = []
+            for _ in range(6):
+                ws, msg = await pool.receive()
+                received.append((ws.name, msg.json()['app']))
+            stats = pool.stats()
+            await pool.close()
+            return pool, received, stats, client.http_client.websockets
+
+        pool, received, stats, websockets = self.run_client(test)
+        self.assertEqual(3, received.count(('a', 'a')))
+        self.assertEqual(3, received.count(('b', 'b')))
+        self.assertEqual([3, 3], [stats[app].messages for app in 'ab'])
+        self.assertEqual([0, 0], [stats[app].queued for app in 'ab'])
+        self.assertEqual(set(), pool.websockets)
+        self.assertTrue(all(ws.closed for ws in websockets))
+
+    def test_reconnect(self):
+        subscribed = []
+
+        async def on_connect(ws):
+            subscribed.append(ws.stats.connects)
+
+        async def test(client):
+            pool = WebSocketPool(backoff_base=0.01)
+            ws = await pool.open(client.events.eventWebsocket, name='a',
+                                 on_connect=on_connect, app='a', drop='1')
+            messages = [(await pool.receive())[1].json() for _ in range(6)]
+            await ws.send_str('"echo"')
+            echo = (await pool.receive())[1].json()
+            await pool.close()
+            # Iteration ends once the pool is closed
+            rest = [item async for item in pool]
+            return messages, echo, rest
+
+        messages, echo, rest = self.run_client(test)
+        self.assertEqual([1, 1, 1, 2, 2, 2],
+                         [m['connection'] for m in messages])
+        self.assertEqual('echo', echo)
+        self.assertEqual([], rest)
+        self.assertEqual([1, 2], subscribed)
+        self.assertEqual(['a', 'a'], self.connections)
+
+    def test_failed_on_connect(self):
+        async def on_connect(ws):
+            # a fails at once, b on its first reconnection
+            if ws.name == 'a' or ws.stats.connects == 2:
+                raise RuntimeError("Subscription failed")
+
+        async def test(client):
+            pool = WebSocketPool(backoff_base=0.01)
+            with self.assertRaises(RuntimeError):
+                await pool.open(client.events.eventWebsocket, name='a',
+                                on_connect=on_connect, app='a')
+            ws = await pool.open(client.events.eventWebsocket, name='b',
+                                 on_connect=on_connect, app='b', drop='1')
+            messages = [(await pool.receive())[1].json() for _ in range(6)]
+            websockets = client.http_client.websockets | {ws.ws}
+            open_sockets = [w for w in websockets if not w.closed]
+            await pool.close()
+            return messages, open_sockets, ws
+
+        messages, open_sockets, ws = self.run_client(test)
+        # The third connection took over
+        self.assertEqual([1, 1, 1, 3, 3, 3],
+                         [m['connection'] for m in messages])
+        self.assertEqual([ws.ws], open_sockets)
+        self.assertEqual(1, ws.stats.connect_failures)
+
+    def test_backoff(self):
+        pool = WebSocketPool(backoff_base=0.1, backoff_max=1.0)
+        for attempt in range(10):
+            delay = pool.backoff(attempt)
+            self.assertLessEqual(delay, min(1.0, 0.1 * 2 ** attempt))
+
+
+if __name__ == '__main__':
+    unittest.main()